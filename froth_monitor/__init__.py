@@ -11,11 +11,22 @@ except Exception:
 
 
 from .image_analysis import VideoAnalysis
+from .estimators import MotionEstimator, create_estimator
 from .arrow import Arrow
 from .autosaver import AutoSaver
 from .gui import MainGUI
-from .video_recorder import VideoRecorder
+from .video_recorder import VideoRecorder, RecordingIndex
 from .roi import ROI
 from .export import Export
+from .velocity_history import VelocityHistory
+from .frame_clock import FrameClock
+from .multi_roi import MultiROIAnalysis
+from .quality import QualityController
+from .headless import HeadlessAnalyzer
+from .chunked import ChunkedAnalyzer
+from .batch import BatchAnalyzer
+from .frame_bus import SharedFrameRing
+from .engine import AnalysisEngine, EngineClient
+from .monitor import EngineMonitor
 
 
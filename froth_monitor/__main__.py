@@ -1,13 +1,31 @@
-"""The entry point for the Bubble Analyser program."""
+"""The entry point for the Bubble Analyser program.
 
-from froth_monitor.gui import MainGUI
-# from .gui import MainGUI
-from PySide6.QtWidgets import QApplication
+Without arguments the GUI is started. A command such as `analyze` runs the
+corresponding command line tool instead (see `froth_monitor.cli`).
+"""
 
+import sys
+
+
+def main() -> None:
+    """
+    Start the GUI, or run a command line tool if a command is given.
+    """
+    from froth_monitor.cli import COMMANDS
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        from froth_monitor.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    from froth_monitor.gui import MainGUI
+    # from .gui import MainGUI
+    from PySide6.QtWidgets import QApplication
 
-if __name__ == "__main__":
-    import sys
     app = QApplication(sys.argv)
     window = MainGUI()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
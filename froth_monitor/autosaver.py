@@ -3,12 +3,44 @@
 This module defines the `AutoSaver` class, which provides functionality for
 automatic saving and loading of application data. It is designed to persist
 analysis results, including arrow direction and movement data for multiple
-regions of interest (ROIs), into a JSON file.
+regions of interest (ROIs), into an append-only journal file.
+
+Each call to the AutoSaver appends a single JSON line to the journal instead of
+re-serializing everything that has been recorded so far, so the cost of one
+autosave no longer grows with the length of the session. The loader replays
+the journal and rebuilds the familiar `{"arrow_direction", "roi_data"}`
+structure.
+
+Records are handed to a bounded queue and written by a dedicated writer
+thread in batches, so a slow or stalled disk never blocks the GUI thread that
+drives the frame analysis. A failed write is retried after a delay that
+doubles with every further failure (up to `MAX_RETRY_DELAY`), and a record
+that cannot be serialised is dropped and counted, so no error stops the
+writer thread. While writes keep failing, the backlog and the batch awaiting
+retry are each capped at `max_backlog_size` records; further records are
+dropped and counted instead of growing memory for the rest of the session.
+Records still unwritten when the saver is closed are counted as dropped too.
+
+Journal format (one JSON object per line):
+------------------------------------------
+- `{"type": "arrow", "arrow_direction": <radians>}`
+- `{"type": "clock", "wall_anchor": <seconds since the epoch>}`
+- `{"type": "frame", "roi_index": <int>, "frame_index": <int>,
+   "velocity": <float>, "timestamp": <float>}`
+
+Frame timestamps are numeric `FrameClock` timestamps (seconds since the most
+recent clock record). They are only formatted as date strings when the journal
+is loaded.
 
 Classes:
 --------
 AutoSaver
-    Handles automatic saving and loading of application state to/from a JSON file.
+    Handles automatic saving and loading of application state to/from a journal file.
+
+Functions:
+----------
+load_journal(file_path: str) -> dict
+    Replays a journal file and rebuilds the autosave data structure.
     
 Imports:
 --------
@@ -16,13 +48,125 @@ Imports:
     For serializing and deserializing application data.
 - os:
     For checking file existence and constructing file paths.
+- queue, threading, collections.deque:
+    For handing records to the background writer thread.
+- time:
+    For flush deadlines and write latency measurements.
 - datetime:
     For generating timestamped file names for autosaving.
+- format_wall_time:
+    For formatting numeric frame timestamps when the journal is loaded.
 """
 
 import json
 import os
+import queue
+import threading
+import time
+from collections import deque
 from datetime import datetime
+from .frame_clock import format_wall_time
+
+MIN_RETRY_DELAY = 1.0  # Seconds before the first retry of a failed write
+MAX_RETRY_DELAY = 30.0
+
+
+class _WriterCommand:
+    """
+    Control message for the writer thread.
+
+    The writer thread sets `done` once every record queued before the command
+    has been written to the journal.
+    """
+    
+    def __init__(self, 
+                 stop: bool = False) -> None:
+        self.stop = stop
+        self.done = threading.Event()
+
+
+def _empty_data() -> dict:
+    """
+    Return an empty autosave data structure.
+    """
+    return {
+        "arrow_direction": None,
+        "roi_data": []
+    }
+
+
+def _apply_record(data: dict, 
+                  record: dict,
+                  wall_anchor: float = None) -> None:
+    """
+    Apply a single journal record to the given autosave data structure.
+
+    Numeric frame timestamps are formatted relative to `wall_anchor`.
+    Unknown record types are ignored so that newer journals can still be
+    read by older loaders.
+    """
+    
+    record_type = record.get("type")
+    
+    if record_type == "arrow":
+        data["arrow_direction"] = record["arrow_direction"]
+        
+    elif record_type == "frame":
+        timestamp = record["timestamp"]
+        if isinstance(timestamp, (int, float)) and wall_anchor is not None:
+            timestamp = format_wall_time(wall_anchor + timestamp)
+            
+        roi_index = record["roi_index"]
+        
+        # Ensure the ROI exists
+        while len(data["roi_data"]) <= roi_index:
+            data["roi_data"].append({"ROI Index": len(data["roi_data"]) + 1, "Movement Data": []})
+            
+        data["roi_data"][roi_index]["Movement Data"].append({
+            "Frame Index": record["frame_index"],
+            "Velocity": record["velocity"],
+            "Timestamp": timestamp,
+        })
+
+
+def load_journal(file_path: str) -> dict:
+    """
+    Replay an autosave journal and rebuild the autosave data structure.
+
+    A partially written last line (for example after a crash in the middle of
+    a write) is skipped instead of invalidating the whole journal.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the journal file.
+
+    Returns
+    -------
+    dict
+        The rebuilt data with the keys `arrow_direction` and `roi_data`.
+    """
+    
+    data = _empty_data()
+    wall_anchor = None
+    
+    with open(file_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping corrupted autosave record: {line[:80]}")
+                continue
+            if record.get("type") == "clock":
+                wall_anchor = record["wall_anchor"]
+                continue
+            _apply_record(data, record, wall_anchor)
+            
+    return data
+
 
 class AutoSaver:
     """
@@ -30,57 +174,144 @@ class AutoSaver:
 
     The `AutoSaver` class provides methods to automatically save and load
     analysis data, such as arrow directions and movement data for regions
-    of interest (ROIs). The data is saved in JSON format to a file, ensuring
-    that the application's state is preserved even in the event of a crash.
+    of interest (ROIs). Every update is appended as one JSON line to a journal
+    file, ensuring that the application's state is preserved even in the
+    event of a crash without rewriting the whole history on every frame.
+
+    Writing happens on a background thread. The caller only puts records on a
+    bounded queue; the writer thread drains it and writes in batches whenever
+    `batch_size` records have accumulated or `flush_interval` seconds have
+    passed. If the queue is full (e.g. the disk stalls), records are kept in
+    an in-memory backlog and re-queued later, so the caller never blocks. The
+    backlog and a failed batch hold at most `max_backlog_size` records each;
+    records beyond that are dropped and counted.
 
     Attributes:
     ----------
     file_path : str
-        The full file path for the autosave file, including directory and filename.
+        The full file path for the autosave journal, including directory and filename.
     data : dict
         The data structure used to store the application state, including:
         - `arrow_direction`: The angle of the overflow direction (in radians).
         - `roi_data`: A list of dictionaries, each containing ROI movement data.
+        Frame records are only written to the journal; `roi_data` is filled
+        when the journal is loaded, since the live history already lives in
+        each ROI's `VideoAnalysis`.
+    wall_anchor : float or None
+        Wall-clock anchor of the `FrameClock` that frame timestamps refer to.
+    flush_interval : float
+        Maximum time in seconds a record waits in the writer before being written.
+    batch_size : int
+        Number of pending records that triggers an immediate write.
+    records : queue.Queue
+        Bounded queue of records waiting for the writer thread.
+    backlog : collections.deque
+        Records that did not fit in the queue, in submission order.
+    max_backlog_size : int
+        Most records kept in the backlog, and in a failed batch awaiting retry.
+    writer_thread : threading.Thread or None
+        The background writer thread, started on the first record.
+    records_written : int
+        Total number of records written to the journal.
+    write_errors : int
+        Number of failed write attempts (the affected batch is retried).
+    records_dropped : int
+        Number of records dropped because they could not be serialised or written,
+        did not fit in the backlog or a failed batch, or were unwritten at close;
+        counted by both threads under `stats_lock`.
+    stats_lock : threading.Lock
+        Guards `records_dropped` against the caller and writer threads.
+    retry_delay : float
+        Current delay in seconds before a failed batch is retried; 0 after a success.
+    last_write_latency : float
+        Duration in seconds of the most recent batch write.
+    max_write_latency : float
+        Longest batch write duration in seconds.
 
     Methods:
     -------
-    __init__(file_path: str = "data/auto_save", file_name: str = None) -> None
+    __init__(file_path: str = "data/auto_save", file_name: str = None, flush_interval: float = 1.0, batch_size: int = 500, max_queue_size: int = 10000, max_backlog_size: int = 100000) -> None
         Initializes the AutoSaver instance with a default file path and filename.
     update_arrow_direction(arrow_angle: float) -> None
         Updates the arrow direction in the autosave data with the given angle.
-    add_frame_data(roi_index: int, frame_index: int, velocity: float, timestamp: str) -> None
-        Adds frame-level movement data to the autosave data for a specified ROI.
-    save_to_file() -> None
-        Saves the current autosave data to the file in JSON format.
+    set_wall_anchor(wall_anchor: float) -> None
+        Sets the wall-clock anchor for the numeric frame timestamps.
+    add_frame_data(roi_index: int, frame_index: int, velocity: float, timestamp: float) -> None
+        Appends frame-level movement data for a specified ROI to the journal.
+    append_record(record: dict) -> None
+        Queues a single record for the writer thread without blocking.
+    drop_records(count: int, reason: str) -> None
+        Counts dropped records and reports the first drop.
+    save_to_file(timeout: float = None) -> bool
+        Blocks until all queued records have been written to the journal.
+    close() -> dict
+        Flushes the journal, stops the writer thread, closes the file and returns the statistics.
+    get_statistics() -> dict
+        Returns queue depth, write latency and record counters.
     load_from_file() -> dict
-        Loads previously saved data from the file and returns it as a dictionary.
+        Loads previously saved data from the journal and returns it as a dictionary.
     """
     
     def __init__(self, 
                  file_path: str = "data/auto_save",
-                 file_name: str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")) -> None:
+                 file_name: str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+                 flush_interval: float = 1.0,
+                 batch_size: int = 500,
+                 max_queue_size: int = 10000,
+                 max_backlog_size: int = 100000) -> None:
         
-        self.file_path = f"{file_path}/{file_name}.json"
-        self.data = {
-            "arrow_direction": None,
-            "roi_data": []
-        }
+        self.file_path = f"{file_path}/{file_name}.jsonl"
+        self.data = _empty_data()
+        self.wall_anchor = None
+        self.anchor_pending = False
+        
+        # Background writer
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.records: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.backlog: deque = deque()
+        self.max_backlog_size = max_backlog_size
+        self.writer_thread: threading.Thread = None
+        self.journal = None  # Only touched by the writer thread
+        
+        # Statistics
+        self.records_written = 0
+        self.write_errors = 0
+        self.stats_lock = threading.Lock()
+        self.records_dropped = 0
+        self.retry_delay = 0.0
+        self.retry_at = 0.0  # Monotonic time before which a failed batch is not retried
+        self.last_write_latency = 0.0
+        self.max_write_latency = 0.0
     
     def update_arrow_direction(self, 
                                arrow_angle: float) -> None:
         """
         Updates the overflow direction to the given angle (in radians) in the autosave data.
 
-        The angle is stored as a float in the autosave data.
+        The angle is stored as a float in the autosave data and appended to the journal.
         """
         
         self.data["arrow_direction"] = float(arrow_angle)  # Store as float
+        self.append_record({"type": "arrow", "arrow_direction": self.data["arrow_direction"]})
+    
+    def set_wall_anchor(self, 
+                        wall_anchor: float) -> None:
+        """
+        Sets the wall-clock anchor that numeric frame timestamps refer to.
+
+        The anchor is written to the journal just before the next frame record,
+        so that no journal file is created before there is data to save.
+        """
+        
+        self.wall_anchor = float(wall_anchor)
+        self.anchor_pending = True
     
     def add_frame_data(self, 
                        roi_index: int, 
                        frame_index: int, 
                        velocity: float, 
-                       timestamp: str) -> None:
+                       timestamp: float) -> None:
         """
         Adds frame data to the given ROI index.
 
@@ -90,57 +321,288 @@ class AutoSaver:
 
         The velocity is the detected velocity of the movement in the frame.
 
-        The timestamp is a string representing the time that the frame was detected.
+        The timestamp is the numeric `FrameClock` timestamp of the frame. It is
+        only formatted as a date string when the journal is loaded.
 
-        The data is appended to the existing movement data for the given ROI.
+        Only the new record is queued for the journal; previously saved
+        records are never rewritten.
+        """
+        
+        if self.anchor_pending:
+            self.append_record({"type": "clock", "wall_anchor": self.wall_anchor})
+            self.anchor_pending = False
+        
+        record = {
+            "type": "frame",
+            "roi_index": int(roi_index),
+            "frame_index": int(frame_index),
+            "velocity": float(velocity),
+            "timestamp": float(timestamp),
+        }
+        
+        self.append_record(record)  # Save every update
+    
+    def append_record(self, 
+                      record: dict) -> None:
+        """
+        Queues a single record for the writer thread.
 
-        The data is saved to the autosave file after adding.
+        This never blocks: if the queue is full the record is kept in the
+        backlog and handed to the writer once there is room again. A record
+        that finds the backlog full is dropped and counted.
         """
         
-        # Ensure the ROI exists
-        while len(self.data["roi_data"]) <= roi_index:
-            self.data["roi_data"].append({"ROI Index": len(self.data["roi_data"]) + 1, "Movement Data": []})
+        self.start_writer()
+        self.drain_backlog()
+        
+        if not self.backlog:
+            try:
+                self.records.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+        
+        # Keep the journal in submission order
+        if len(self.backlog) >= self.max_backlog_size:
+            self.drop_records(1, "the backlog is full")
+            return
+        self.backlog.append(record)
+    
+    def drop_records(self,
+                     count: int,
+                     reason: str) -> None:
+        """
+        Counts dropped records and reports the first drop of a series.
+        """
+        with self.stats_lock:
+            first = self.records_dropped == 0
+            self.records_dropped += count
+        if first:
+            print(f"Autosave records dropped, {reason}")
+            
+    def drain_backlog(self, 
+                      block: bool = False) -> None:
+        """
+        Moves backlogged records into the writer queue while there is room.
 
-        velocity = float(velocity)
-        roi_index = int(roi_index)
-        frame_index = int(frame_index)
+        Parameters
+        ----------
+        block : bool
+            If True, wait for room in the queue until the backlog is empty.
+        """
+        while self.backlog:
+            try:
+                self.records.put(self.backlog[0], block=block)
+            except queue.Full:
+                return
+            self.backlog.popleft()
+            
+    def start_writer(self) -> None:
+        """
+        Starts the background writer thread if it is not running yet.
+        """
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            self.writer_thread = threading.Thread(target=self.writer_loop,
+                                                  name="AutoSaverWriter",
+                                                  daemon=True)
+            self.writer_thread.start()
+    
+    def writer_loop(self) -> None:
+        """
+        Body of the writer thread.
+
+        Collects records into a batch and writes it when it reaches
+        `batch_size`, when `flush_interval` has elapsed, or when a flush or
+        stop command arrives. After a failed write, the batch is only
+        retried by a command or once `retry_delay` has passed.
+        """
         
-        # Append movement data
-        self.data["roi_data"][roi_index]["Movement Data"].append({
-            "Frame Index": frame_index,
-            "Velocity": velocity,
-            "Timestamp": timestamp,
-        })
-        self.save_to_file()  # Save every update
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while True:
+            try:
+                item = self.records.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+                
+            if isinstance(item, _WriterCommand):
+                try:
+                    batch = self.write_batch(batch)
+                    if item.stop:
+                        if batch:
+                            with self.stats_lock:
+                                self.records_dropped += len(batch)
+                            print(f"Autosave closed with {len(batch)} unwritten records, counted as dropped")
+                        self.close_journal()
+                finally:
+                    item.done.set()
+                if item.stop:
+                    return
+                deadline = max(time.monotonic() + self.flush_interval, self.retry_at)
+                continue
+            
+            if item is not None:
+                if len(batch) >= self.max_backlog_size:
+                    # The disk keeps failing: the batch awaiting retry is full
+                    self.drop_records(1, "the journal cannot be written")
+                else:
+                    batch.append(item)
+            
+            now = time.monotonic()
+            if (len(batch) >= self.batch_size or now >= deadline) and now >= self.retry_at:
+                batch = self.write_batch(batch)
+                deadline = max(time.monotonic() + self.flush_interval, self.retry_at)
     
-    def save_to_file(self) -> None:
+    def close_journal(self) -> None:
         """
-        Saves the autosave data to the file path specified during initialization.
+        Closes the journal file on the writer thread, ignoring errors.
+        """
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except OSError:
+                pass
+            self.journal = None
+    
+    def write_batch(self, 
+                    batch: list) -> list:
+        """
+        Writes a batch of records to the journal on the writer thread.
 
-        If a serialization error occurs, a TypeError is raised, and the problematic data is printed.
+        Returns the records that still have to be written: an empty list on
+        success, or the serialisable records of the batch if the disk write
+        failed, to be retried after `retry_delay`. Records that cannot be
+        serialised are dropped and counted in `records_dropped`.
         """
+        if not batch:
+            return batch
+        
+        records = []
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, separators=(",", ":")))
+                records.append(record)
+            except Exception as e:  # A bad record must never stop the writer
+                with self.stats_lock:
+                    self.records_dropped += 1
+                print(f"Autosave record dropped, it cannot be serialised ({e}): {record!r:.200}")
+        if not lines:
+            return []
+        
+        start = time.perf_counter()
         try:
-            with open(self.file_path, "w") as f:
-                json.dump(self.data, f, indent=4)
-        except TypeError as e:
-            print(f"Serialization error: {e}")
-            print(f"Problematic data: {self.data}")
-            raise
+            if self.journal is None:
+                self.journal = open(self.file_path, "a")
+            self.journal.write("\n".join(lines) + "\n")
+            self.journal.flush()
+        except OSError as e:
+            self.write_errors += 1
+            self.retry_delay = min(MAX_RETRY_DELAY, max(MIN_RETRY_DELAY, 2 * self.retry_delay))
+            self.retry_at = time.monotonic() + self.retry_delay
+            print(f"Autosave write failed, will retry in {self.retry_delay:.0f} s: {e}")
+            self.close_journal()
+            return records
+        except Exception as e:
+            self.write_errors += 1
+            with self.stats_lock:
+                self.records_dropped += len(records)
+            print(f"Autosave write failed, {len(records)} records dropped: {e}")
+            self.close_journal()
+            return []
+        
+        self.retry_delay = 0.0
+        self.retry_at = 0.0
+        self.last_write_latency = time.perf_counter() - start
+        self.max_write_latency = max(self.max_write_latency, self.last_write_latency)
+        self.records_written += len(lines)
+        return []
+    
+    def save_to_file(self, 
+                     timeout: float = None) -> bool:
+        """
+        Blocks until every record queued so far has been written to the journal.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait in seconds. Waits indefinitely if None.
+
+        Returns
+        -------
+        bool
+            True if the journal was flushed within the timeout.
+        """
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            return not self.backlog and self.records.empty()
+        
+        self.drain_backlog(block=True)
+        command = _WriterCommand()
+        self.records.put(command)
+        return command.done.wait(timeout)
+    
+    def close(self) -> dict:
+        """
+        Flushes the journal, stops the writer thread and closes the file.
+
+        A later record restarts the writer and reopens the journal in append mode.
+
+        Returns
+        -------
+        dict
+            The final statistics, as returned by `get_statistics`.
+        """
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            return self.get_statistics()
+        
+        self.drain_backlog(block=True)
+        command = _WriterCommand(stop=True)
+        self.records.put(command)
+        command.done.wait()
+        self.writer_thread.join()
+        self.writer_thread = None
+        return self.get_statistics()
+        
+    def get_statistics(self) -> dict:
+        """
+        Returns the current state of the background writer.
+
+        Returns
+        -------
+        dict
+            `queue_depth` (records not yet written), `records_written`,
+            `write_errors`, `records_dropped`, `retry_delay`,
+            `last_write_latency` and `max_write_latency` (in seconds).
+        """
+        with self.stats_lock:
+            records_dropped = self.records_dropped
+        return {
+            "queue_depth": self.records.qsize() + len(self.backlog),
+            "records_written": self.records_written,
+            "write_errors": self.write_errors,
+            "records_dropped": records_dropped,
+            "retry_delay": self.retry_delay,
+            "last_write_latency": self.last_write_latency,
+            "max_write_latency": self.max_write_latency,
+        }
     
     def load_from_file(self) -> dict:
         
         """
-        Loads autosave data from the file specified during initialization.
+        Loads autosave data from the journal specified during initialization.
 
         If the file does not exist, returns None.
 
-        Otherwise, loads the JSON data from the file and returns it.
+        Otherwise, flushes any pending records, replays the journal and
+        returns the rebuilt data.
 
         The loaded data is stored in the 'data' attribute of the AutoSaver instance.
         """
+        self.save_to_file()
+        
         if os.path.exists(self.file_path):
-            with open(self.file_path, "r") as f:
-                self.data = json.load(f)
-                return self.data
+            self.data = load_journal(self.file_path)
+            return self.data
             
-        return None        
+        return None
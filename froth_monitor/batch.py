@@ -0,0 +1,320 @@
+"""Batch Analysis Module for Froth Tracker Application.
+
+This module defines the `BatchAnalyzer` class, which re-processes a whole
+directory of recorded videos with the headless pipeline. Whole videos are
+distributed across a `ProcessPoolExecutor`; each worker process limits OpenCV
+to a fixed number of threads so that the pool does not oversubscribe the CPU.
+
+Every video gets its own results file (same layout as the GUI export) and the
+batch writes a combined summary workbook. Results are written to a temporary
+file and renamed when complete, so an interrupted batch can be resumed: videos
+whose results file already exists are skipped. Results are named after the
+video's stem (`run01_results.xlsx`); videos sharing a stem, such as
+`run01.mp4` and `run01.avi`, keep their extension in the name
+(`run01.mp4_results.xlsx`, `run01.avi_results.xlsx`) so they never overwrite
+each other.
+
+Classes:
+--------
+BatchAnalyzer
+    Runs the headless analysis over a directory of videos in parallel.
+
+Imports:
+--------
+- concurrent.futures: For the process pool.
+- cv2: For limiting OpenCV threads in the worker processes.
+- os, time: For file handling and timing.
+- numpy: For summary statistics.
+- openpyxl: For writing the summary and reading existing results.
+- HeadlessAnalyzer: For the per-video analysis.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from openpyxl import Workbook, load_workbook
+
+from .headless import HeadlessAnalyzer
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv")
+SUMMARY_FILENAME = "batch_summary.xlsx"
+
+
+def init_worker(cv_threads: int) -> None:
+    """
+    Initializer of every worker process: limit OpenCV's internal threads.
+    """
+    cv2.setNumThreads(cv_threads)
+
+
+def analyze_video_file(video_path: str,
+                       output_path: str,
+                       rects: list,
+                       arrow_angle: float,
+                       analysis_options: dict = None,
+                       cluster_rois: bool = False) -> dict:
+    """
+    Analyse one video in a worker process and write its results file.
+
+    Parameters
+    ----------
+    video_path : str
+        Path to the video file.
+    output_path : str
+        Path of the results file to write.
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles as (x, y, width, height).
+    arrow_angle : float
+        Overflow direction in degrees.
+    analysis_options : dict, optional
+        Analysis settings passed to every ROI's `VideoAnalysis`.
+    cluster_rois : bool
+        Share one flow field between overlapping or adjacent ROIs.
+
+    Returns
+    -------
+    dict
+        Summary of the video: status, number of analysed frames, processing
+        time and the mean velocity of every ROI.
+    """
+    analyzer = HeadlessAnalyzer(rects, arrow_angle, analysis_options, cluster_rois)
+    analyzer.run(video_path)
+
+    # Write to a temporary file first so that a crash never leaves a
+    # complete-looking results file behind
+    partial_path = f"{output_path}.partial.xlsx"
+    analyzer.export(partial_path)
+    os.replace(partial_path, output_path)
+
+    return {
+        "video": video_path,
+        "output": output_path,
+        "status": "done",
+        "frames": max((roi.analysis_module.get_frame_count() for roi in analyzer.rois), default=0),
+        "elapsed": analyzer.elapsed,
+        "mean_velocities": [float(np.mean(roi.analysis_module.get_velocities()))
+                            if roi.analysis_module.get_frame_count() else None
+                            for roi in analyzer.rois],
+    }
+
+
+def summarize_existing_results(video_path: str,
+                               output_path: str) -> dict:
+    """
+    Build the summary entry of a video whose results file already exists.
+    """
+    workbook = load_workbook(output_path, read_only=True)
+    mean_velocities = []
+    frames = 0
+    for sheet in workbook.worksheets[1:]:
+        if not sheet.title.startswith("ROI"):
+            continue
+        velocities = [row[1] for row in sheet.iter_rows(min_row=2, values_only=True)
+                      if row[1] is not None]
+        frames = max(frames, len(velocities))
+        mean_velocities.append(float(np.mean(velocities)) if velocities else None)
+    workbook.close()
+
+    return {
+        "video": video_path,
+        "output": output_path,
+        "status": "skipped (results exist)",
+        "frames": frames,
+        "elapsed": 0.0,
+        "mean_velocities": mean_velocities,
+    }
+
+
+class BatchAnalyzer:
+    """
+    Batch Analyzer Class for Directories of Recorded Videos.
+
+    Attributes:
+    ----------
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles applied to every video.
+    arrow_angle : float
+        Overflow direction in degrees.
+    output_directory : str
+        Directory receiving the per-video results and the summary.
+    workers : int
+        Number of worker processes.
+    cv_threads : int
+        Number of OpenCV threads per worker process.
+    analysis_options : dict
+        Analysis settings passed to every ROI's `VideoAnalysis`.
+    cluster_rois : bool
+        Share one flow field between overlapping or adjacent ROIs.
+
+    Methods:
+    -------
+    find_videos(directory: str) -> list[str]
+        Lists the video files of a directory.
+    output_path_for(video_path: str, keep_extension: bool = False) -> str
+        Returns the results file of a video.
+    output_paths(videos: list) -> dict
+        Returns a distinct results file for every video.
+    run(directory: str) -> list[dict]
+        Analyses every video that has no results yet and writes the summary.
+    write_summary(summaries: list, summary_path: str) -> None
+        Writes the combined summary workbook.
+    """
+
+    def __init__(self,
+                 rects: list,
+                 arrow_angle: float,
+                 output_directory: str,
+                 workers: int = None,
+                 cv_threads: int = 1,
+                 analysis_options: dict = None,
+                 cluster_rois: bool = False) -> None:
+        """
+        Initialize the batch analyzer.
+
+        Parameters
+        ----------
+        rects : list[tuple[int, int, int, int]]
+            ROI rectangles as (x, y, width, height) in frame pixels.
+        arrow_angle : float
+            Overflow direction in degrees.
+        output_directory : str
+            Directory receiving the results; created if missing.
+        workers : int, optional
+            Number of worker processes. Defaults to the CPU count divided by
+            `cv_threads`.
+        cv_threads : int
+            OpenCV threads per worker (`cv2.setNumThreads`).
+        analysis_options : dict, optional
+            Analysis settings passed to every ROI's `VideoAnalysis`.
+        cluster_rois : bool
+            Share one flow field between overlapping or adjacent ROIs.
+        """
+        self.rects = rects
+        self.arrow_angle = arrow_angle
+        self.output_directory = output_directory
+        self.cv_threads = max(1, int(cv_threads))
+        self.analysis_options = dict(analysis_options or {})
+        self.cluster_rois = cluster_rois
+        self.workers = workers or max(1, (os.cpu_count() or 1) // self.cv_threads)
+
+    def find_videos(self,
+                    directory: str) -> list:
+        """
+        Return the sorted paths of all video files in a directory.
+        """
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.lower().endswith(VIDEO_EXTENSIONS))
+
+    def output_path_for(self,
+                        video_path: str,
+                        keep_extension: bool = False) -> str:
+        """
+        Return the results file of a video inside the output directory.
+
+        The name is built from the file stem, or from the whole file name if
+        `keep_extension` is True.
+        """
+        name = os.path.basename(video_path)
+        if not keep_extension:
+            name, _ = os.path.splitext(name)
+        return os.path.join(self.output_directory, f"{name}_results.xlsx")
+
+    def output_paths(self,
+                     videos: list) -> dict:
+        """
+        Return the results file of every video, keeping the extension in the
+        names of videos whose stems collide (e.g. `run01.mp4` and `run01.avi`).
+        """
+        stems = [os.path.splitext(os.path.basename(video_path))[0].lower() for video_path in videos]
+        return {video_path: self.output_path_for(video_path, keep_extension=stems.count(stem) > 1)
+                for video_path, stem in zip(videos, stems)}
+
+    def run(self,
+            directory: str) -> list:
+        """
+        Analyse every video of a directory that has no results file yet.
+
+        Parameters
+        ----------
+        directory : str
+            Directory containing the videos.
+
+        Returns
+        -------
+        list[dict]
+            One summary per video, in file name order.
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        videos = self.find_videos(directory)
+        output_paths = self.output_paths(videos)
+        summaries = {}
+        pending = []
+
+        for video_path in videos:
+            output_path = output_paths[video_path]
+            if os.path.exists(output_path):
+                summaries[video_path] = summarize_existing_results(video_path, output_path)
+            else:
+                pending.append((video_path, output_path))
+
+        print(f"{len(videos)} videos found, {len(pending)} to analyse "
+              f"with {self.workers} workers x {self.cv_threads} OpenCV threads")
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=init_worker,
+                                 initargs=(self.cv_threads,)) as executor:
+            futures = {executor.submit(analyze_video_file, video_path, output_path,
+                                       self.rects, self.arrow_angle,
+                                       self.analysis_options, self.cluster_rois): (video_path, output_path)
+                       for video_path, output_path in pending}
+
+            for future in as_completed(futures):
+                video_path, output_path = futures[future]
+                try:
+                    summaries[video_path] = future.result()
+                except Exception as e:
+                    print(f"Analysis of {video_path} failed: {e}")
+                    summaries[video_path] = {
+                        "video": video_path,
+                        "output": output_path,
+                        "status": f"failed: {e}",
+                        "frames": 0,
+                        "elapsed": 0.0,
+                        "mean_velocities": [],
+                    }
+
+        print(f"Batch finished in {time.perf_counter() - start:.1f} s")
+
+        ordered = [summaries[video_path] for video_path in videos]
+        self.write_summary(ordered, os.path.join(self.output_directory, SUMMARY_FILENAME))
+        return ordered
+
+    def write_summary(self,
+                      summaries: list,
+                      summary_path: str) -> None:
+        """
+        Write the combined summary workbook, one row per video.
+        """
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Summary"
+        ws.append(["Video",
+                   "Results File",
+                   "Status",
+                   "Analysed Frames",
+                   "Processing Time (s)"]
+                  + [f"ROI {i + 1} Mean Velocity(pixels/frame)" for i in range(len(self.rects))])
+
+        for summary in summaries:
+            ws.append([summary["video"],
+                       summary["output"],
+                       summary["status"],
+                       summary["frames"],
+                       summary["elapsed"]]
+                      + list(summary["mean_velocities"]))
+
+        wb.save(summary_path)
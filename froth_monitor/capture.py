@@ -0,0 +1,418 @@
+"""Frame Capture Module for Froth Tracker Application.
+
+This module defines the `FrameCapture` class, which reads frames from an
+OpenCV `VideoCapture` on a dedicated worker thread and hands them to the GUI
+and the analysis through a bounded queue. Capture therefore keeps its own pace
+even when a GUI tick or an analysis step is slow.
+
+Drop policies:
+--------------
+- DROP_OLDEST ("latest"): when the queue is full the oldest frame is discarded
+  so that consumers always get the most recent frame. Use this for live
+  cameras, where stale frames are worthless.
+- BLOCK ("block"): the worker waits until there is room in the queue, so no
+  frame is ever discarded. Use this for video files.
+
+Paced playback:
+---------------
+A video file can be read much faster than it was recorded. With a
+`FramePacer` (see `froth_monitor.pacing`) the worker waits until each frame
+is due at the file's own frame rate, or at a multiple of it, and skips
+overdue frames with `VideoCapture.grab` when playback falls behind. Paced
+frames are timestamped with their media time (`CAP_PROP_POS_MSEC`), offset
+so that the first frame gets the clock time at which playback started, so
+frame intervals are exact instead of reflecting decode and scheduling jitter.
+
+The timestamps of captured frames also feed an `FPSEstimator`, so the rate
+at which the source actually delivers frames is known at any time without
+reading or discarding frames for a measurement.
+
+Releasing the source:
+---------------------
+A `VideoCapture` must not be released while the worker is inside `read()` or
+`grab()`, which can crash in the native library. `stop(release=True)` releases
+it only once the worker has exited; if the worker is still blocked in a read
+when the join times out (e.g. a camera that stopped delivering), the worker
+releases the source itself when that read returns.
+
+Classes:
+--------
+FrameCapture
+    Background frame reader with a bounded queue, a drop policy and
+    dropped/late frame counters.
+
+Imports:
+--------
+- cv2: For reading frames from the video source.
+- queue, threading: For the worker thread and the frame queue.
+- FrameClock: For timestamping frames when they are captured.
+- FramePacer: For pacing video file playback.
+- FPSEstimator: For the running estimate of the source frame rate.
+"""
+
+import queue
+import threading
+
+import cv2
+from .frame_clock import FrameClock
+from .pacing import FramePacer
+from .fps_estimator import FPSEstimator
+
+DROP_OLDEST = "latest"
+BLOCK = "block"
+
+
+class FrameCapture:
+    """
+    Frame Capture Class for Reading Frames on a Worker Thread.
+
+    Each item returned by `read` is a tuple `(frame, timestamp, frame_index)`
+    where the timestamp is taken from the shared `FrameClock` right after the
+    frame was read (or is the media time of a paced frame), and `frame_index`
+    counts frames read from the source starting at 1, including skipped ones.
+
+    Attributes:
+    ----------
+    video_capture : cv2.VideoCapture
+        The opened video source. Only the worker thread reads from it.
+    clock : FrameClock
+        The clock used to timestamp frames.
+    drop_policy : str
+        Either DROP_OLDEST or BLOCK.
+    late_threshold : float
+        Age in seconds above which a consumed frame counts as late.
+    pacer : FramePacer or None
+        Paces video file playback; None reads frames as fast as they are consumed.
+    frames : queue.Queue
+        Bounded queue of captured frames.
+    frames_captured : int
+        Number of frames read from the source.
+    frames_dropped : int
+        Number of frames discarded because the queue was full.
+    frames_late : int
+        Number of frames that were older than `late_threshold` when consumed.
+    frames_skipped : int
+        Number of overdue frames the pacer skipped without decoding them.
+    rate : FPSEstimator
+        Running estimate of the source frame rate from the capture timestamps.
+    source_exhausted : bool
+        True once the source returned no more frames.
+
+    Methods:
+    -------
+    start() -> None
+        Starts the worker thread.
+    stop(release: bool = False) -> bool
+        Stops the worker thread, discards queued frames and optionally releases the source.
+    read(timeout: float = 0.0) -> tuple or None
+        Returns the next captured frame, or None if none is available.
+    resync() -> None
+        Re-anchors paced playback at the next frame, e.g. after a pause.
+    is_finished() -> bool
+        Returns True when the source is exhausted and the queue is empty.
+    get_fps(default: float = None) -> float or None
+        Returns the measured source frame rate once reliable, else `default`.
+    get_statistics() -> dict
+        Returns the frame counters, the queue depth and the measured frame rate.
+    """
+
+    def __init__(self,
+                 video_capture: cv2.VideoCapture,
+                 clock: FrameClock = None,
+                 drop_policy: str = DROP_OLDEST,
+                 max_queue_size: int = 4,
+                 late_threshold: float = 0.1,
+                 pacer: FramePacer = None) -> None:
+        """
+        Initialize the frame capture for an opened video source.
+
+        Parameters
+        ----------
+        video_capture : cv2.VideoCapture
+            The opened video source.
+        clock : FrameClock, optional
+            The clock used to timestamp frames. A new clock is created if None.
+        drop_policy : str
+            DROP_OLDEST for live cameras, BLOCK for video files.
+        max_queue_size : int
+            Maximum number of frames waiting for a consumer.
+        late_threshold : float
+            Age in seconds above which a consumed frame counts as late.
+        pacer : FramePacer, optional
+            Paces the playback of a video file. Use with BLOCK.
+        """
+        if drop_policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.video_capture = video_capture
+        self.clock = clock if clock is not None else FrameClock()
+        self.drop_policy = drop_policy
+        self.late_threshold = late_threshold
+        self.pacer = pacer
+        self.frames: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.media_time = None  # Media time of the last paced frame
+        self.media_anchor = None  # Clock time of media time 0
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_late = 0
+        self.frames_skipped = 0
+        self.source_exhausted = False
+        self.rate = FPSEstimator()
+        self.last_rated_index = 0
+
+        self.stop_event = threading.Event()
+        self.worker_thread: threading.Thread = None
+        self.release_lock = threading.Lock()
+        self.worker_done = True  # False while a worker may be using the source
+        self.release_on_exit = False
+
+    def start(self) -> None:
+        """
+        Start reading frames on the worker thread.
+        """
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.worker_done = False
+        self.worker_thread = threading.Thread(target=self.capture_loop,
+                                              name="FrameCapture",
+                                              daemon=True)
+        self.worker_thread.start()
+
+    def stop(self,
+             release: bool = False,
+             timeout: float = 2.0) -> bool:
+        """
+        Stop the worker thread and discard any queued frames.
+
+        Parameters
+        ----------
+        release : bool
+            Also release the video source. If the worker is still reading
+            after `timeout`, it releases the source itself when it exits, so
+            the source is never released during a read.
+        timeout : float
+            Time in seconds to wait for the worker to exit.
+
+        Returns
+        -------
+        bool
+            True if the worker has exited.
+        """
+        self.stop_event.set()
+        self.clear_queue()  # Unblock a worker waiting for room
+        if self.worker_thread is not None:
+            self.worker_thread.join(timeout=timeout)
+            self.worker_thread = None
+        self.clear_queue()
+
+        with self.release_lock:
+            stopped = self.worker_done
+            if release:
+                if stopped:
+                    self.video_capture.release()
+                else:
+                    print("Capture worker still reading; it will release the source when the read returns")
+                    self.release_on_exit = True
+        return stopped
+
+    def clear_queue(self) -> None:
+        """
+        Discard all queued frames.
+        """
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                return
+
+    def capture_loop(self) -> None:
+        """
+        Body of the worker thread: read frames until stopped or exhausted,
+        then release the source if `stop` asked for it while it was reading.
+        """
+        try:
+            self.read_frames()
+        finally:
+            with self.release_lock:
+                self.worker_done = True
+                if self.release_on_exit:
+                    self.video_capture.release()
+
+    def read_frames(self) -> None:
+        """
+        Read, pace and queue frames until stopped or the source is exhausted.
+        """
+        while not self.stop_event.is_set():
+            if self.pacer is not None and not self.skip_overdue_frames():
+                self.source_exhausted = True
+                return
+
+            ret, frame = self.video_capture.read()
+            if not ret:
+                self.source_exhausted = True
+                return
+
+            self.frames_captured += 1
+            captured_at = self.clock.now()
+            timestamp = captured_at
+            if self.pacer is not None:
+                timestamp = self.pace_frame(captured_at)
+                if timestamp is None:
+                    return
+                captured_at = self.clock.now()  # Lateness counts from when the frame was due
+            
+            self.rate.update(timestamp, self.frames_captured - self.last_rated_index)
+            self.last_rated_index = self.frames_captured
+            self.enqueue((frame, timestamp, self.frames_captured, captured_at))
+
+    def read_media_time(self) -> float:
+        """
+        Return the media time in seconds of the frame just read or grabbed.
+
+        Falls back to the frame number and the nominal frame rate for
+        backends that do not report positions.
+        """
+        position = self.video_capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        if position > 0 or self.frames_captured <= 1:
+            return position
+        return (self.frames_captured - 1) / self.pacer.fps
+
+    def skip_overdue_frames(self) -> bool:
+        """
+        Grab, without decoding, the frames the pacer reports as overdue.
+
+        Returns
+        -------
+        bool
+            False if the source was exhausted while skipping.
+        """
+        if self.media_time is None:
+            return True
+
+        for _ in range(self.pacer.frames_behind(self.media_time + 1 / self.pacer.fps)):
+            if not self.video_capture.grab():
+                return False
+            self.frames_captured += 1
+            self.frames_skipped += 1
+        return True
+
+    def pace_frame(self,
+                   captured_at: float) -> float:
+        """
+        Wait until the frame just read is due and return its timestamp.
+
+        Returns
+        -------
+        float or None
+            The media-time timestamp, or None if stopped while waiting.
+        """
+        self.media_time = self.read_media_time()
+        if self.media_anchor is None:
+            self.media_anchor = captured_at - self.media_time
+
+        delay = self.pacer.delay(self.media_time)
+        if delay > 0 and self.stop_event.wait(delay):
+            return None
+        return self.media_anchor + self.media_time
+
+    def resync(self) -> None:
+        """
+        Re-anchor paced playback at the next frame, so that time spent paused
+        is not made up by skipping frames.
+        """
+        if self.pacer is not None:
+            self.pacer.resync()
+
+    def enqueue(self,
+                item: tuple) -> None:
+        """
+        Put a captured frame on the queue according to the drop policy.
+        """
+        if self.drop_policy == BLOCK:
+            while not self.stop_event.is_set():
+                try:
+                    self.frames.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        while True:
+            try:
+                self.frames.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.frames_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def read(self,
+             timeout: float = 0.0) -> tuple:
+        """
+        Return the next captured frame.
+
+        Parameters
+        ----------
+        timeout : float
+            Time in seconds to wait for a frame. 0 returns immediately.
+
+        Returns
+        -------
+        tuple or None
+            `(frame, timestamp, frame_index)`, or None if no frame is available.
+        """
+        try:
+            if timeout > 0:
+                item = self.frames.get(timeout=timeout)
+            else:
+                item = self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+        frame, timestamp, frame_index, captured_at = item
+        if self.clock.now() - captured_at > self.late_threshold:
+            self.frames_late += 1
+
+        return frame, timestamp, frame_index
+
+    def is_finished(self) -> bool:
+        """
+        Return True when the source is exhausted and every frame was consumed.
+        """
+        return self.source_exhausted and self.frames.empty()
+
+    def get_fps(self,
+                default: float = None) -> float:
+        """
+        Return the measured source frame rate, or `default` until enough
+        frames were captured for a reliable estimate.
+        """
+        if not self.rate.is_ready():
+            return default
+        return self.rate.fps()
+
+    def get_statistics(self) -> dict:
+        """
+        Return the capture counters.
+
+        Returns
+        -------
+        dict
+            `frames_captured`, `frames_dropped`, `frames_late`,
+            `frames_skipped`, `queue_depth`, and the measured `fps` and
+            `fps_jitter_ms` (None and 0 until the first interval).
+        """
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "frames_late": self.frames_late,
+            "frames_skipped": self.frames_skipped,
+            "queue_depth": self.frames.qsize(),
+            "fps": self.rate.fps(),
+            "fps_jitter_ms": self.rate.jitter() * 1000.0,
+        }
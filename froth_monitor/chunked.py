@@ -0,0 +1,346 @@
+"""Chunk-Parallel Analysis Module for Froth Tracker Application.
+
+This module defines the `ChunkedAnalyzer` class, which analyses a single long
+video on several CPU cores. The video is split into N contiguous segments of
+frames; each segment is analysed by a separate worker process that seeks to
+the segment start with `CAP_PROP_POS_FRAMES`.
+
+Optical flow is computed between consecutive frames, so every segment except
+the first also reads the frame just before its start (a one-frame overlap).
+That frame only primes the analyzer, which means each inter-frame flow is
+computed exactly once and no flow is lost at a segment boundary. The
+per-segment velocity histories are stitched back together in frame order.
+
+Timestamps are media time (frame number / fps), so the stitched result is
+identical to a sequential `HeadlessAnalyzer` run provided the container
+supports frame-accurate seeking (`verify=True` checks this). With a flow
+stride N, segments start one frame after a multiple of N, so the frame that
+primes a segment is one the sequential run measures from and the stride
+phase carries over. With frame-change gating, a target rate or an estimator
+that keeps state between frames (`STATEFUL_ESTIMATORS`) the exception is the
+start of each segment: a segment starts from a fresh reference frame and
+estimator, so the frames right after a boundary can differ from the
+sequential run.
+
+The time of a run is reported together with its concurrency, the summed
+processing time of the segments divided by the wall time, i.e. how many
+segments were in progress on average. This is not a speedup: on an
+oversubscribed machine every segment takes longer. `verify=True` measures
+the actual speedup over the sequential run.
+
+Classes:
+--------
+ChunkedAnalyzer
+    Splits one video into segments, analyses them in parallel and stitches the results.
+
+Imports:
+--------
+- concurrent.futures: For the process pool.
+- cv2: For reading and seeking the video.
+- numpy: For the per-segment result arrays.
+- time: For timing, concurrency and speedup reporting.
+- HeadlessAnalyzer, init_worker: The shared headless pipeline and worker setup.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from .batch import init_worker
+from .frame_clock import FrameClock
+from .headless import HeadlessAnalyzer
+
+STATEFUL_ESTIMATORS = ("farneback-warm", "lucas-kanade")  # Carry state from frame to frame
+
+
+def analyze_segment(video_path: str,
+                    rects: list,
+                    arrow_angle: float,
+                    fps: float,
+                    start: int,
+                    stop: int,
+                    analysis_options: dict = None,
+                    cluster_rois: bool = False) -> dict:
+    """
+    Analyse the frames [start, stop) of a video in a worker process.
+
+    Parameters
+    ----------
+    video_path : str
+        Path to the video file.
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles as (x, y, width, height).
+    arrow_angle : float
+        Overflow direction in degrees.
+    fps : float
+        Frame rate of the video, used for media timestamps.
+    start : int
+        First frame of the segment.
+    stop : int or None
+        End of the segment (exclusive). None reads to the end of the video.
+    analysis_options : dict, optional
+        Analysis settings passed to every ROI's `VideoAnalysis`.
+    cluster_rois : bool
+        Share one flow field between overlapping or adjacent ROIs.
+
+    Returns
+    -------
+    dict
+        `start`, `elapsed` and, under `rois`, one dict per ROI with the
+        velocity, flow_x, flow_y, timestamp and skipped arrays of the segment
+        and its `frames_skipped` count of the frame-change gate.
+    """
+    began = time.perf_counter()
+    analyzer = HeadlessAnalyzer(rects, arrow_angle, analysis_options, cluster_rois)
+    rois = analyzer.create_rois(FrameClock())
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Could not open the video file: {video_path}")
+
+    # Read one frame before the segment to prime the flow computation
+    frame_index = max(0, start - 1)
+    if frame_index > 0:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+
+    try:
+        while stop is None or frame_index < stop:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            analyzer.analyze_frame(rois, frame, frame_index / fps)
+            frame_index += 1
+    finally:
+        capture.release()
+
+    results = []
+    for roi in rois:
+        history = roi.analysis_module.velocity_history
+        results.append({
+            "velocity": history.velocities.copy(),
+            "flow_x": history.flow_x.copy(),
+            "flow_y": history.flow_y.copy(),
+            "timestamp": history.timestamps.copy(),
+            "skipped": history.skipped.copy(),
+            "frames_skipped": roi.analysis_module.frames_skipped,
+        })
+
+    return {"start": start, "elapsed": time.perf_counter() - began, "rois": results}
+
+
+class ChunkedAnalyzer(HeadlessAnalyzer):
+    """
+    Chunked Analyzer Class for Parallel Analysis of One Long Video.
+
+    Attributes:
+    ----------
+    arrow_angle_degrees : float
+        Overflow direction in degrees, passed unchanged to the workers.
+    segments : int
+        Number of segments (and worker processes).
+    cv_threads : int
+        Number of OpenCV threads per worker process.
+    segment_times : list[float]
+        Processing time of every segment in the most recent run.
+    concurrency : float
+        Sum of the segment times divided by the wall time of the most recent
+        run: the average number of segments in progress. Not a speedup.
+    speedup : float or None
+        Sequential wall time divided by parallel wall time, measured by the
+        verification run, or None if none was made.
+    sequential_elapsed : float or None
+        Wall time of the sequential verification run, if one was made.
+
+    Methods:
+    -------
+    segment_bounds(frame_count: int) -> list[tuple[int, int]]
+        Splits the frame range into contiguous segments aligned to the stride.
+    boundary_effect() -> str or None
+        Names the analysis setting that makes segment starts differ from the sequential run.
+    run(video_path: str, max_frames: int = None, verify: bool = False) -> list[ROI]
+        Analyses the video in parallel and stitches the results.
+    verify_against_sequential(video_path: str, max_frames: int = None) -> bool
+        Runs the sequential analysis and compares it with the stitched result.
+    """
+
+    def __init__(self,
+                 rects: list,
+                 arrow_angle: float,
+                 segments: int = 4,
+                 cv_threads: int = 1,
+                 analysis_options: dict = None,
+                 cluster_rois: bool = False) -> None:
+        """
+        Initialize the chunked analyzer.
+
+        Parameters
+        ----------
+        rects : list[tuple[int, int, int, int]]
+            ROI rectangles as (x, y, width, height) in frame pixels.
+        arrow_angle : float
+            Overflow direction in degrees.
+        segments : int
+            Number of segments analysed in parallel.
+        cv_threads : int
+            OpenCV threads per worker (`cv2.setNumThreads`).
+        analysis_options : dict, optional
+            Analysis settings passed to every ROI's `VideoAnalysis`.
+        cluster_rois : bool
+            Share one flow field between overlapping or adjacent ROIs.
+        """
+        super().__init__(rects, arrow_angle, analysis_options, cluster_rois)
+        self.arrow_angle_degrees = arrow_angle
+        self.segments = max(1, int(segments))
+        self.cv_threads = max(1, int(cv_threads))
+        self.segment_times: list = []
+        self.concurrency = 1.0
+        self.speedup = None
+        self.sequential_elapsed = None
+
+    def segment_bounds(self,
+                       frame_count: int) -> list:
+        """
+        Split the frames [0, frame_count) into contiguous segments.
+
+        The last segment is open-ended (stop is None) so that frames beyond an
+        inaccurate CAP_PROP_FRAME_COUNT are still analysed. With a flow stride
+        N (and no target rate), every segment starts at a frame k*N + 1: its
+        priming frame k*N is a reference frame of the sequential run, so the
+        flow intervals are the same.
+        """
+        segments = max(1, min(self.segments, frame_count // 2))
+        edges = np.linspace(0, frame_count, segments + 1).astype(int).tolist()
+
+        stride = int(self.analysis_options.get("stride") or 1)
+        if stride > 1 and self.analysis_options.get("target_hz") is None:
+            inner = [round((edge - 1) / stride) * stride + 1 for edge in edges[1:-1]]
+            edges = sorted({0, frame_count, *(edge for edge in inner if 0 < edge < frame_count)})
+            segments = len(edges) - 1
+
+        bounds = [(edges[i], edges[i + 1]) for i in range(segments)]
+        bounds[-1] = (bounds[-1][0], None)
+        return bounds
+
+    def run(self,
+            video_path: str,
+            max_frames: int = None,
+            verify: bool = False) -> list:
+        """
+        Analyse a video in parallel segments and stitch the results.
+
+        Parameters
+        ----------
+        video_path : str
+            Path to the video file.
+        max_frames : int, optional
+            Only analyse the first N frames.
+        verify : bool
+            Also run the sequential analysis, check that both results are
+            identical and report the measured speedup.
+
+        Returns
+        -------
+        list[ROI]
+            The ROIs holding the stitched velocity history.
+        """
+        capture = self.open_video(video_path)
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+
+        if max_frames is not None:
+            frame_count = min(frame_count, max_frames) if frame_count > 0 else max_frames
+
+        if frame_count <= 0:
+            # Unknown length: seeking is not possible, fall back to one pass
+            return super().run(video_path, max_frames=max_frames)
+
+        bounds = self.segment_bounds(frame_count)
+        if max_frames is not None:
+            bounds[-1] = (bounds[-1][0], frame_count)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=len(bounds),
+                                 initializer=init_worker,
+                                 initargs=(self.cv_threads,)) as executor:
+            futures = [executor.submit(analyze_segment, video_path, self.rects,
+                                       self.arrow_angle_degrees, self.fps, seg_start, seg_stop,
+                                       self.analysis_options, self.cluster_rois)
+                       for seg_start, seg_stop in bounds]
+            results = [future.result() for future in futures]
+        self.elapsed = time.perf_counter() - start
+
+        self.rois = self.create_rois(self.clock)
+        for result in sorted(results, key=lambda r: r["start"]):
+            for roi, columns in zip(self.rois, result["rois"]):
+                analysis = roi.analysis_module
+                for velocity, flow_x, flow_y, timestamp, skipped in zip(columns["velocity"].tolist(),
+                                                                        columns["flow_x"].tolist(),
+                                                                        columns["flow_y"].tolist(),
+                                                                        columns["timestamp"].tolist(),
+                                                                        columns["skipped"].tolist()):
+                    analysis.velocity_history.append(velocity, flow_x, flow_y, timestamp, skipped)
+                    analysis.current_velocity = velocity
+                # The skipped column also marks stride and target-rate rows,
+                # which the gate's own counter leaves out
+                analysis.frames_skipped += columns["frames_skipped"]
+
+        self.frames_read = max((roi.analysis_module.get_frame_count() for roi in self.rois), default=0) + 1
+        self.segment_times = [result["elapsed"] for result in results]
+        self.concurrency = sum(self.segment_times) / max(self.elapsed, 1e-9)
+        self.speedup = None
+        print(f"Analysed {self.frames_read} frames of {video_path} in {len(bounds)} segments "
+              f"in {self.elapsed:.1f} s (concurrency {self.concurrency:.2f}: segments in progress "
+              f"on average, not a speedup)")
+
+        if verify:
+            self.verify_against_sequential(video_path, max_frames)
+
+        return self.rois
+
+    def boundary_effect(self) -> str:
+        """
+        Return the analysis setting that restarts at every segment and can
+        make the frames after a boundary differ from the sequential run, or
+        None if segment starts do not change the results.
+        """
+        if self.analysis_options.get("change_threshold") is not None:
+            return "frame-change gating restarts from a fresh reference frame in every segment"
+        if self.analysis_options.get("target_hz") is not None:
+            return "target-rate decimation restarts from a fresh reference frame in every segment"
+        estimator = self.analysis_options.get("estimator", "farneback")
+        if estimator in STATEFUL_ESTIMATORS:
+            return f"the {estimator} estimator starts without its state in every segment"
+        return None
+
+    def verify_against_sequential(self,
+                                  video_path: str,
+                                  max_frames: int = None) -> bool:
+        """
+        Run the sequential analysis and compare it with the stitched result.
+
+        Returns
+        -------
+        bool
+            True if every ROI's velocities and timestamps are identical.
+        """
+        sequential = HeadlessAnalyzer(self.rects, self.arrow_angle_degrees, self.analysis_options,
+                                      self.cluster_rois)
+        sequential.run(video_path, max_frames=max_frames)
+        self.sequential_elapsed = sequential.elapsed
+        self.speedup = sequential.elapsed / max(self.elapsed, 1e-9)
+
+        identical = all(
+            np.array_equal(parallel.analysis_module.get_velocities(), reference.analysis_module.get_velocities())
+            and np.array_equal(parallel.analysis_module.get_timestamps(), reference.analysis_module.get_timestamps())
+            for parallel, reference in zip(self.rois, sequential.rois)
+        )
+
+        if identical:
+            verdict = "identical"
+        else:
+            verdict = f"DIFFERENT ({self.boundary_effect() or 'seeking is not frame-accurate'})"
+        print(f"Sequential run: {sequential.elapsed:.1f} s, parallel run: {self.elapsed:.1f} s, "
+              f"measured speedup {self.speedup:.2f}x, results {verdict}")
+        return identical
@@ -0,0 +1,319 @@
+"""Command Line Module for Froth Tracker Application.
+
+This module implements the command line entry points that run without the
+GUI. They are dispatched from `python -m froth_monitor <command>`; running the
+package without a command still starts the GUI.
+
+Commands:
+---------
+analyze
+    Analyse a recorded video headlessly and export the results::
+
+        python -m froth_monitor analyze VIDEO --roi X Y W H [--roi X Y W H ...]
+                                        --angle DEGREES [--output FILE]
+                                        [--jobs N [--verify]]
+                                        [--estimator NAME] [--downscale F | --pixel-budget N]
+                                        [--cluster] [--roi-threads N]
+                                        [--skip-static [THRESHOLD]] [--static-velocity zero|hold]
+                                        [--stride N | --target-hz HZ]
+
+    With --jobs N the video is split into N segments analysed in parallel
+    and stitched back together; --verify also runs the sequential analysis
+    to check that the results are identical and to measure the speedup.
+    --estimator selects the motion estimator (see `froth_monitor.estimators`);
+    --downscale and --pixel-budget compute the flow at reduced resolution
+    (see `froth_monitor.image_analysis` for the accuracy trade-off).
+    --cluster computes one flow field per group of overlapping or adjacent
+    ROIs (see `froth_monitor.multi_roi`). --roi-threads N analyses the ROIs
+    of each frame on N threads (ignored with --jobs). --skip-static records
+    frames that barely differ from the previous analysed frame without
+    computing their flow (flagged in the results; see
+    `froth_monitor.image_analysis`). --stride N and --target-hz HZ compute
+    the flow only every N frames or at about HZ per second; the frames in
+    between are recorded with the velocity spread evenly over the interval.
+
+batch
+    Analyse every video of a directory on a process pool, writing one results
+    file per video and a combined summary. Videos that already have results
+    are skipped, so an interrupted batch can simply be started again::
+
+        python -m froth_monitor batch DIRECTORY --roi X Y W H --angle DEGREES
+                                      [--output-dir DIR] [--workers N] [--cv-threads K]
+                                      [--estimator NAME] [--downscale F | --pixel-budget N]
+                                      [--cluster]
+
+engine
+    Run capture and analysis as a standalone engine process that monitor
+    clients connect to (see `froth_monitor.engine`). SOURCE is a camera index
+    or a video file::
+
+        python -m froth_monitor engine SOURCE --roi X Y W H --angle DEGREES
+                                       [--port P] [--key-file FILE] [--output FILE] [--max-frames N]
+                                       [--preview-width W] [--no-autosave] [--adaptive-quality]
+                                       [--estimator NAME] [--downscale F | --pixel-budget N]
+                                       [--cluster] [--roi-threads N]
+
+    --adaptive-quality lowers the quality of expensive ROIs whenever the
+    analysis of a frame takes longer than the camera's frame period allows
+    (video files are read as fast as they are analysed and are left alone),
+    and raises it again when there is time to spare (see
+    `froth_monitor.quality`); every change is logged in the results file.
+
+    Every run generates a random key and writes it to a file only the user
+    can read (by default ~/.froth_monitor/engine-PORT.key, or --key-file);
+    monitors read it from there, so only the user's own processes connect.
+
+monitor
+    Open a thin GUI client showing the preview, velocities and status of a
+    running engine. It reconnects automatically, so it can be closed and
+    restarted without interrupting the analysis::
+
+        python -m froth_monitor monitor [--host HOST] [--port P] [--key-file FILE]
+
+Functions:
+----------
+build_parser() -> argparse.ArgumentParser
+    Builds the argument parser for all commands.
+analysis_options(args: argparse.Namespace) -> dict
+    Collects the VideoAnalysis settings given on the command line.
+main(argv: list = None) -> int
+    Parses the arguments and runs the selected command.
+
+Imports:
+--------
+- argparse, os: For argument parsing and output paths.
+- HeadlessAnalyzer: For offline analysis of video files.
+- ChunkedAnalyzer: For parallel analysis of one long video.
+- BatchAnalyzer: For parallel analysis of directories of videos.
+- ESTIMATORS: For the names of the selectable motion estimators.
+- AnalysisEngine: For the standalone analysis engine.
+"""
+
+import argparse
+import os
+
+from .headless import HeadlessAnalyzer
+from .chunked import ChunkedAnalyzer
+from .batch import BatchAnalyzer
+from .estimators import ESTIMATORS
+from .engine import AnalysisEngine, DEFAULT_ADDRESS
+from .image_analysis import DEFAULT_CHANGE_THRESHOLD, STATIC_VELOCITIES
+
+COMMANDS = ("analyze", "batch", "engine", "monitor")
+
+
+def default_output_path(video_path: str) -> str:
+    """
+    Return the default results file for a video: <video>_results.xlsx next to it.
+    """
+    stem, _ = os.path.splitext(video_path)
+    return f"{stem}_results.xlsx"
+
+
+def add_roi_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the ROI and overflow direction arguments shared by all analysis commands.
+    """
+    parser.add_argument("--roi", nargs=4, type=int, action="append", required=True,
+                        metavar=("X", "Y", "W", "H"),
+                        help="ROI rectangle in frame pixels. Repeat for several ROIs.")
+    parser.add_argument("--angle", type=float, default=90.0,
+                        help="Overflow direction in degrees (0 = right, 90 = down). Default: 90.")
+    parser.add_argument("--estimator", choices=list(ESTIMATORS), default="farneback",
+                        help="Motion estimator used for every ROI. Default: farneback.")
+    parser.add_argument("--downscale", type=float, default=1.0,
+                        help="Shrink every ROI by this factor before computing flow. "
+                             "Faster, but less sensitive to slow motion. Default: 1 (full resolution).")
+    parser.add_argument("--pixel-budget", type=int,
+                        help="Shrink ROIs larger than this many pixels so that the flow "
+                             "is computed on at most this many pixels.")
+    parser.add_argument("--cluster", action="store_true",
+                        help="Compute one flow field per group of overlapping or adjacent ROIs "
+                             "instead of one per ROI (dense estimators only).")
+    parser.add_argument("--skip-static", type=float, nargs="?", const=DEFAULT_CHANGE_THRESHOLD,
+                        metavar="THRESHOLD",
+                        help="Do not compute flow for frames that differ from the previous analysed "
+                             "frame by at most THRESHOLD grey levels on average "
+                             f"(default {DEFAULT_CHANGE_THRESHOLD}; 0 skips exact duplicates only).")
+    parser.add_argument("--static-velocity", choices=STATIC_VELOCITIES, default="zero",
+                        help="Velocity recorded for skipped frames: zero, or hold the previous one. "
+                             "Default: zero.")
+    decimation = parser.add_mutually_exclusive_group()
+    decimation.add_argument("--stride", type=int, default=1,
+                            help="Compute the flow only between frames N apart (for slow froth). Default: 1.")
+    decimation.add_argument("--target-hz", type=float,
+                            help="Compute the flow at about this many times per second instead.")
+
+
+def analysis_options(args: argparse.Namespace) -> dict:
+    """
+    Collect the VideoAnalysis settings given on the command line.
+    """
+    return {"estimator": args.estimator, "downscale": args.downscale, "pixel_budget": args.pixel_budget,
+            "change_threshold": args.skip_static, "static_velocity": args.static_velocity,
+            "stride": args.stride, "target_hz": args.target_hz}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the command line interface.
+    """
+    parser = argparse.ArgumentParser(prog="python -m froth_monitor",
+                                     description="Froth monitor command line tools. "
+                                                 "Run without a command to start the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subparsers.add_parser("analyze",
+                                    help="Analyse a recorded video without the GUI.")
+    analyze.add_argument("video",
+                         help="Path to the video file.")
+    add_roi_arguments(analyze)
+    analyze.add_argument("--output",
+                         help="Excel file to write. Default: <video>_results.xlsx.")
+    analyze.add_argument("--max-frames", type=int,
+                         help="Only analyse the first N frames.")
+    analyze.add_argument("--jobs", type=int, default=1,
+                         help="Split the video into N segments analysed in parallel. Default: 1.")
+    analyze.add_argument("--verify", action="store_true",
+                         help="With --jobs, also run sequentially and check the results are identical.")
+    analyze.add_argument("--roi-threads", type=int, default=1,
+                         help="Analyse the ROIs of each frame on N threads. Ignored with --jobs. Default: 1.")
+
+    batch = subparsers.add_parser("batch",
+                                  help="Analyse every video of a directory in parallel.")
+    batch.add_argument("directory",
+                       help="Directory containing .mp4/.avi/.mkv files.")
+    add_roi_arguments(batch)
+    batch.add_argument("--output-dir",
+                       help="Directory for results and summary. Default: <directory>/results.")
+    batch.add_argument("--workers", type=int,
+                       help="Number of worker processes. Default: CPU count / --cv-threads.")
+    batch.add_argument("--cv-threads", type=int, default=1,
+                       help="OpenCV threads per worker process. Default: 1.")
+
+    engine = subparsers.add_parser("engine",
+                                   help="Run capture and analysis as a standalone engine process.")
+    engine.add_argument("source",
+                        help="Camera index (e.g. 0) or path to a video file.")
+    add_roi_arguments(engine)
+    engine.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1],
+                        help=f"Port monitor clients connect to. Default: {DEFAULT_ADDRESS[1]}.")
+    engine.add_argument("--key-file",
+                        help="File the engine's random key is written to. "
+                             "Default: ~/.froth_monitor/engine-PORT.key.")
+    engine.add_argument("--output",
+                        help="Excel file written when the engine finishes.")
+    engine.add_argument("--max-frames", type=int,
+                        help="Stop after N frames.")
+    engine.add_argument("--preview-width", type=int, default=640,
+                        help="Width of the preview frames shared with monitors. Default: 640.")
+    engine.add_argument("--no-autosave", action="store_true",
+                        help="Do not write the autosave journal.")
+    engine.add_argument("--roi-threads", type=int, default=1,
+                        help="Analyse the ROIs of each frame on N threads. Default: 1.")
+    engine.add_argument("--adaptive-quality", action="store_true",
+                        help="Trade ROI quality for speed to keep up with the camera frame rate.")
+
+    monitor = subparsers.add_parser("monitor",
+                                    help="Show the preview and velocities of a running engine.")
+    monitor.add_argument("--host", default=DEFAULT_ADDRESS[0],
+                         help=f"Host of the engine. Default: {DEFAULT_ADDRESS[0]}.")
+    monitor.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1],
+                         help=f"Port of the engine. Default: {DEFAULT_ADDRESS[1]}.")
+    monitor.add_argument("--key-file",
+                         help="Key file written by the engine. "
+                              "Default: ~/.froth_monitor/engine-PORT.key.")
+    return parser
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    """
+    Run the analyze command.
+    """
+    if args.jobs > 1:
+        analyzer = ChunkedAnalyzer(args.roi, args.angle, segments=args.jobs,
+                                   analysis_options=analysis_options(args), cluster_rois=args.cluster)
+        analyzer.run(args.video, max_frames=args.max_frames, verify=args.verify)
+    else:
+        analyzer = HeadlessAnalyzer(args.roi, args.angle, analysis_options(args), args.cluster,
+                                    roi_threads=args.roi_threads)
+        analyzer.run(args.video, max_frames=args.max_frames)
+
+    output_path = args.output or default_output_path(args.video)
+    analyzer.export(output_path)
+    print(f"Results written to {output_path}")
+    return 0
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Run the batch command.
+    """
+    output_directory = args.output_dir or os.path.join(args.directory, "results")
+    analyzer = BatchAnalyzer(args.roi, args.angle, output_directory,
+                             workers=args.workers, cv_threads=args.cv_threads,
+                             analysis_options=analysis_options(args), cluster_rois=args.cluster)
+    summaries = analyzer.run(args.directory)
+
+    failed = [summary for summary in summaries if summary["status"].startswith("failed")]
+    print(f"Summary written to {os.path.join(output_directory, 'batch_summary.xlsx')}")
+    return 1 if failed else 0
+
+
+def run_engine(args: argparse.Namespace) -> int:
+    """
+    Run the engine command.
+    """
+    engine = AnalysisEngine(args.source, args.roi, args.angle, analysis_options(args), args.cluster,
+                            roi_threads=args.roi_threads, address=(DEFAULT_ADDRESS[0], args.port),
+                            key_file=args.key_file,
+                            preview_width=args.preview_width, output_path=args.output,
+                            autosave_path=None if args.no_autosave else "data/auto_save",
+                            adaptive_quality=args.adaptive_quality)
+    engine.run(max_frames=args.max_frames)
+    return 0
+
+
+def run_monitor(args: argparse.Namespace) -> int:
+    """
+    Run the monitor command.
+    """
+    from PySide6.QtWidgets import QApplication
+    from .monitor import EngineMonitor
+
+    app = QApplication.instance() or QApplication([])
+    window = EngineMonitor((args.host, args.port), key_file=args.key_file)
+    window.show()
+    return app.exec()
+
+
+def main(argv: list = None) -> int:
+    """
+    Parse the command line and run the selected command.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The arguments without the program name. Defaults to sys.argv[1:].
+
+    Returns
+    -------
+    int
+        The process exit code.
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.command == "analyze":
+            return run_analyze(args)
+        if args.command == "batch":
+            return run_batch(args)
+        if args.command == "engine":
+            return run_engine(args)
+        if args.command == "monitor":
+            return run_monitor(args)
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    return 2
@@ -0,0 +1,1023 @@
+"""Analysis Engine Module for Froth Tracker Application.
+
+This module runs capture and analysis in a process of their own, separate
+from any GUI. The `AnalysisEngine` reads frames from a camera or video file on
+a `FrameCapture` thread, analyses every ROI with `MultiROIAnalysis`, autosaves
+the results and publishes them to monitor clients:
+
+- Velocities, status and other small messages are sent over a
+  `multiprocessing.connection` socket, one `ClientSession` per client.
+  Messages are JSON (`send_bytes`/`recv_bytes`), never pickles, so a peer
+  can at worst send a bad command, not run code.
+- A downscaled preview of every frame is written to a `SharedFrameRing` in
+  shared memory. Clients read the newest preview straight from the shared
+  block; frames are never pickled.
+
+Nothing the client does can stall the analysis. Each session has a bounded
+outbox drained by its own sender thread, so a client that stops reading (a
+modal dialog, a window being dragged) only loses its oldest messages, and the
+preview ring is simply overwritten. The engine does not depend on a client:
+it keeps analysing when the client exits, and a restarted client reconnects
+to the same address and continues from the current frame.
+
+Authentication:
+---------------
+Unless a key is given, every engine run generates a random key and writes it
+to a key file only the user can read (`~/.froth_monitor/engine-<port>.key`,
+see `key_file_path`). Clients read the key from that file (or one given with
+`--key-file`), so only processes of the same user can connect. The key file
+is removed when the engine finishes.
+
+Classes:
+--------
+ClientSession
+    One connected client: bounded outbox, sender and command receiver threads.
+AnalysisEngine
+    Capture, analysis, autosave and publishing loop of the engine process.
+EngineClient
+    Client side of the connection, including the preview ring.
+
+Functions:
+----------
+parse_source(source: str) -> int or str
+    Interprets a source argument as a camera index or a file path.
+key_file_path(address: tuple) -> str
+    Returns the default key file of the engine at an address.
+write_key_file(authkey: bytes, path: str) -> None
+    Writes a key to a file only the user can read.
+read_key_file(path: str) -> bytes or None
+    Reads a key written by `write_key_file`.
+encode_message(message: dict) -> bytes
+    Serialises a message or command as JSON.
+decode_message(data: bytes) -> dict
+    Parses a message or command received from a peer.
+start_engine_process(*args, **kwargs) -> multiprocessing.Process
+    Starts an `AnalysisEngine` in a new process.
+
+Imports:
+--------
+- collections, queue, threading, time: For the outboxes, command queue and session threads.
+- json, os, secrets: For the message encoding and the per-run key and its file.
+- multiprocessing, multiprocessing.connection: For the engine process and the client connection.
+- socket: For waking the listener thread when the engine closes.
+- cv2, numpy: For reading frames and building the preview.
+- QRect (PySide6.QtCore): For the ROI geometry (no QApplication required).
+- ROI, AutoSaver, Export, FrameClock: The analysis, persistence and timestamp models shared with the GUI.
+- FrameCapture: For reading frames on a worker thread.
+- MultiROIAnalysis: For analysing all ROIs of a frame.
+- QualityController: For holding the per-frame time budget.
+- SharedFrameRing: For the shared-memory preview frames.
+
+Example Usage:
+--------------
+    # Engine process
+    engine = AnalysisEngine(0, [(10, 10, 200, 150)], arrow_angle=90.0)
+    engine.run()
+
+    # Client process
+    client = EngineClient()
+    if client.connect():
+        messages = client.receive()
+        preview = client.read_preview()
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QRect
+
+from .autosaver import AutoSaver
+from .capture import FrameCapture, DROP_OLDEST, BLOCK
+from .export import Export
+from .frame_bus import SharedFrameRing
+from .frame_clock import FrameClock
+from .multi_roi import MultiROIAnalysis
+from .quality import QualityController
+from .roi import ROI
+
+DEFAULT_ADDRESS = ("localhost", 6010)
+KEY_DIRECTORY = os.path.join(os.path.expanduser("~"), ".froth_monitor")
+DEFAULT_FPS = 30.0
+STATUS_INTERVAL = 1.0
+
+
+def parse_source(source) -> object:
+    """
+    Interpret a source argument: a number is a camera index, anything else a file path.
+    """
+    if isinstance(source, int):
+        return source
+    return int(source) if str(source).isdigit() else str(source)
+
+
+def key_file_path(address: tuple) -> str:
+    """
+    Return the default key file of the engine listening at `address`.
+    """
+    return os.path.join(KEY_DIRECTORY, f"engine-{address[1]}.key")
+
+
+def write_key_file(authkey: bytes,
+                   path: str) -> None:
+    """
+    Write a key to a file only the current user can read.
+
+    The file is created with mode 0600 under a new name and then moved into
+    place, so the key is never readable by others, not even briefly.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(descriptor, authkey.hex().encode("ascii"))
+    finally:
+        os.close(descriptor)
+    os.replace(temporary, path)
+
+
+def read_key_file(path: str) -> bytes:
+    """
+    Read a key written by `write_key_file`, or return None if there is none.
+    """
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return bytes.fromhex(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def to_json_value(value) -> object:
+    """
+    Convert numpy scalars and arrays, which `json` cannot serialise, to Python values.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot send a {type(value).__name__} to an engine peer")
+
+
+def encode_message(message: dict) -> bytes:
+    """
+    Serialise a message or command as JSON for `Connection.send_bytes`.
+
+    Raises
+    ------
+    TypeError
+        If the message holds a value JSON cannot represent.
+    """
+    return json.dumps(message, default=to_json_value).encode("utf-8")
+
+
+def decode_message(data: bytes) -> dict:
+    """
+    Parse a message or command received with `Connection.recv_bytes`.
+
+    Raises
+    ------
+    ValueError
+        If the data is not a JSON object.
+    """
+    message = json.loads(data.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("An engine message must be a JSON object")
+    return message
+
+
+class ClientSession:
+    """
+    Client Session Class for One Connected Monitor.
+
+    Messages are put on a bounded outbox and sent by the session's own sender
+    thread, so a client that stops reading can never block the engine: once
+    the outbox is full the oldest messages are discarded and counted.
+    Commands received from the client are put on the engine's command queue
+    and handled by the engine loop.
+
+    Attributes:
+    ----------
+    connection : multiprocessing.connection.Connection
+        The connection to the client.
+    outbox : collections.deque
+        Messages waiting to be sent, oldest first.
+    messages_sent : int
+        Number of messages sent to the client.
+    messages_dropped : int
+        Number of messages discarded because the outbox was full.
+    closed : bool
+        True once the client disconnected or the session was closed.
+
+    Methods:
+    -------
+    start() -> None
+        Starts the sender and receiver threads.
+    send(message: dict) -> None
+        Queues a message without blocking.
+    close(drain_timeout: float = 0.0) -> None
+        Closes the connection, optionally after sending the queued messages.
+    """
+
+    def __init__(self,
+                 connection,
+                 commands: queue.Queue,
+                 max_outbox: int = 256) -> None:
+        """
+        Initialize the session for an accepted connection.
+
+        Parameters
+        ----------
+        connection : multiprocessing.connection.Connection
+            The accepted connection.
+        commands : queue.Queue
+            The engine's command queue receiving the client's commands.
+        max_outbox : int
+            Maximum number of messages waiting to be sent.
+        """
+        self.connection = connection
+        self.commands = commands
+        self.outbox: deque = deque()
+        self.max_outbox = max_outbox
+        self.condition = threading.Condition()
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.closed = False
+
+    def start(self) -> None:
+        """
+        Start the sender and receiver threads of the session.
+        """
+        threading.Thread(target=self.send_loop, name="EngineSender", daemon=True).start()
+        threading.Thread(target=self.receive_loop, name="EngineReceiver", daemon=True).start()
+
+    def send(self,
+             message: dict) -> None:
+        """
+        Queue a message for the client, discarding the oldest one if the outbox is full.
+        """
+        with self.condition:
+            if self.closed:
+                return
+            if len(self.outbox) >= self.max_outbox:
+                self.outbox.popleft()
+                self.messages_dropped += 1
+            self.outbox.append(message)
+            self.condition.notify()
+
+    def send_loop(self) -> None:
+        """
+        Body of the sender thread: send queued messages until the session closes.
+        """
+        while True:
+            with self.condition:
+                while not self.outbox and not self.closed:
+                    self.condition.wait()
+                if self.closed and not self.outbox:
+                    return
+                message = self.outbox.popleft()
+                self.condition.notify_all()
+
+            try:
+                data = encode_message(message)
+            except (TypeError, ValueError) as e:
+                print(f"Engine message not sent: {e}")
+                continue
+
+            try:
+                self.connection.send_bytes(data)
+                self.messages_sent += 1
+            except (OSError, EOFError, ValueError):
+                self.disconnect()
+                return
+
+    def receive_loop(self) -> None:
+        """
+        Body of the receiver thread: forward the client's commands to the engine.
+        """
+        while not self.closed:
+            try:
+                if self.connection.poll(0.2):
+                    command = decode_message(self.connection.recv_bytes())
+                    if isinstance(command.get("command"), str):
+                        self.commands.put(command)
+            except (OSError, EOFError, ValueError):
+                self.disconnect()
+                return
+
+    def disconnect(self) -> None:
+        """
+        Mark the session as closed and discard unsent messages.
+        """
+        with self.condition:
+            if not self.closed:
+                print("Monitor client disconnected")
+            self.closed = True
+            self.outbox.clear()
+            self.condition.notify_all()
+
+    def close(self,
+              drain_timeout: float = 0.0) -> None:
+        """
+        Close the session, first waiting up to `drain_timeout` seconds for
+        the queued messages to be sent.
+        """
+        deadline = time.monotonic() + drain_timeout
+        with self.condition:
+            while self.outbox and not self.closed and time.monotonic() < deadline:
+                self.condition.wait(timeout=max(0.0, deadline - time.monotonic()))
+            self.closed = True
+            self.outbox.clear()
+            self.condition.notify_all()
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+
+class AnalysisEngine:
+    """
+    Analysis Engine Class Running Capture and Analysis Without a GUI.
+
+    Messages sent to clients are dicts with a `type`:
+
+    - `hello`: sent on connection; ROI rectangles, arrow angle, source, frame
+      size and, once known, the preview ring (`preview`).
+    - `preview`: the preview ring, sent when it is created.
+    - `frame`: `frame_index`, `timestamp` and `velocities` (one value or None per ROI).
+    - `status`: capture counters, analysis rate, dropped messages, the
+      per-ROI rate of frames skipped as unchanged and, with adaptive quality,
+      the per-ROI quality step, once per second.
+    - `exported`: `path` of a results file written on request.
+    - `finished`: the source is exhausted or the engine was stopped.
+
+    Clients send dicts with a `command`: `export` (with `path`) or `stop`.
+
+    Attributes:
+    ----------
+    source : int or str
+        Camera index or video file path.
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles as (x, y, width, height) in frame pixels.
+    arrow_angle : float
+        Overflow direction in radians.
+    address : tuple[str, int]
+        Address the engine listens on for clients.
+    authkey : bytes
+        Key clients must present; random for every engine unless given.
+    key_file : str
+        File the key is written to for clients, readable by the user only.
+    preview_width : int
+        Width of the preview frames; frames are never upscaled.
+    rois : list[ROI]
+        The ROIs of the current run.
+    roi_analysis : MultiROIAnalysis
+        Analyses all ROIs of a frame.
+    ring : SharedFrameRing or None
+        The preview ring, created on the first frame.
+    session : ClientSession or None
+        The connected client. A new connection replaces the previous one.
+    frames_analysed : int
+        Number of frames analysed in the current run.
+    output_path : str or None
+        Results file written when the run ends.
+    quality_controller : QualityController or None
+        Adapts the ROIs' quality to the source frame rate, if enabled.
+
+    Methods:
+    -------
+    __init__(source, rects: list, arrow_angle: float, analysis_options: dict = None, cluster_rois: bool = False, roi_threads: int = 1, address: tuple = DEFAULT_ADDRESS, authkey: bytes = None, key_file: str = None, preview_width: int = 640, preview_slots: int = 4, output_path: str = None, autosave_path: str = "data/auto_save", adaptive_quality: bool = False) -> None
+        Initializes the engine.
+    run(max_frames: int = None) -> list[ROI]
+        Analyses the source until it is exhausted or the engine is stopped.
+    stop() -> None
+        Asks the engine loop to finish.
+    process_frame(frame: np.ndarray, timestamp: float, frame_index: int) -> None
+        Analyses, autosaves, previews and publishes one frame.
+    publish(message: dict) -> None
+        Sends a message to the connected client, if any, without blocking.
+    export(output_path: str) -> dict
+        Writes the results so far to an Excel file.
+    """
+
+    def __init__(self,
+                 source,
+                 rects: list,
+                 arrow_angle: float,
+                 analysis_options: dict = None,
+                 cluster_rois: bool = False,
+                 roi_threads: int = 1,
+                 address: tuple = DEFAULT_ADDRESS,
+                 authkey: bytes = None,
+                 key_file: str = None,
+                 preview_width: int = 640,
+                 preview_slots: int = 4,
+                 output_path: str = None,
+                 autosave_path: str = "data/auto_save",
+                 adaptive_quality: bool = False) -> None:
+        """
+        Initialize the engine.
+
+        Parameters
+        ----------
+        source : int or str
+            Camera index or video file path (see `parse_source`).
+        rects : list[tuple[int, int, int, int]]
+            ROI rectangles as (x, y, width, height) in frame pixels.
+        arrow_angle : float
+            Overflow direction in degrees.
+        analysis_options : dict, optional
+            Analysis settings passed to every ROI's `VideoAnalysis`.
+        cluster_rois : bool
+            Share one flow field between overlapping or adjacent ROIs.
+        roi_threads : int
+            Number of threads analysing the ROIs of a frame concurrently.
+        address : tuple[str, int]
+            Address to listen on for monitor clients.
+        authkey : bytes, optional
+            Key clients must present to connect. Defaults to a random key.
+        key_file : str, optional
+            File the key is written to for clients. Defaults to
+            `key_file_path(address)`.
+        preview_width : int
+            Width of the preview frames written to shared memory.
+        preview_slots : int
+            Number of slots of the preview ring.
+        output_path : str, optional
+            Results file written when the run ends.
+        autosave_path : str or None
+            Directory of the autosave journal. None disables autosaving.
+        adaptive_quality : bool
+            Lower the quality of expensive ROIs when the analysis of a frame
+            takes longer than the camera's frame period, and raise it again
+            when there is time to spare (see `froth_monitor.quality`). Video
+            files are not paced, so their quality is never adapted.
+        """
+        self.source = parse_source(source)
+        self.rects = [tuple(int(v) for v in rect) for rect in rects]
+        self.arrow_angle = np.radians(float(arrow_angle))
+        self.arrow_dir_x = np.cos(self.arrow_angle)
+        self.arrow_dir_y = np.sin(self.arrow_angle)
+        self.analysis_options = dict(analysis_options or {})
+        self.roi_analysis = MultiROIAnalysis(cluster=cluster_rois, workers=roi_threads)
+        self.address = tuple(address)
+        self.authkey = authkey or secrets.token_bytes(32)
+        self.key_file = key_file or key_file_path(self.address)
+        self.preview_width = int(preview_width)
+        self.preview_slots = int(preview_slots)
+        self.output_path = output_path
+        self.autosave_path = autosave_path
+        self.quality_controller = QualityController() if adaptive_quality else None
+
+        self.rois: list = []
+        self.clock: FrameClock = None
+        self.auto_saver: AutoSaver = None
+        self.frame_capture: FrameCapture = None
+        self.ring: SharedFrameRing = None
+        self.preview_size: tuple = None
+        self.fps = DEFAULT_FPS
+        self.frame_size: tuple = None
+        self.frames_analysed = 0
+        self.is_file = not isinstance(self.source, int)
+
+        self.listener: Listener = None
+        self.listener_thread: threading.Thread = None
+        self.session: ClientSession = None
+        self.session_lock = threading.Lock()
+        self.commands: queue.Queue = queue.Queue()
+        self.stop_event = threading.Event()
+
+    def open_source(self) -> cv2.VideoCapture:
+        """
+        Open the camera or video file and set up the clock of the run.
+
+        Raises
+        ------
+        IOError
+            If the source cannot be opened.
+        """
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            raise IOError(f"Could not open the video source: {self.source}")
+
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        if self.quality_controller is not None:
+            self.quality_controller.set_fps(self.fps)
+        self.frame_size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.clock = FrameClock()
+        return capture
+
+    def start_listener(self) -> None:
+        """
+        Listen for monitor clients on a background thread.
+        """
+        self.listener = Listener(self.address, authkey=self.authkey)
+        write_key_file(self.authkey, self.key_file)
+        self.listener_thread = threading.Thread(target=self.accept_loop, name="EngineListener", daemon=True)
+        self.listener_thread.start()
+        print(f"Analysis engine listening on {self.address[0]}:{self.address[1]}")
+
+    def accept_loop(self) -> None:
+        """
+        Body of the listener thread: accept clients, replacing the previous one.
+        """
+        while not self.stop_event.is_set():
+            try:
+                connection = self.listener.accept()
+            except Exception as e:
+                # Any failed handshake must not end the thread
+                if self.stop_event.is_set():
+                    return
+                print(f"Rejected monitor connection: {e}")
+                continue
+
+            if self.stop_event.is_set():
+                connection.close()
+                return
+
+            session = ClientSession(connection, self.commands)
+            session.send(self.hello_message())
+            session.start()
+            with self.session_lock:
+                previous, self.session = self.session, session
+            if previous is not None:
+                previous.close()
+            print("Monitor client connected")
+
+    def hello_message(self) -> dict:
+        """
+        Return the message describing the run to a newly connected client.
+        """
+        return {
+            "type": "hello",
+            "source": str(self.source),
+            "rects": self.rects,
+            "arrow_angle": float(self.arrow_angle),
+            "frame_size": self.frame_size,
+            "fps": self.fps,
+            "frames_analysed": self.frames_analysed,
+            "preview": self.ring.describe() if self.ring is not None else None,
+        }
+
+    def publish(self,
+                message: dict) -> None:
+        """
+        Send a message to the connected client, if any, without blocking.
+        """
+        with self.session_lock:
+            session = self.session
+        if session is not None and not session.closed:
+            session.send(message)
+
+    def create_preview_ring(self,
+                            frame: np.ndarray) -> None:
+        """
+        Create the preview ring for the size of the first frame and announce it.
+        """
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.preview_width / width)
+        self.preview_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        self.ring = SharedFrameRing.create((self.preview_size[1], self.preview_size[0], 3), self.preview_slots)
+        self.frame_size = (width, height)
+        self.publish({"type": "preview", "preview": self.ring.describe(), "frame_size": self.frame_size})
+
+    def write_preview(self,
+                      frame: np.ndarray,
+                      timestamp: float,
+                      frame_index: int) -> None:
+        """
+        Write the downscaled frame straight into the next slot of the preview ring.
+        """
+        if self.ring is None:
+            self.create_preview_ring(frame)
+
+        with self.ring.writing(frame_index, timestamp) as slot:
+            if self.preview_size == (frame.shape[1], frame.shape[0]):
+                np.copyto(slot, frame)
+            else:
+                cv2.resize(frame, self.preview_size, dst=slot, interpolation=cv2.INTER_AREA)
+
+    def process_frame(self,
+                      frame: np.ndarray,
+                      timestamp: float,
+                      frame_index: int) -> None:
+        """
+        Analyse, autosave, preview and publish one frame.
+        """
+        started = time.perf_counter()
+        flows = self.roi_analysis.analyze_frame(self.rois, frame, timestamp)
+        # Video files are read as fast as they are analysed, so only camera
+        # frames have a deadline; the budget follows the measured camera rate
+        if self.quality_controller is not None and not self.is_file:
+            if frame_index % 30 == 0:
+                self.quality_controller.set_fps(self.frame_capture.get_fps(default=self.fps))
+            self.quality_controller.update(self.rois, time.perf_counter() - started, timestamp)
+        self.frames_analysed += 1
+
+        velocities = []
+        for i, (roi, (avg_flow_x, avg_flow_y)) in enumerate(zip(self.rois, flows)):
+            if avg_flow_x is None or avg_flow_y is None:
+                velocities.append(None)
+                continue
+
+            history = roi.analysis_module.velocity_history
+            velocity = float(history.velocities[-1])
+            velocities.append(velocity)
+            if self.auto_saver is not None:
+                self.auto_saver.add_frame_data(i, roi.analysis_module.get_frame_count(), velocity,
+                                               float(history.timestamps[-1]))
+
+        self.write_preview(frame, timestamp, frame_index)
+        self.publish({"type": "frame", "frame_index": frame_index, "timestamp": timestamp,
+                      "velocities": velocities})
+
+    def status_message(self,
+                       started: float) -> dict:
+        """
+        Return the periodic status message.
+        """
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        with self.session_lock:
+            dropped = self.session.messages_dropped if self.session is not None else 0
+        status = {"type": "status", "frames_analysed": self.frames_analysed,
+                  "analysis_fps": self.frames_analysed / elapsed, "messages_dropped": dropped,
+                  "skip_rates": [roi.analysis_module.get_skip_rate() for roi in self.rois]}
+        if self.quality_controller is not None:
+            status["quality_levels"] = [self.quality_controller.get_level(roi) for roi in self.rois]
+        if self.frame_capture is not None:
+            status.update(self.frame_capture.get_statistics())
+        return status
+
+    def handle_commands(self) -> None:
+        """
+        Carry out the commands received from clients since the last frame.
+        """
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+
+            if command["command"] == "stop":
+                print("Stop requested by the monitor client")
+                self.stop()
+            elif command["command"] == "export":
+                try:
+                    self.export(command["path"])
+                    self.publish({"type": "exported", "path": command["path"]})
+                except (OSError, KeyError, ValueError) as e:
+                    self.publish({"type": "error", "message": f"Export failed: {e}"})
+            else:
+                print(f"Unknown engine command: {command['command']}")
+
+    def stop(self) -> None:
+        """
+        Ask the engine loop to finish after the current frame.
+        """
+        self.stop_event.set()
+
+    def run(self,
+            max_frames: int = None) -> list:
+        """
+        Analyse the source until it is exhausted, `max_frames` frames were
+        analysed or the engine is stopped, then write the results file.
+
+        Parameters
+        ----------
+        max_frames : int, optional
+            Stop after this many frames.
+
+        Returns
+        -------
+        list[ROI]
+            The ROIs holding the velocity history of the run.
+
+        Raises
+        ------
+        IOError
+            If the source cannot be opened.
+        """
+        capture = self.open_source()
+        try:
+            self.start_listener()
+        except OSError:
+            capture.release()
+            raise
+
+        self.rois = [ROI(QRect(x, y, w, h), self.arrow_dir_x, self.arrow_dir_y, self.clock,
+                         **self.analysis_options)
+                     for x, y, w, h in self.rects]
+        self.frames_analysed = 0
+        self.stop_event.clear()
+        if self.quality_controller is not None:
+            self.quality_controller.reset()
+
+        if self.autosave_path is not None:
+            self.auto_saver = AutoSaver(self.autosave_path)
+            self.auto_saver.set_wall_anchor(self.clock.wall_anchor)
+            self.auto_saver.update_arrow_direction(self.arrow_angle)
+
+        # Files are analysed completely, cameras always at their newest frame
+        self.frame_capture = FrameCapture(capture, self.clock, BLOCK if self.is_file else DROP_OLDEST)
+        self.frame_capture.start()
+
+        started = time.perf_counter()
+        last_status = started
+        try:
+            while not self.stop_event.is_set():
+                if max_frames is not None and self.frames_analysed >= max_frames:
+                    break
+
+                self.handle_commands()
+                item = self.frame_capture.read(timeout=0.1)
+                if item is None:
+                    if self.frame_capture.is_finished():
+                        break
+                    continue
+
+                frame, timestamp, frame_index = item
+                if self.is_file:
+                    # Media time, as in the headless analysis
+                    timestamp = (frame_index - 1) / self.fps
+                self.process_frame(frame, timestamp, frame_index)
+
+                now = time.perf_counter()
+                if now - last_status >= STATUS_INTERVAL:
+                    self.publish(self.status_message(started))
+                    last_status = now
+        except KeyboardInterrupt:
+            print("Analysis engine interrupted")
+        finally:
+            self.frame_capture.stop(release=True)
+            self.roi_analysis.close()
+            self.finish(started)
+
+        return self.rois
+
+    def finish(self,
+               started: float) -> None:
+        """
+        Write the results, tell the client the run is over and release the
+        listener, the preview ring and the autosave journal.
+        """
+        status = self.status_message(started)
+        print(f"Analysis engine analysed {self.frames_analysed} frames "
+              f"({status['analysis_fps']:.1f} frames/s, {status['messages_dropped']} messages dropped)")
+
+        if self.output_path is not None and self.rois:
+            self.export(self.output_path)
+            print(f"Results written to {self.output_path}")
+
+        self.publish(status)
+        self.publish({"type": "finished", "output_path": self.output_path})
+        self.stop_event.set()
+        with self.session_lock:
+            session, self.session = self.session, None
+        if session is not None:
+            session.close(drain_timeout=1.0)
+        self.close_listener()
+
+        if self.auto_saver is not None:
+            self.auto_saver.close()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def close_listener(self) -> None:
+        """
+        Stop the listener thread and close the listening socket.
+        """
+        if self.listener is None:
+            return
+
+        # A blocked accept() is only woken up by a connection. A plain socket
+        # that closes at once fails the handshake instead of waiting on it,
+        # so this cannot hang even if the thread has already gone.
+        if self.listener_thread is not None and self.listener_thread.is_alive():
+            try:
+                socket.create_connection(self.address, timeout=1.0).close()
+            except OSError:
+                pass
+            self.listener_thread.join(timeout=2.0)
+        self.listener.close()
+        self.listener = None
+        self.listener_thread = None
+
+        # Leave the key file alone if another engine has taken over the port
+        if read_key_file(self.key_file) == self.authkey:
+            try:
+                os.remove(self.key_file)
+            except OSError:
+                pass
+
+    def export(self,
+               output_path: str) -> dict:
+        """
+        Write the results so far to an Excel file with the GUI export layout.
+        """
+        exporter = Export()
+        quality_log = self.quality_controller.changes if self.quality_controller is not None else None
+        data = exporter.collect_export_data(self.rois, self.arrow_angle, quality_log)
+        exporter.write_csv(output_path, data)
+        return data
+
+
+def run_engine(*args, **kwargs) -> None:
+    """
+    Entry point of the engine process started by `start_engine_process`.
+    """
+    max_frames = kwargs.pop("max_frames", None)
+    AnalysisEngine(*args, **kwargs).run(max_frames=max_frames)
+
+
+def start_engine_process(*args, **kwargs) -> multiprocessing.Process:
+    """
+    Start an `AnalysisEngine` in a new process and return the process.
+
+    Takes the arguments of `AnalysisEngine` plus `max_frames`. The process is
+    not a daemon, so it keeps running when the starting process (e.g. a GUI)
+    exits.
+    """
+    process = multiprocessing.Process(target=run_engine, args=args, kwargs=kwargs,
+                                      name="FrothAnalysisEngine", daemon=False)
+    process.start()
+    return process
+
+
+class EngineClient:
+    """
+    Engine Client Class for Monitors of an Analysis Engine.
+
+    Attributes:
+    ----------
+    address : tuple[str, int]
+        Address of the engine.
+    authkey : bytes or None
+        Key of the engine, or None to read it from `key_file` on every connection attempt.
+    key_file : str
+        File the engine wrote its key to.
+    connection : multiprocessing.connection.Connection or None
+        The connection to the engine, None while disconnected.
+    hello : dict or None
+        The `hello` message of the current connection.
+    ring : SharedFrameRing or None
+        The engine's preview ring, attached once announced.
+
+    Methods:
+    -------
+    connect() -> bool
+        Tries once to connect to the engine.
+    is_connected() -> bool
+        Returns True while connected.
+    receive(max_messages: int = 1000) -> list[dict]
+        Returns the messages received so far without blocking.
+    read_preview() -> tuple or None
+        Returns the newest preview frame.
+    send_command(command: str, **arguments) -> bool
+        Sends a command to the engine.
+    close() -> None
+        Disconnects and detaches the preview ring.
+    """
+
+    def __init__(self,
+                 address: tuple = DEFAULT_ADDRESS,
+                 authkey: bytes = None,
+                 key_file: str = None) -> None:
+        """
+        Initialize a disconnected client for the engine at `address`.
+
+        Without an `authkey` the key is read from `key_file` (by default
+        `key_file_path(address)`), which a restarted engine rewrites.
+        """
+        self.address = tuple(address)
+        self.authkey = authkey
+        self.key_file = key_file or key_file_path(self.address)
+        self.connection = None
+        self.hello: dict = None
+        self.ring: SharedFrameRing = None
+        self.preview_buffer: np.ndarray = None
+
+    def connect(self) -> bool:
+        """
+        Try once to connect to the engine.
+
+        Returns
+        -------
+        bool
+            True if connected, False if no engine is listening or its key
+            is not available.
+        """
+        self.close()
+        authkey = self.authkey or read_key_file(self.key_file)
+        if authkey is None:
+            return False
+        try:
+            self.connection = Client(self.address, authkey=authkey)
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            self.connection = None
+            return False
+        return True
+
+    def is_connected(self) -> bool:
+        """
+        Return True while connected to the engine.
+        """
+        return self.connection is not None
+
+    def attach_ring(self,
+                    description: dict) -> None:
+        """
+        Attach to the preview ring described by the engine.
+        """
+        self.detach_ring()
+        if description is not None:
+            self.ring = SharedFrameRing.attach(description["name"], description["shape"], description["slots"])
+            self.preview_buffer = np.empty(self.ring.shape, dtype=np.uint8)
+
+    def detach_ring(self) -> None:
+        """
+        Detach from the preview ring, if attached.
+        """
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+            self.preview_buffer = None
+
+    def receive(self,
+                max_messages: int = 1000) -> list:
+        """
+        Return the messages received so far, without blocking.
+
+        The `hello` and `preview` messages also attach the preview ring. If
+        the engine went away the client disconnects and a
+        `{"type": "disconnected"}` message is appended.
+        """
+        messages = []
+        try:
+            while self.connection is not None and len(messages) < max_messages and self.connection.poll():
+                message = decode_message(self.connection.recv_bytes())
+                if message.get("type") == "hello":
+                    self.hello = message
+                    self.attach_ring(message["preview"])
+                elif message.get("type") == "preview":
+                    self.attach_ring(message["preview"])
+                    if self.hello is not None:
+                        self.hello["frame_size"] = message["frame_size"]
+                messages.append(message)
+        except (OSError, EOFError, ValueError):
+            self.close()
+            messages.append({"type": "disconnected"})
+        return messages
+
+    def read_preview(self) -> tuple:
+        """
+        Return the newest preview frame as `(frame, frame_index, timestamp)`,
+        or None if there is none yet.
+
+        The returned frame is a buffer reused by the next call.
+        """
+        if self.ring is None:
+            return None
+        return self.ring.read_latest(out=self.preview_buffer)
+
+    def send_command(self,
+                     command: str,
+                     **arguments) -> bool:
+        """
+        Send a command (`stop`, or `export` with `path`) to the engine.
+
+        Returns
+        -------
+        bool
+            False if not connected or the engine went away.
+        """
+        if self.connection is None:
+            return False
+        try:
+            self.connection.send_bytes(encode_message({"command": command, **arguments}))
+        except (OSError, EOFError):
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        Disconnect from the engine and detach the preview ring.
+        """
+        self.detach_ring()
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+            self.connection = None
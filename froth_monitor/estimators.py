@@ -0,0 +1,685 @@
+"""Motion Estimator Module for Froth Tracker Application.
+
+This module defines the motion estimators that `VideoAnalysis` can use to
+measure how far the froth in a ROI moved between two frames. Every estimator
+takes the previous and the current grayscale ROI frame and returns the same
+`(avg_flow_x, avg_flow_y)` pair, the mean displacement in pixels, so that the
+projection onto the overflow direction and everything downstream is
+independent of the estimator.
+
+The estimators differ in cost and in what motion they can follow:
+
+- farneback: dense Farneback optical flow averaged over the ROI. The most
+  robust to non-rigid motion and the most expensive.
+- farneback-warm: Farneback started from the previous frame's flow field,
+  with fewer pyramid levels and iterations.
+- dis-ultrafast, dis-fast: OpenCV's DIS dense optical flow. Several times
+  cheaper than Farneback with similar results on textured froth.
+- phase: FFT phase correlation. Measures one global translation to
+  sub-pixel precision, with a confidence score, so it is very cheap but only
+  suitable where the froth moves roughly rigidly.
+- lucas-kanade: a few hundred corners tracked with pyramidal Lucas-Kanade,
+  reporting their median displacement. The cost scales with the number of
+  features instead of the ROI area, so it suits large ROIs.
+- template: the template matching of the original application. The middle
+  third of the previous frame is searched for in the current frame; the
+  displacement is whole pixels only.
+
+Classes:
+--------
+MotionEstimator
+    Base class defining the estimator interface.
+FarnebackEstimator
+    Dense Farneback optical flow.
+DISEstimator
+    Dense DIS optical flow with the ultrafast or fast preset.
+PhaseCorrelationEstimator
+    Global translation by FFT phase correlation.
+LucasKanadeEstimator
+    Median displacement of sparse features tracked with Lucas-Kanade.
+TemplateMatchingEstimator
+    Translation of the central third of the ROI by template matching.
+
+Functions:
+----------
+create_estimator(name: str) -> MotionEstimator
+    Creates an estimator from its name.
+
+Imports:
+--------
+- cv2: For the optical flow, feature tracking, phase correlation and template matching.
+- numpy: For averaging the flow fields and the feature displacements.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionEstimator:
+    """
+    Motion Estimator Base Class.
+
+    Subclasses implement `estimate`. An estimator instance belongs to one ROI,
+    so it may keep state (buffers, caches) between frames; `reset` is called
+    whenever the ROI size changes.
+
+    Attributes:
+    ----------
+    name : str
+        The name the estimator is selected by.
+    confidence : float or None
+        Quality of the last estimate between 0 and 1, for estimators that
+        can rate their own result; None otherwise.
+    dense : bool
+        True if the estimator computes a per-pixel flow field (`flow_field`),
+        which lets one field be shared by several overlapping ROIs.
+
+    Methods:
+    -------
+    estimate(previous_frame: np.ndarray, current_frame: np.ndarray) -> tuple[float, float]
+        Returns the mean displacement in x and y between two grayscale frames.
+    flow_field(previous_frame: np.ndarray, current_frame: np.ndarray) -> np.ndarray
+        Returns the HxWx2 per-pixel flow field (dense estimators only).
+    reset() -> None
+        Discards any state kept from earlier frames.
+    quality_parameters() -> dict
+        Returns the tunable cost parameters (e.g. pyramid levels, window size).
+    set_quality(**parameters) -> None
+        Changes tunable cost parameters; unknown ones are ignored.
+    """
+
+    name = ""
+    confidence = None
+    dense = False
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Estimate the mean displacement between two grayscale frames.
+
+        Parameters
+        ----------
+        previous_frame : np.ndarray
+            The previous grayscale ROI frame.
+        current_frame : np.ndarray
+            The current grayscale ROI frame, of the same size.
+
+        Returns
+        -------
+        tuple[float, float]
+            The mean displacement in x and y, in pixels of the given frames.
+        """
+        raise NotImplementedError
+
+    def flow_field(self,
+                   previous_frame: np.ndarray,
+                   current_frame: np.ndarray) -> np.ndarray:
+        """
+        Return the per-pixel flow field between two grayscale frames.
+
+        Only dense estimators implement this. The returned array may be an
+        internal buffer that the next call overwrites.
+
+        Returns
+        -------
+        np.ndarray
+            float32 array of shape (H, W, 2) with the x and y displacement.
+        """
+        raise NotImplementedError(f"The {self.name} estimator does not compute a dense flow field")
+
+    def reset(self) -> None:
+        """
+        Discard any state kept from earlier frames.
+        """
+
+    def quality_parameters(self) -> dict:
+        """
+        Return the parameters that trade accuracy for speed, by name.
+
+        Estimators without such parameters return an empty dict.
+        """
+        return {}
+
+    def set_quality(self,
+                    **parameters) -> None:
+        """
+        Change parameters returned by `quality_parameters`; others are ignored.
+        """
+
+
+class FarnebackEstimator(MotionEstimator):
+    """
+    Dense Farneback Optical Flow Estimator.
+
+    The flow field is kept between frames, so the HxWx2 float32 buffer is
+    allocated once per ROI size instead of once per frame.
+
+    With `warm_start`, the previous frame's flow is also used as the initial
+    estimate (`cv2.OPTFLOW_USE_INITIAL_FLOW`). Froth velocity changes slowly,
+    so a warm field only needs refining, and fewer pyramid levels and
+    iterations are used. On 600x400 ROIs the defaults (2 levels, 1 iteration
+    when warm) took about 35% less time per frame with the same accuracy as
+    a cold start, including after sudden velocity jumps of several pixels.
+    A single level no longer recovered fully within one frame of such a jump.
+
+    Attributes:
+    ----------
+    parameters : tuple
+        pyr_scale, levels, winsize, iterations, poly_n, poly_sigma and flags
+        passed to `cv2.calcOpticalFlowFarneback` for a cold start.
+    warm_parameters : tuple or None
+        The same parameters for a warm start, or None if warm starts are disabled.
+    flow : np.ndarray or None
+        The flow field of the last estimate, reused as the output buffer and,
+        when warm starting, as the initial estimate.
+    """
+
+    name = "farneback"
+    dense = True
+
+    def __init__(self,
+                 pyr_scale: float = 0.5,
+                 levels: int = 3,
+                 winsize: int = 25,
+                 iterations: int = 3,
+                 poly_n: int = 7,
+                 poly_sigma: float = 1.5,
+                 warm_start: bool = False,
+                 warm_levels: int = 2,
+                 warm_iterations: int = 1) -> None:
+        """
+        Initialize the estimator with the Farneback parameters.
+
+        Parameters
+        ----------
+        warm_start : bool
+            Start each estimate from the previous flow field.
+        warm_levels : int
+            Pyramid levels used when warm starting.
+        warm_iterations : int
+            Iterations per level used when warm starting.
+        """
+        self.parameters = (pyr_scale, levels, winsize, iterations, poly_n, poly_sigma, 0)
+        self.warm_parameters = None
+        self.warm_levels = warm_levels
+        if warm_start:
+            self.name = "farneback-warm"
+            self.warm_parameters = (pyr_scale, warm_levels, winsize, warm_iterations, poly_n, poly_sigma,
+                                    cv2.OPTFLOW_USE_INITIAL_FLOW)
+        self.flow = None
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Return the mean of the dense Farneback flow field.
+        """
+        flow = self.flow_field(previous_frame, current_frame)
+        return np.mean(flow[..., 0]), np.mean(flow[..., 1])
+
+    def flow_field(self,
+                   previous_frame: np.ndarray,
+                   current_frame: np.ndarray) -> np.ndarray:
+        """
+        Return the dense Farneback flow field, computed into the kept buffer.
+        """
+        if self.flow is not None and self.flow.shape[:2] != current_frame.shape:
+            self.flow = None
+
+        if self.warm_parameters is not None and self.flow is not None:
+            parameters = self.warm_parameters
+        else:
+            parameters = self.parameters
+
+        self.flow = cv2.calcOpticalFlowFarneback(previous_frame, current_frame, self.flow, *parameters)
+        return self.flow
+
+    def reset(self) -> None:
+        """
+        Discard the flow field.
+        """
+        self.flow = None
+
+    def quality_parameters(self) -> dict:
+        """
+        Return the pyramid levels and window size of a cold start.
+        """
+        return {"levels": self.parameters[1], "winsize": self.parameters[2]}
+
+    def set_quality(self,
+                    levels: int = None,
+                    winsize: int = None,
+                    **parameters) -> None:
+        """
+        Change the pyramid levels and window size. Warm starts never use more
+        levels than a cold start.
+        """
+        pyr_scale, old_levels, old_winsize, iterations, poly_n, poly_sigma, flags = self.parameters
+        levels = old_levels if levels is None else int(levels)
+        winsize = old_winsize if winsize is None else int(winsize)
+        self.parameters = (pyr_scale, levels, winsize, iterations, poly_n, poly_sigma, flags)
+        if self.warm_parameters is not None:
+            warm = list(self.warm_parameters)
+            warm[1] = min(self.warm_levels, levels)
+            warm[2] = winsize
+            self.warm_parameters = tuple(warm)
+
+
+class DISEstimator(MotionEstimator):
+    """
+    Dense Inverse Search (DIS) Optical Flow Estimator.
+
+    Attributes:
+    ----------
+    preset : str
+        "ultrafast" or "fast".
+    dis : cv2.DISOpticalFlow
+        The OpenCV DIS instance, created once per ROI.
+    """
+
+    PRESETS = {
+        "ultrafast": cv2.DISOPTICAL_FLOW_PRESET_ULTRAFAST,
+        "fast": cv2.DISOPTICAL_FLOW_PRESET_FAST,
+    }
+    dense = True
+
+    def __init__(self,
+                 preset: str = "ultrafast") -> None:
+        """
+        Initialize the estimator with a DIS preset ("ultrafast" or "fast").
+        """
+        if preset not in self.PRESETS:
+            raise ValueError(f"Unknown DIS preset: {preset}")
+
+        self.preset = preset
+        self.name = f"dis-{preset}"
+        self.dis = cv2.DISOpticalFlow_create(self.PRESETS[preset])
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Return the mean of the dense DIS flow field.
+        """
+        flow = self.flow_field(previous_frame, current_frame)
+        return np.mean(flow[..., 0]), np.mean(flow[..., 1])
+
+    def flow_field(self,
+                   previous_frame: np.ndarray,
+                   current_frame: np.ndarray) -> np.ndarray:
+        """
+        Return the dense DIS flow field.
+        """
+        return self.dis.calc(previous_frame, current_frame, None)
+
+
+class PhaseCorrelationEstimator(MotionEstimator):
+    """
+    FFT Phase Correlation Estimator.
+
+    Measures the single translation that best aligns two frames from the
+    phase of their cross-power spectrum. The cost does not depend on the
+    motion, and only one FFT is computed per frame: the whitened spectrum of
+    the current frame is kept and reused as the previous frame's spectrum on
+    the next call.
+
+    The frames are mean-subtracted, multiplied by a Hanning window to
+    suppress the edge discontinuities of the periodic FFT, and zero-padded to
+    a fast DFT size; the window and the padding size are cached per ROI size.
+    The correlation surface is smoothed with a small Gaussian (applied as a
+    product in the frequency domain). Without it, whitening lets stationary
+    high-frequency noise such as compression block edges produce a false peak
+    at zero motion; with it, the peak is also smooth enough for a parabola
+    through the peak and its neighbours to give an accurate sub-pixel offset.
+    All spectra are kept in OpenCV's packed (CCS) format, which is several
+    times faster than complex spectra.
+
+    Attributes:
+    ----------
+    sigma : float
+        Standard deviation in pixels of the Gaussian smoothing of the correlation surface.
+    window : np.ndarray or None
+        Hanning window matching the ROI size.
+    dft_size : tuple[int, int] or None
+        Padded (height, width) used for the FFT.
+    smoothing : np.ndarray or None
+        Packed spectrum of the periodic Gaussian kernel of the padded size.
+    perfect_peak : float
+        Peak height of a perfect translation, used to scale the confidence.
+    previous_source : np.ndarray or None
+        The frame whose spectrum is cached; reused if it is passed back as
+        `previous_frame`.
+    previous_spectrum : np.ndarray or None
+        The cached whitened spectrum of `previous_source`.
+    confidence : float or None
+        Height of the correlation peak of the last estimate relative to a
+        perfect translation: close to 1 for a clean translation, about 0.1
+        for unrelated frames.
+
+    Methods:
+    -------
+    prepare(shape: tuple[int, int]) -> None
+        Caches the window, DFT size and smoothing spectrum for a ROI size.
+    spectrum(frame: np.ndarray) -> np.ndarray
+        Returns the whitened, packed spectrum of a frame.
+    subpixel_offset(before: float, peak: float, after: float) -> float
+        Returns the parabolic sub-pixel offset of a peak.
+
+    Notes
+    -----
+    The cached spectrum is matched by identity, which is safe with
+    `VideoAnalysis` because it never modifies the previous frame buffer.
+    Callers that overwrite a frame in place must call `reset` first.
+    """
+
+    name = "phase"
+
+    def __init__(self,
+                 sigma: float = 2.0) -> None:
+        """
+        Initialize the estimator.
+
+        Parameters
+        ----------
+        sigma : float
+            Standard deviation in pixels of the Gaussian smoothing of the
+            correlation surface.
+        """
+        self.sigma = sigma
+        self.window = None
+        self.dft_size = None
+        self.smoothing = None
+        self.perfect_peak = 1.0
+        self.previous_source = None
+        self.previous_spectrum = None
+        self.confidence = None
+
+    def prepare(self,
+                shape: tuple) -> None:
+        """
+        Cache the Hanning window, the DFT size and the smoothing spectrum for a ROI size.
+        """
+        height, width = shape
+        self.window = cv2.createHanningWindow((width, height), cv2.CV_32F)
+        self.dft_size = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+
+        # Periodic Gaussian centred on (0, 0); a real, even kernel has a real spectrum
+        dft_height, dft_width = self.dft_size
+        distance_y = np.minimum(np.arange(dft_height), dft_height - np.arange(dft_height))[:, np.newaxis]
+        distance_x = np.minimum(np.arange(dft_width), dft_width - np.arange(dft_width))[np.newaxis, :]
+        kernel = np.exp(-(distance_x ** 2 + distance_y ** 2) / (2.0 * self.sigma ** 2)).astype(np.float32)
+        kernel /= kernel.sum()
+        self.smoothing = cv2.dft(kernel)
+        self.perfect_peak = float(kernel[0, 0])
+
+    def spectrum(self,
+                 frame: np.ndarray) -> np.ndarray:
+        """
+        Return the whitened (unit magnitude) packed spectrum of a windowed, padded frame.
+        """
+        if self.window is None or self.window.shape != frame.shape:
+            self.prepare(frame.shape)
+
+        windowed = np.float32(frame)
+        windowed -= cv2.mean(windowed)[0]
+        windowed *= self.window
+        padded = cv2.copyMakeBorder(windowed, 0, self.dft_size[0] - frame.shape[0],
+                                    0, self.dft_size[1] - frame.shape[1], cv2.BORDER_CONSTANT, value=0)
+
+        spectrum = cv2.dft(padded)
+        magnitude = cv2.mulSpectrums(spectrum, spectrum, 0, conjB=True)
+        cv2.sqrt(magnitude, magnitude)
+        magnitude += 1e-9
+        return cv2.divSpectrums(spectrum, magnitude, 0)
+
+    @staticmethod
+    def subpixel_offset(before: float,
+                        peak: float,
+                        after: float) -> float:
+        """
+        Return the offset in [-0.5, 0.5] of the vertex of the parabola through three samples.
+        """
+        denominator = before - 2.0 * peak + after
+        if denominator >= 0:
+            return 0.0
+        return float(np.clip(0.5 * (before - after) / denominator, -0.5, 0.5))
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Return the global sub-pixel translation found by phase correlation.
+        """
+        if previous_frame is self.previous_source and self.window.shape == previous_frame.shape:
+            previous_spectrum = self.previous_spectrum
+        else:
+            previous_spectrum = self.spectrum(previous_frame)
+        current_spectrum = self.spectrum(current_frame)
+
+        cross_power = cv2.mulSpectrums(current_spectrum, previous_spectrum, 0, conjB=True)
+        cross_power = cv2.mulSpectrums(cross_power, self.smoothing, 0)
+        correlation = cv2.idft(cross_power, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+
+        _, peak, _, (peak_x, peak_y) = cv2.minMaxLoc(correlation)
+        height, width = correlation.shape
+        offset_x = self.subpixel_offset(correlation[peak_y, peak_x - 1], peak,
+                                        correlation[peak_y, (peak_x + 1) % width])
+        offset_y = self.subpixel_offset(correlation[peak_y - 1, peak_x], peak,
+                                        correlation[(peak_y + 1) % height, peak_x])
+
+        # The correlation is periodic: peaks past the middle are negative shifts
+        shift_x = peak_x - width if peak_x > width // 2 else peak_x
+        shift_y = peak_y - height if peak_y > height // 2 else peak_y
+
+        self.confidence = peak / self.perfect_peak
+        self.previous_source = current_frame
+        self.previous_spectrum = current_spectrum
+        return shift_x + offset_x, shift_y + offset_y
+
+    def reset(self) -> None:
+        """
+        Discard the cached window, smoothing and spectrum.
+        """
+        self.window = None
+        self.dft_size = None
+        self.smoothing = None
+        self.previous_source = None
+        self.previous_spectrum = None
+        self.confidence = None
+
+
+class LucasKanadeEstimator(MotionEstimator):
+    """
+    Sparse Lucas-Kanade Feature Tracking Estimator.
+
+    Tracks a few hundred bubble corners (`cv2.goodFeaturesToTrack`) with
+    pyramidal Lucas-Kanade (`cv2.calcOpticalFlowPyrLK`) and reports the median
+    displacement, which ignores the minority of features that are lost or
+    jump to a neighbouring bubble. The cost scales with the number of
+    features rather than with the ROI area, which suits large ROIs.
+
+    Features are not re-detected every frame. Tracked features are carried
+    over to the next frame; features that fail to track or leave the ROI are
+    dropped, and only when fewer than `min_features` remain are new corners
+    detected, away from the surviving ones, to top the set up again.
+
+    Attributes:
+    ----------
+    max_features : int
+        Number of features the set is topped up to.
+    min_features : int
+        Re-seed when fewer features than this remain.
+    quality_level : float
+        Minimal accepted corner quality relative to the best corner.
+    min_distance : int
+        Minimum distance in pixels between features.
+    lk_parameters : dict
+        Window size and pyramid levels passed to `cv2.calcOpticalFlowPyrLK`.
+    points : np.ndarray or None
+        The tracked features, shape (N, 1, 2), in `previous_source`.
+    previous_source : np.ndarray or None
+        The frame `points` belong to; they are reused if it is passed back as
+        `previous_frame`, otherwise features are detected afresh.
+    confidence : float or None
+        Fraction of the features that were tracked successfully in the last estimate.
+
+    Methods:
+    -------
+    detect(frame: np.ndarray, count: int, existing: np.ndarray = None) -> np.ndarray
+        Detects up to `count` new features away from the existing ones.
+    """
+
+    name = "lucas-kanade"
+
+    def __init__(self,
+                 max_features: int = 300,
+                 min_features: int = 150,
+                 quality_level: float = 0.01,
+                 min_distance: int = 5,
+                 win_size: int = 15,
+                 max_level: int = 2) -> None:
+        """
+        Initialize the estimator with the feature detection and tracking parameters.
+        """
+        self.max_features = max_features
+        self.min_features = min_features
+        self.quality_level = quality_level
+        self.min_distance = min_distance
+        self.lk_parameters = {"winSize": (win_size, win_size), "maxLevel": max_level}
+        self.points = None
+        self.previous_source = None
+        self.confidence = None
+
+    def detect(self,
+               frame: np.ndarray,
+               count: int,
+               existing: np.ndarray = None) -> np.ndarray:
+        """
+        Detect up to `count` new features, at least `min_distance` away from existing ones.
+
+        Returns
+        -------
+        np.ndarray
+            The existing features followed by the new ones, shape (N, 1, 2).
+        """
+        mask = None
+        if existing is not None and len(existing):
+            mask = np.full(frame.shape, 255, dtype=np.uint8)
+            for x, y in existing.reshape(-1, 2):
+                cv2.circle(mask, (int(x), int(y)), self.min_distance, 0, -1)
+
+        corners = cv2.goodFeaturesToTrack(frame, count, self.quality_level, self.min_distance, mask=mask)
+        if corners is None:
+            corners = np.empty((0, 1, 2), dtype=np.float32)
+
+        if existing is None:
+            return corners
+        return np.concatenate([existing, corners])
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Return the median displacement of the tracked features.
+        """
+        if previous_frame is not self.previous_source or self.points is None:
+            self.points = self.detect(previous_frame, self.max_features)
+
+        self.previous_source = current_frame
+        if len(self.points) == 0:
+            self.confidence = 0.0
+            self.points = self.detect(current_frame, self.max_features)
+            return 0.0, 0.0
+
+        tracked, status, _ = cv2.calcOpticalFlowPyrLK(previous_frame, current_frame, self.points, None,
+                                                      **self.lk_parameters)
+
+        # Drop features that were lost or left the ROI
+        height, width = current_frame.shape
+        good = ((status.ravel() == 1)
+                & (tracked[:, 0, 0] >= 0) & (tracked[:, 0, 0] <= width - 1)
+                & (tracked[:, 0, 1] >= 0) & (tracked[:, 0, 1] <= height - 1))
+        self.confidence = float(np.count_nonzero(good)) / len(self.points)
+
+        if not good.any():
+            self.points = self.detect(current_frame, self.max_features)
+            return 0.0, 0.0
+
+        displacement = (tracked[good] - self.points[good]).reshape(-1, 2)
+        self.points = tracked[good]
+
+        # Top the feature set up only when too many were lost
+        if len(self.points) < self.min_features:
+            self.points = self.detect(current_frame, self.max_features - len(self.points), self.points)
+
+        return float(np.median(displacement[:, 0])), float(np.median(displacement[:, 1]))
+
+    def reset(self) -> None:
+        """
+        Discard the tracked features.
+        """
+        self.points = None
+        self.previous_source = None
+        self.confidence = None
+
+
+class TemplateMatchingEstimator(MotionEstimator):
+    """
+    Template Matching Estimator from the Original Application.
+
+    The middle third of the previous frame is the template; its best match
+    (normalized cross-correlation) in the current frame gives the displacement.
+    Motion larger than a third of the ROI cannot be measured.
+    """
+
+    name = "template"
+
+    def estimate(self,
+                 previous_frame: np.ndarray,
+                 current_frame: np.ndarray) -> tuple[float, float]:
+        """
+        Return the whole-pixel displacement of the central third of the ROI.
+        """
+        height, width = previous_frame.shape
+        third_x, third_y = max(1, width // 3), max(1, height // 3)
+        template = previous_frame[third_y:2 * third_y, third_x:2 * third_x]
+
+        result = cv2.matchTemplate(current_frame, template, cv2.TM_CCOEFF_NORMED)
+        _, _, _, max_loc = cv2.minMaxLoc(result)
+        return float(max_loc[0] - third_x), float(max_loc[1] - third_y)
+
+
+ESTIMATORS = {
+    "farneback": FarnebackEstimator,
+    "farneback-warm": lambda: FarnebackEstimator(warm_start=True),
+    "dis-ultrafast": lambda: DISEstimator("ultrafast"),
+    "dis-fast": lambda: DISEstimator("fast"),
+    "phase": PhaseCorrelationEstimator,
+    "lucas-kanade": LucasKanadeEstimator,
+    "template": TemplateMatchingEstimator,
+}
+
+
+def create_estimator(name: str) -> MotionEstimator:
+    """
+    Create a new estimator from its name.
+
+    Parameters
+    ----------
+    name : str
+        One of the keys of `ESTIMATORS`.
+
+    Returns
+    -------
+    MotionEstimator
+        A new estimator instance for one ROI.
+
+    Raises
+    ------
+    ValueError
+        If the name is unknown.
+    """
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator: {name}. Choose from {', '.join(ESTIMATORS)}")
+    return ESTIMATORS[name]()
@@ -29,7 +29,7 @@ Imports:
 
 from PySide6.QtWidgets import (QPushButton, QLabel, QFileDialog, 
                                QVBoxLayout, QMessageBox, QDialog, QLineEdit, QCheckBox,
-                               QHBoxLayout, QFileDialog, QRadioButton, QFrame)
+                               QHBoxLayout, QFileDialog, QRadioButton, QFrame, QSpinBox)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 import numpy as np
@@ -64,6 +64,10 @@ class Export:
         Indicates whether to save video files in the same directory as data files.
     record_video : bool
         Indicates whether video recording is enabled.
+    segment_minutes : int
+        Length of a recording segment in minutes (0 for no time limit).
+    segment_megabytes : int
+        Size of a recording segment in megabytes (0 for no size limit).
     font_big : QFont
         Font used for larger text elements in the export settings dialog.
     font_small : QFont
@@ -85,14 +89,15 @@ class Export:
         Opens a file dialog to select the directory for saving data files.
     save_export_settings(dialog: QDialog, filename_input: QLineEdit) -> None
         Saves the configured export and video recording settings.
-    excel_resutls(rois: list, arrow_angle: float) -> None
+    excel_resutls(rois: list, arrow_angle: float, quality_log: list = None) -> None
         Exports ROI analysis results to an Excel file.
-    collect_export_data(rois: list, arrow_angle: float) -> dict
+    collect_export_data(rois: list, arrow_angle: float, quality_log: list = None) -> dict
         Collects and structures export data, including ROI movement data and arrow direction.
-    get_average_velocity(velocity: float, frame_count: int, timestamp: str) -> tuple
+    get_average_velocity(velocity: float, frame_count: int, timestamp: float) -> tuple
         Calculates the average velocity over 15 frames based on the given velocity and timestamps.
     write_csv(file_path: str, data: dict) -> None
-        Writes the export data to an Excel file with separate sheets for each ROI.
+        Writes the export data to an Excel file with separate sheets for each ROI
+        and, if present, a sheet of the quality changes.
     """
     def __init__(self, 
                  parent: object = None) -> None:
@@ -110,6 +115,8 @@ class Export:
             velocity_sum (float): Sum of velocities, initialized to 0.0.
             save_video_in_same_dir (bool): Flag indicating whether to save video in the same directory as data.
             record_video (bool): Flag indicating whether video recording is enabled.
+            segment_minutes (int): Minutes per recording segment, 0 for no time limit.
+            segment_megabytes (int): Megabytes per recording segment, 0 for no size limit.
             font_big (QFont): Font used for larger text elements.
             font_small (QFont): Font used for smaller text elements.
         """
@@ -122,6 +129,8 @@ class Export:
         
         self.save_video_in_same_dir = True
         self.record_video = True
+        self.segment_minutes = 0
+        self.segment_megabytes = 0
         
         self.font_big = QFont("Arial", 13)
         self.font_small = QFont("Arial", 12)
@@ -282,6 +291,27 @@ class Export:
         video_filename_input = QLineEdit(self.export_filename, dialog)
         video_filename_input.setObjectName("video_filename_input")
         layout.addWidget(video_filename_input)
+        
+        # Split long recordings into segments; 0 turns a limit off
+        segment_layout = QHBoxLayout()
+        segment_label = QLabel("New segment every (0 = off):", dialog)
+        segment_label.setFont(self.font_small)
+        segment_layout.addWidget(segment_label)
+        
+        segment_minutes_input = QSpinBox(dialog)
+        segment_minutes_input.setObjectName("segment_minutes_input")
+        segment_minutes_input.setRange(0, 24 * 60)
+        segment_minutes_input.setSuffix(" min")
+        segment_minutes_input.setValue(self.segment_minutes)
+        segment_layout.addWidget(segment_minutes_input)
+        
+        segment_megabytes_input = QSpinBox(dialog)
+        segment_megabytes_input.setObjectName("segment_megabytes_input")
+        segment_megabytes_input.setRange(0, 100000)
+        segment_megabytes_input.setSuffix(" MB")
+        segment_megabytes_input.setValue(self.segment_megabytes)
+        segment_layout.addWidget(segment_megabytes_input)
+        layout.addLayout(segment_layout)
     
     def enable_video_recording(self, 
                                if_record_video: bool) -> None:
@@ -339,6 +369,8 @@ class Export:
         
         video_filename_input = dialog.findChild(QLineEdit, "video_filename_input")
         self.video_filename = video_filename_input.text()
+        self.segment_minutes = dialog.findChild(QSpinBox, "segment_minutes_input").value()
+        self.segment_megabytes = dialog.findChild(QSpinBox, "segment_megabytes_input").value()
         
         # Display a warning if the directory is not set
         if not self.export_directory:
@@ -374,7 +406,8 @@ class Export:
         
     def excel_resutls(self, 
                       rois: list, 
-                      arrow_angle: float) -> None:
+                      arrow_angle: float,
+                      quality_log: list = None) -> None:
         """
         Handles exporting data for the program.
         """
@@ -390,7 +423,7 @@ class Export:
             file_path_csv = f"{self.export_directory}/{self.export_filename}.csv"
 
             # Step 1: Collect data
-            export_data = self.collect_export_data(rois, arrow_angle)
+            export_data = self.collect_export_data(rois, arrow_angle, quality_log)
 
             # Step 2: Write to both CSV and JSON
             self.write_csv(file_path_csv, export_data)
@@ -408,7 +441,8 @@ class Export:
 
     def collect_export_data(self, 
                             rois: list, 
-                            arrow_angle: float) -> dict:
+                            arrow_angle: float,
+                            quality_log: list = None) -> dict:
         
         """
         Collects and structures export data from the given regions of interest (ROIs).
@@ -422,6 +456,8 @@ class Export:
             rois (list): A list of ROIs, each containing an analysis module with
                 frame-level results including velocity and timestamp.
             arrow_angle (float): The direction of the arrow in radians.
+            quality_log (list, optional): The changes made by a
+                `QualityController`, exported as a "Quality Log" sheet.
 
         Returns:
             dict: A dictionary containing the arrow direction in degrees and an
@@ -441,33 +477,37 @@ class Export:
             }
             
             frame_count = 0
+            history = roi.analysis_module.velocity_history
             
-            for frame_index, frame_data in enumerate(roi.analysis_module.get_results()):
-                velocity = frame_data["velocity"]
-                timestamp = frame_data["timestamp"]
-                
-                print("frame_index", frame_index + 1)
-                print("delta", velocity)
-                print("timestamp", timestamp)
-                
+            for frame_index, (velocity, timestamp, skipped) in enumerate(zip(history.velocities.tolist(),
+                                                                             history.timestamps.tolist(),
+                                                                             history.skipped.tolist())):
                 average_velocity, frame_count = self.get_average_velocity(velocity, frame_count, timestamp)
                 
                 roi_data["Movement Data"].append({
                     "Frame Index": frame_index + 1,
                     "Velocity": velocity,
-                    "Timestamp": timestamp,
+                    "Timestamp": history.format_timestamp(timestamp),
                     "Average Velocity": average_velocity,
+                    "Skipped": skipped,
                 })
                 
             data["roi_data"].append(roi_data)
+        
+        if quality_log:
+            data["quality_log"] = []
+            for change in quality_log:
+                timestamp = change["timestamp"]
+                if timestamp is not None and rois:
+                    timestamp = rois[0].analysis_module.velocity_history.format_timestamp(timestamp)
+                data["quality_log"].append({**change, "timestamp": timestamp})
             
-        print(data)
         return data
     
     def get_average_velocity(self, 
                              velocity: float, 
                              frame_count: int, 
-                             timestamp: str) -> tuple:  
+                             timestamp: float) -> tuple:  
         """
         Calculate the average velocity over 15 frames.
 
@@ -477,8 +517,8 @@ class Export:
             The velocity of the current frame.
         frame_count : int
             The number of frames that have been processed so far.
-        timestamp : str
-            The timestamp of the current frame.
+        timestamp : float
+            The monotonic timestamp of the current frame in seconds.
 
         Returns
         -------
@@ -495,13 +535,13 @@ class Export:
         self.velocity_sum += velocity
         
         if frame_count == 1:
-            self.start_time = datetime.strptime(timestamp, "%d/%m/%Y %H:%M:%S.%f")
-            
+            self.start_time = timestamp
             
         if frame_count == 15:
-            self.end_time = datetime.strptime(timestamp, "%d/%m/%Y %H:%M:%S.%f")
-            time_diff_temp = self.end_time - self.start_time
-            time_diff = time_diff_temp.total_seconds()
+            self.end_time = timestamp
+            time_diff = self.end_time - self.start_time
+            if time_diff <= 0:
+                return None, 0
             average_velocity = self.velocity_sum / time_diff
             return average_velocity, 0
         
@@ -532,7 +572,8 @@ class Export:
             ws.append(["Frame Index", 
                        "Velocity(pixels/frame)",
                        "Timestamp",
-                       "Average Velocity(pixels/seconds)"
+                       "Average Velocity(pixels/seconds)",
+                       "Skipped (no flow computed)"
                        ])
 
             # Add movement data
@@ -540,9 +581,19 @@ class Export:
                 ws.append([movement["Frame Index"], 
                            movement["Velocity"],
                            movement["Timestamp"],
-                           movement["Average Velocity"]
+                           movement["Average Velocity"],
+                           movement.get("Skipped", False)
                            ])
 
+        # Add the quality changes of an adaptive run
+        if data.get("quality_log"):
+            ws = wb.create_sheet(title="Quality Log")
+            ws.append(["Timestamp", "ROI", "From Step", "To Step", "Reason",
+                       "Frame Cost (ms)", "Budget (ms)", "Settings"])
+            for change in data["quality_log"]:
+                ws.append([change["timestamp"], change["roi"], change["from_level"], change["to_level"],
+                           change["reason"], change["frame_cost_ms"], change["budget_ms"], change["settings"]])
+
         # Save the workbook
         wb.save(file_path)
 
@@ -0,0 +1,165 @@
+"""Frame Rate Estimator Module for Froth Tracker Application.
+
+This module defines the `FPSEstimator` class, which keeps a running estimate
+of the rate at which a source delivers frames. It is fed the capture
+timestamp of every frame, so it costs nothing extra and never reads or
+discards frames of its own.
+
+The estimate is an exponentially weighted moving average (EWMA) of the
+interval between frames, which follows changes of the camera's rate (e.g.
+a longer exposure in low light) within a few dozen frames while smoothing
+out scheduling noise. Until the average has warmed up it is a plain running
+mean, so the first intervals after start-up do not dominate it. The
+exponentially weighted variance of the interval is kept as well; its square
+root, the jitter, says how regular the frames arrive. Intervals are averaged
+rather than instantaneous rates, whose mean is biased upwards by the
+occasional short interval.
+
+Classes:
+--------
+FPSEstimator
+    Running frame rate and jitter estimate from frame timestamps.
+
+Imports:
+--------
+- math: For the jitter (standard deviation) of the interval.
+- threading: For reading the estimate while the capture thread updates it.
+"""
+
+import math
+import threading
+
+
+class FPSEstimator:
+    """
+    FPS Estimator Class for a Running Frame Rate Estimate.
+
+    Attributes:
+    ----------
+    smoothing : float
+        Weight of the newest interval in the moving averages.
+    warmup : int
+        Intervals needed before the estimate is considered reliable.
+    mean_interval : float or None
+        Smoothed interval between frames in seconds.
+    interval_variance : float
+        Smoothed variance of the interval in seconds squared.
+    intervals : int
+        Number of intervals measured so far.
+
+    Methods:
+    -------
+    update(timestamp: float, frames: int = 1) -> None
+        Records the timestamp of a frame.
+    is_ready() -> bool
+        Returns True once `warmup` intervals were measured.
+    fps() -> float or None
+        Returns the estimated frame rate.
+    jitter() -> float
+        Returns the standard deviation of the frame interval in seconds.
+    get_statistics() -> dict
+        Returns the frame rate, mean interval and jitter.
+    reset() -> None
+        Forgets all measurements.
+    """
+
+    def __init__(self,
+                 smoothing: float = 0.05,
+                 warmup: int = 10) -> None:
+        """
+        Initialize the estimator.
+
+        Parameters
+        ----------
+        smoothing : float
+            Weight of the newest interval in the moving averages, between 0
+            and 1. Smaller values give a steadier but slower estimate.
+        warmup : int
+            Intervals needed before the estimate is considered reliable.
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"The smoothing factor must be in (0, 1], got {smoothing}")
+
+        self.smoothing = smoothing
+        self.warmup = warmup
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget all measurements, e.g. when the source changes.
+        """
+        self.last_timestamp = None
+        self.mean_interval = None
+        self.interval_variance = 0.0
+        self.intervals = 0
+
+    def update(self,
+               timestamp: float,
+               frames: int = 1) -> None:
+        """
+        Record the timestamp of a frame.
+
+        Parameters
+        ----------
+        timestamp : float
+            Capture time of the frame in seconds.
+        frames : int
+            Number of source frames since the previous recorded frame, if
+            frames in between were skipped without being timestamped.
+        """
+        with self.lock:
+            previous, self.last_timestamp = self.last_timestamp, timestamp
+            if previous is None or timestamp <= previous or frames < 1:
+                return
+
+            interval = (timestamp - previous) / frames
+            self.intervals += 1
+            if self.mean_interval is None:
+                self.mean_interval = interval
+                return
+
+            # Exponentially weighted mean and variance; a plain mean while warming up
+            weight = max(self.smoothing, 1.0 / self.intervals)
+            deviation = interval - self.mean_interval
+            self.mean_interval += weight * deviation
+            self.interval_variance = (1 - weight) * (self.interval_variance + weight * deviation * deviation)
+
+    def is_ready(self) -> bool:
+        """
+        Return True once enough intervals were measured for a reliable estimate.
+        """
+        return self.intervals >= self.warmup
+
+    def fps(self) -> float:
+        """
+        Return the estimated frame rate, or None before the first interval.
+        """
+        with self.lock:
+            if not self.mean_interval:
+                return None
+            return 1.0 / self.mean_interval
+
+    def jitter(self) -> float:
+        """
+        Return the standard deviation of the frame interval in seconds.
+        """
+        return math.sqrt(self.interval_variance)
+
+    def get_statistics(self) -> dict:
+        """
+        Return the current estimate.
+
+        Returns
+        -------
+        dict
+            `fps` (None before the first interval), `interval_ms`,
+            `jitter_ms` and `intervals`.
+        """
+        fps = self.fps()
+        return {
+            "fps": fps,
+            "interval_ms": 1000.0 / fps if fps else None,
+            "jitter_ms": self.jitter() * 1000.0,
+            "intervals": self.intervals,
+        }
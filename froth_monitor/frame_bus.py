@@ -0,0 +1,281 @@
+"""Shared-Memory Frame Bus Module for Froth Tracker Application.
+
+This module defines the `SharedFrameRing` class, a ring of fixed-size frame
+slots in a `multiprocessing.shared_memory` block. One process writes frames
+into the ring and any number of processes read the most recent one, without
+pickling or copying the frame through a pipe. The analysis engine uses it to
+publish its preview frames to the monitor GUI (see `froth_monitor.engine`).
+
+Memory layout:
+--------------
+The block starts with a header (the total number of frames written, then one
+record of sequence number, frame index and timestamp per slot), followed by
+the slots themselves as one contiguous `(slots, height, width, channels)`
+uint8 array.
+
+Every slot is guarded by a sequence lock: the writer makes the sequence
+number odd before it touches the slot and even again when the frame is
+complete. A reader copies the slot and accepts the copy only if the sequence
+number was even and unchanged before and after, so a reader never returns a
+half-written frame and never blocks the writer. With several slots the writer
+is normally far away from the slot being read.
+
+Classes:
+--------
+SharedFrameRing
+    Single-writer, multi-reader ring of frame slots in shared memory.
+
+Functions:
+----------
+attach_shared_memory(name: str) -> shared_memory.SharedMemory
+    Attaches to an existing block without taking ownership of it.
+
+Imports:
+--------
+- contextlib: For the in-place slot writer.
+- multiprocessing.shared_memory, multiprocessing.resource_tracker: For the shared block.
+- numpy: For the header and slot views.
+"""
+
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+HEADER_ALIGNMENT = 64
+SLOT_RECORD = np.dtype([("sequence", np.int64), ("frame_index", np.int64), ("timestamp", np.float64)])
+
+_created_blocks: set = set()  # Names of the blocks created (and tracked) by this process
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+
+    Before Python 3.13 every attaching process registers the block with its
+    resource tracker, which unlinks it when that process exits, so a closed
+    reader would destroy the writer's ring. The registration is undone here;
+    only the creating process unlinks the block. A block created by this
+    process itself keeps its single registration.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # No track argument before Python 3.13
+        block = shared_memory.SharedMemory(name=name)
+        if block.name not in _created_blocks:
+            resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+class SharedFrameRing:
+    """
+    Shared Frame Ring Class for Passing Frames Between Processes.
+
+    Attributes:
+    ----------
+    shape : tuple[int, ...]
+        Shape of every frame, e.g. (height, width, 3).
+    slots : int
+        Number of frame slots in the ring.
+    owner : bool
+        True in the process that created (and will unlink) the block.
+    block : shared_memory.SharedMemory
+        The shared memory block.
+    header : np.ndarray
+        One `SLOT_RECORD` per slot, backed by the block.
+    frames : np.ndarray
+        The `(slots, *shape)` uint8 slot array, backed by the block.
+    torn_reads : int
+        Number of reads in this process that were retried because the writer
+        was using the slot.
+
+    Methods:
+    -------
+    create(shape: tuple, slots: int = 4) -> SharedFrameRing
+        Creates a new ring (writer side).
+    attach(name: str, shape: tuple, slots: int) -> SharedFrameRing
+        Attaches to an existing ring (reader side).
+    describe() -> dict
+        Returns the name, shape and slot count a reader needs to attach.
+    writing(frame_index: int, timestamp: float) -> contextmanager
+        Yields the next slot for writing a frame in place.
+    write(frame: np.ndarray, frame_index: int, timestamp: float) -> None
+        Copies a frame into the next slot.
+    frames_written() -> int
+        Returns the number of frames written so far.
+    read_latest(out: np.ndarray = None, retries: int = 3) -> tuple or None
+        Returns a copy of the most recent complete frame.
+    close() -> None
+        Releases this process's view of the block, unlinking it if owned.
+    """
+
+    def __init__(self,
+                 block: shared_memory.SharedMemory,
+                 shape: tuple,
+                 slots: int,
+                 owner: bool) -> None:
+        """
+        Map the header and slot arrays onto a shared memory block.
+
+        Use `create` or `attach` instead of calling this directly.
+        """
+        self.block = block
+        self.shape = tuple(int(v) for v in shape)
+        self.slots = int(slots)
+        self.owner = owner
+        self.torn_reads = 0
+
+        header_size = self.header_size(self.slots)
+        self.written = np.ndarray((1,), dtype=np.int64, buffer=block.buf, offset=0)
+        self.header = np.ndarray((self.slots,), dtype=SLOT_RECORD, buffer=block.buf,
+                                 offset=np.dtype(np.int64).itemsize)
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=block.buf,
+                                 offset=header_size)
+
+    @staticmethod
+    def header_size(slots: int) -> int:
+        """
+        Return the size of the header in bytes, rounded up to a cache line.
+        """
+        size = np.dtype(np.int64).itemsize + slots * SLOT_RECORD.itemsize
+        return -(-size // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
+
+    @classmethod
+    def create(cls,
+               shape: tuple,
+               slots: int = 4) -> "SharedFrameRing":
+        """
+        Create a new, empty ring. The calling process owns the block.
+
+        Parameters
+        ----------
+        shape : tuple[int, ...]
+            Shape of every frame, e.g. (height, width, 3).
+        slots : int
+            Number of frame slots; at least 2.
+        """
+        if slots < 2:
+            raise ValueError("A frame ring needs at least 2 slots")
+
+        size = cls.header_size(slots) + int(np.prod(shape)) * slots
+        block = shared_memory.SharedMemory(create=True, size=size)
+        _created_blocks.add(block.name)
+        ring = cls(block, shape, slots, owner=True)
+        ring.written[0] = 0
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls,
+               name: str,
+               shape: tuple,
+               slots: int) -> "SharedFrameRing":
+        """
+        Attach to a ring created by another process, as described by its `describe()`.
+        """
+        return cls(attach_shared_memory(name), shape, slots, owner=False)
+
+    def describe(self) -> dict:
+        """
+        Return the name, shape and slot count a reader needs to attach.
+        """
+        return {"name": self.block.name, "shape": self.shape, "slots": self.slots}
+
+    @contextmanager
+    def writing(self,
+                frame_index: int,
+                timestamp: float):
+        """
+        Yield the next slot so that a frame can be written into it in place.
+
+        The slot is published when the block exits, e.g.::
+
+            with ring.writing(frame_index, timestamp) as slot:
+                cv2.resize(frame, (width, height), dst=slot)
+        """
+        count = int(self.written[0])
+        slot = count % self.slots
+        record = self.header[slot]
+
+        self.header["sequence"][slot] = record["sequence"] + 1  # Odd: being written
+        try:
+            yield self.frames[slot]
+        finally:
+            self.header["frame_index"][slot] = frame_index
+            self.header["timestamp"][slot] = timestamp
+            self.header["sequence"][slot] += 1  # Even: complete
+            self.written[0] = count + 1
+
+    def write(self,
+              frame: np.ndarray,
+              frame_index: int,
+              timestamp: float) -> None:
+        """
+        Copy a frame of the ring's shape into the next slot.
+        """
+        with self.writing(frame_index, timestamp) as slot:
+            np.copyto(slot, frame)
+
+    def frames_written(self) -> int:
+        """
+        Return the number of frames written to the ring so far.
+        """
+        return int(self.written[0])
+
+    def read_latest(self,
+                    out: np.ndarray = None,
+                    retries: int = 3) -> tuple:
+        """
+        Return a copy of the most recently completed frame.
+
+        Parameters
+        ----------
+        out : np.ndarray, optional
+            Array of the ring's frame shape to copy into, avoiding an allocation.
+        retries : int
+            Number of attempts if the writer overwrites the slot during the copy.
+
+        Returns
+        -------
+        tuple or None
+            `(frame, frame_index, timestamp)`, or None if nothing was written
+            yet or every attempt was torn.
+        """
+        for _ in range(retries):
+            count = int(self.written[0])
+            if count == 0:
+                return None
+
+            slot = (count - 1) % self.slots
+            before = int(self.header["sequence"][slot])
+            if before % 2:
+                self.torn_reads += 1
+                continue
+
+            if out is None:
+                frame = self.frames[slot].copy()
+            else:
+                np.copyto(out, self.frames[slot])
+                frame = out
+            frame_index = int(self.header["frame_index"][slot])
+            timestamp = float(self.header["timestamp"][slot])
+
+            if int(self.header["sequence"][slot]) == before:
+                return frame, frame_index, timestamp
+            self.torn_reads += 1
+
+        return None
+
+    def close(self) -> None:
+        """
+        Release this process's view of the ring; the owner also unlinks it.
+        """
+        # The numpy views must go before the buffer can be released
+        self.written = self.header = self.frames = None
+        self.block.close()
+        if self.owner:
+            _created_blocks.discard(self.block.name)
+            try:
+                self.block.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,117 @@
+"""Frame Clock Module for Froth Tracker Application.
+
+This module defines the `FrameClock` class, which produces numeric frame
+timestamps. A timestamp is the number of seconds elapsed since the clock was
+created, measured with the monotonic `time.perf_counter_ns` counter. A single
+wall-clock anchor, taken when the clock is created, is used to turn these
+numbers into readable date strings only when they are exported.
+
+Capturing one timestamp per frame and sharing it between all ROIs means that
+every ROI reports the same time for the same frame, that no string formatting
+or parsing happens per frame, and that time differences are immune to
+wall-clock adjustments (NTP corrections, daylight saving changes).
+
+Classes:
+--------
+FrameClock
+    Monotonic frame timestamps with a wall-clock anchor for display.
+
+Imports:
+--------
+- time: For the monotonic counter and the wall-clock anchor.
+- datetime: For formatting timestamps on demand.
+"""
+
+import time
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S.%f"
+
+
+class FrameClock:
+    """
+    Frame Clock Class for Monotonic Timestamps.
+
+    Attributes:
+    ----------
+    wall_anchor : float
+        Wall-clock time (seconds since the epoch) at which the clock was created.
+    monotonic_anchor_ns : int
+        Value of `time.perf_counter_ns()` at which the clock was created.
+
+    Methods:
+    -------
+    now() -> float
+        Returns the seconds elapsed since the clock was created.
+    to_wall_time(timestamp: float) -> float
+        Converts a timestamp to seconds since the epoch.
+    format(timestamp: float) -> str
+        Formats a timestamp as "dd/mm/yyyy HH:MM:SS.sss".
+    """
+
+    def __init__(self,
+                 wall_anchor: float = None) -> None:
+        """
+        Initialize the clock and record the wall-clock anchor.
+
+        Parameters
+        ----------
+        wall_anchor : float, optional
+            Wall-clock time (seconds since the epoch) that timestamp 0 maps to.
+            Defaults to the current time. Offline analysis passes a fixed
+            anchor so that media timestamps format the same on every run.
+        """
+        self.monotonic_anchor_ns = time.perf_counter_ns()
+        self.wall_anchor = time.time() if wall_anchor is None else float(wall_anchor)
+
+    def now(self) -> float:
+        """
+        Return the current timestamp.
+
+        Returns
+        -------
+        float
+            Seconds elapsed since the clock was created.
+        """
+        return (time.perf_counter_ns() - self.monotonic_anchor_ns) * 1e-9
+
+    def to_wall_time(self,
+                     timestamp: float) -> float:
+        """
+        Convert a timestamp of this clock to seconds since the epoch.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp returned by `now`.
+
+        Returns
+        -------
+        float
+            The matching wall-clock time.
+        """
+        return self.wall_anchor + float(timestamp)
+
+    def format(self,
+               timestamp: float) -> str:
+        """
+        Format a timestamp of this clock as dd/mm/yyyy HH:MM:SS.sss.
+
+        Parameters
+        ----------
+        timestamp : float
+            Timestamp returned by `now`.
+
+        Returns
+        -------
+        str
+            The matching wall-clock time as a string.
+        """
+        return format_wall_time(self.to_wall_time(timestamp))
+
+
+def format_wall_time(wall_time: float) -> str:
+    """
+    Format seconds since the epoch as dd/mm/yyyy HH:MM:SS.sss.
+    """
+    return datetime.fromtimestamp(wall_time).strftime(TIMESTAMP_FORMAT)[:-3]
@@ -13,7 +13,8 @@ Key Features:
 
 2. **Region of Interest (ROI)**:
    - Allows users to draw rectangular ROIs directly on the video canvas.
-   - Each ROI is individually tracked, with velocities and other metrics computed using Farneback Optical Flow.
+   - Each ROI is individually tracked, with velocities and other metrics computed using Farneback Optical Flow
+     or another motion estimator selected for the ROI when it is drawn.
 
 3. **Overflow Direction Arrow**:
    - Users can draw an arrow indicating the overflow direction, which is used in ROI analysis.
@@ -80,10 +81,11 @@ Usage:
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel, QFileDialog, 
                                 QMenuBar, QMenu, QWidget, QVBoxLayout, QGridLayout, 
-                                QComboBox, QMessageBox, QDialog, QLineEdit)
+                                QComboBox, QMessageBox, QDialog, QLineEdit, QCheckBox)
 from PySide6.QtGui import QPixmap, QPainter, QPen, QImage, QCloseEvent, QMouseEvent
 from PySide6.QtCore import Qt, QTimer, QRect, QPoint
 import pyqtgraph as pg
+import os
 import sys
 import cv2
 import time
@@ -94,6 +96,20 @@ from .autosaver import AutoSaver
 from .video_recorder import VideoRecorder
 from .roi import ROI
 from .export import Export
+from .multi_roi import MultiROIAnalysis
+from .frame_clock import FrameClock
+from .capture import FrameCapture, DROP_OLDEST, BLOCK
+from .estimators import ESTIMATORS
+from .image_analysis import DEFAULT_CHANGE_THRESHOLD
+from .quality import QualityController
+from .pacing import FramePacer, poll_interval_ms, REALTIME, FASTEST, MULTIPLIER
+
+ROI_STRIDES = (1, 2, 3, 5, 10)
+PLAYBACK_MODES = (("Real-time playback", REALTIME, 1.0),
+                  ("Fastest playback", FASTEST, 1.0),
+                  ("Playback at 0.5x", MULTIPLIER, 0.5),
+                  ("Playback at 2x", MULTIPLIER, 2.0),
+                  ("Playback at 4x", MULTIPLIER, 4.0))
         
 class MainGUI(QMainWindow):
     """
@@ -110,12 +126,36 @@ class MainGUI(QMainWindow):
     ----------
     video_capture : cv2.VideoCapture
         Object to capture video from a file or camera feed.
+    frame_capture : FrameCapture or None
+        Worker that reads frames from video_capture into a bounded queue.
+    source_fps : float
+        Nominal frame rate of the source, read once before the worker starts
+        (0 if unknown), since only the worker may touch video_capture then.
+    capture_status_label : QLabel
+        Status bar label showing captured, dropped and late frame counts.
     timer : QTimer
         Timer object for controlling frame updates in real-time.
     playing : bool
         Indicates whether the video or camera feed is currently playing.
     rois : list[ROI]
         List of Region of Interest (ROI) objects for tracking and analysis.
+    estimator_combo : QComboBox
+        Selector of the motion estimator used for newly drawn ROIs.
+    roi_analysis : MultiROIAnalysis
+        Analyses all ROIs of a frame on a thread pool (one thread per CPU),
+        optionally sharing flow between overlapping ROIs.
+    cluster_checkbox : QCheckBox
+        Toggles sharing one flow field between overlapping or adjacent ROIs.
+    skip_static_checkbox : QCheckBox
+        Enables frame-change gating for newly drawn ROIs.
+    stride_combo : QComboBox
+        Selector of the flow stride (every Nth frame) of newly drawn ROIs.
+    quality_controller : QualityController
+        Lowers or raises the analysis quality of ROIs to keep up with the source frame rate.
+    adaptive_quality_checkbox : QCheckBox
+        Toggles the quality controller.
+    playback_combo : QComboBox
+        Selector of the playback mode of video files (real time, fastest or a speed multiple).
     current_roi_start : QPoint or None
         Starting point for the currently drawn ROI.
     current_roi_rect : QRect or None
@@ -138,7 +178,7 @@ class MainGUI(QMainWindow):
         Indicates whether video recording is active.
     video_writer : VideoRecorder or None
         Instance of the VideoRecorder class for managing video recording.
-    fps_recording : int
+    fps_recording : float
         Frames per second of the video recording.
     realtime_input : bool
         Indicates whether the input is a real-time camera feed.
@@ -173,10 +213,30 @@ class MainGUI(QMainWindow):
         Opens a dialog to select and load a live camera feed.
     load_selected_camera(camera_combo: QComboBox, dialog: QDialog):
         Loads the selected camera based on user input.
+    start_capture(drop_policy: str, pacer: FramePacer = None):
+        Starts the capture worker thread for the current video source.
+    poll_interval() -> int:
+        Returns the display timer interval for the current source and playback speed.
+    update_frame_budget():
+        Sets the quality controller's frame rate from the measured or file frame rate and playback speed.
+    adapts_quality() -> bool:
+        Returns True if the quality controller is enabled and frames have a deadline.
+    set_playback_mode():
+        Applies the selected playback mode to the video file being played.
+    stop_capture(release: bool = False):
+        Stops the capture worker thread and optionally releases the video source.
+    has_source() -> bool:
+        Returns True if a video file or camera is loaded, without touching a capture the worker owns.
+    update_capture_status():
+        Shows the capture counters in the status bar.
     pause_play():
         Toggles video playback state.
     display_frame():
         Reads and processes frames from the video capture for real-time display.
+    set_roi_clustering(enabled: bool):
+        Turns sharing one flow field between overlapping ROIs on or off.
+    open_engine_monitor():
+        Opens a monitor window for an analysis engine running in another process.
     start_drawing_roi():
         Starts drawing a new ROI on the video canvas.
     mouse_press_event(event: QMouseEvent):
@@ -200,7 +260,7 @@ class MainGUI(QMainWindow):
     lock_arrow_direction():
         Locks the overflow direction arrow and saves the angle.
     fps_calculation():
-        Calculates the frames per second (FPS) of the video input.
+        Sets the recording FPS from the measured frame rate of the video input.
     start_recording():
         Initiates video recording to a specified directory.
     stop_recording():
@@ -232,12 +292,17 @@ class MainGUI(QMainWindow):
         
         # Video-related attributes
         self.video_capture: cv2.VideoCapture = None
+        self.frame_capture: FrameCapture = None
+        self.source_fps = 0.0
         self.timer: QTimer = QTimer(self)
         self.timer.timeout.connect(self.display_frame)
         self.playing: bool = False
         
         # ROI and Video Analysis
+        self.frame_clock: FrameClock = FrameClock()  # Shared timestamps for all ROIs
         self.rois: list = []  # List of ROI instances
+        self.roi_analysis: MultiROIAnalysis = MultiROIAnalysis(workers=os.cpu_count() or 1)  # ROIs analysed concurrently
+        self.quality_controller: QualityController = QualityController()  # Holds the per-frame time budget
         self.current_roi_start = None  # Starting point of the currently drawn ROI
         self.current_roi_rect = None  # QRect of the ROI being drawn
         self.drawing_roi = False  # Flag for ROI drawing
@@ -255,11 +320,12 @@ class MainGUI(QMainWindow):
         # Video recording
         self.recording: bool = False
         self.video_writer: VideoRecorder = None
-        self.fps_recording: int = 0
+        self.fps_recording: float = 0
         self.realtime_input: bool = False
         
         # Auto Save
         self.auto_saver: AutoSaver = AutoSaver()
+        self.auto_saver.set_wall_anchor(self.frame_clock.wall_anchor)
         self.auto_saver.load_from_file
         
         
@@ -309,6 +375,10 @@ class MainGUI(QMainWindow):
         grid_layout.addWidget(self.direction_textbox, 1, 1, 1, 1)
         
         self.add_buttons(grid_layout)
+        
+        # Capture statistics
+        self.capture_status_label = QLabel(self)
+        self.statusBar().addPermanentWidget(self.capture_status_label)
 
     def createMenuBar(self) -> None:
         """
@@ -327,6 +397,7 @@ class MainGUI(QMainWindow):
         menu_bar.addMenu(file_menu)
         file_menu.addAction("Import Local Video", self.import_local_video)
         file_menu.addAction("Load Camera", self.load_camera_dialog)
+        file_menu.addAction("Monitor Analysis Engine", self.open_engine_monitor)
 
         # Export menu
         export_menu = QMenu("Export", self)
@@ -337,7 +408,9 @@ class MainGUI(QMainWindow):
         """
         Adds buttons to the layout for adding a ROI, pausing/resuming the video,
         confirming the arrow direction, saving the current state, resetting the application,
-        and starting video recording.
+        and starting video recording, plus the motion estimator selector for new ROIs
+        the ROI clustering toggle, the frame-change gating toggle and the
+        flow stride selector.
         """
         
         self.add_roi_button = QPushButton("Add One ROI", self)
@@ -363,6 +436,41 @@ class MainGUI(QMainWindow):
         self.start_record_button = QPushButton("Start Recording", self)
         self.start_record_button.clicked.connect(self.start_recording)
         layout.addWidget(self.start_record_button, 7, 0, 1, 2)
+        
+        # Motion estimator for the next ROI drawn; existing ROIs keep theirs
+        self.estimator_combo = QComboBox(self)
+        self.estimator_combo.addItems(list(ESTIMATORS))
+        self.estimator_combo.setToolTip("Motion estimator used for newly drawn ROIs")
+        layout.addWidget(self.estimator_combo, 8, 0, 1, 2)
+        
+        # One flow field per group of overlapping ROIs instead of one per ROI
+        self.cluster_checkbox = QCheckBox("Share flow between overlapping ROIs", self)
+        self.cluster_checkbox.toggled.connect(self.set_roi_clustering)
+        layout.addWidget(self.cluster_checkbox, 9, 0, 1, 2)
+        
+        # Newly drawn ROIs skip the flow of unchanged (duplicate or static) frames
+        self.skip_static_checkbox = QCheckBox("Skip unchanged frames in new ROIs", self)
+        layout.addWidget(self.skip_static_checkbox, 10, 0, 1, 2)
+        
+        # Flow stride of newly drawn ROIs, for slow froth
+        self.stride_combo = QComboBox(self)
+        for stride in ROI_STRIDES:
+            self.stride_combo.addItem("Analyse every frame" if stride == 1 else f"Analyse every {stride} frames", stride)
+        self.stride_combo.setToolTip("Compute the flow of newly drawn ROIs only every N frames")
+        layout.addWidget(self.stride_combo, 11, 0, 1, 2)
+        
+        # Trade ROI quality for speed when the analysis falls behind the source
+        self.adaptive_quality_checkbox = QCheckBox("Adapt ROI quality to hold the frame rate", self)
+        self.adaptive_quality_checkbox.setChecked(True)
+        layout.addWidget(self.adaptive_quality_checkbox, 12, 0, 1, 2)
+        
+        # Video files are played at their own frame rate unless chosen otherwise
+        self.playback_combo = QComboBox(self)
+        for label, mode, speed in PLAYBACK_MODES:
+            self.playback_combo.addItem(label, (mode, speed))
+        self.playback_combo.setToolTip("Playback speed of video files")
+        self.playback_combo.currentIndexChanged.connect(self.set_playback_mode)
+        layout.addWidget(self.playback_combo, 13, 0, 1, 2)
 
     def add_canvas_placeholder(self, layout: QGridLayout) -> None:
         """
@@ -483,20 +591,24 @@ class MainGUI(QMainWindow):
 
         This function presents a file dialog to the user for selecting a video file
         with extensions .mp4, .avi, or .mkv. Upon selection, it attempts to open the
-        video file using OpenCV's VideoCapture. If successful, it starts the video 
-        playback by setting the playing flag to True and begins a timer with a 30 ms 
-        interval. If the video cannot be opened, it shows a critical error message.
+        video file using OpenCV's VideoCapture. If successful, it starts the capture
+        worker, paced at the file's frame rate in the selected playback mode, sets
+        the playing flag to True and begins a timer polling twice per frame
+        period. If the video cannot be opened, it shows a critical error message.
         """
         
         file_path, _ = QFileDialog.getOpenFileName(self, "Open Video File", "", "Video Files (*.mp4 *.avi *.mkv)")
         
         if file_path:
+            self.stop_capture(release=True)
             self.video_capture = cv2.VideoCapture(file_path)
             if not self.video_capture.isOpened():
                 QMessageBox.critical(self, "Error", "Could not open the video file!")
             else:
+                mode, speed = self.playback_combo.currentData()
+                self.start_capture(BLOCK, FramePacer(self.video_capture.get(cv2.CAP_PROP_FPS), mode, speed))
                 self.playing = True
-                self.timer.start(30)
+                self.timer.start(self.poll_interval())
 
     def load_camera_dialog(self) -> None:
         """
@@ -559,6 +671,7 @@ class MainGUI(QMainWindow):
         """
         
         selected_camera_index = int(camera_combo.currentText().split()[-1])
+        self.stop_capture(release=True)
         self.video_capture = cv2.VideoCapture(selected_camera_index, cv2.CAP_DSHOW)
         
         if not self.video_capture.isOpened():
@@ -567,13 +680,136 @@ class MainGUI(QMainWindow):
         else:
             QMessageBox.information(self, "Camera Loaded", f"Camera {selected_camera_index} is now active.")
             
-            # Start reading frames from the camera
+            # Start reading frames from the camera, always keeping the latest frame
+            self.start_capture(DROP_OLDEST)
             self.playing = True
             self.realtime_input = True
-            self.timer.start(30)
+            self.timer.start(self.poll_interval())
             
             dialog.accept()
             
+    def start_capture(self, 
+                      drop_policy: str,
+                      pacer: FramePacer = None) -> None:
+        """
+        Starts the capture worker thread for the current video source.
+
+        The worker reads frames from self.video_capture into a bounded queue,
+        so capture is no longer paced by the GUI timer. The nominal frame rate
+        is read here, before the worker owns the capture.
+
+        Parameters:
+            drop_policy (str): DROP_OLDEST for live cameras, BLOCK for video files.
+            pacer (FramePacer, optional): Paces the playback of a video file.
+        """
+        self.stop_capture()
+        self.source_fps = self.video_capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_capture = FrameCapture(self.video_capture, self.frame_clock, drop_policy, pacer=pacer)
+        self.update_frame_budget()
+        self.frame_capture.start()
+        
+    def poll_interval(self) -> int:
+        """
+        Returns the interval in ms at which display_frame polls the capture queue:
+        twice per frame period of the source at the current playback speed.
+        """
+        if self.frame_capture is not None and self.frame_capture.pacer is not None:
+            return self.frame_capture.pacer.poll_interval_ms()
+        return poll_interval_ms(self.source_fps)
+    
+    def update_frame_budget(self) -> None:
+        """
+        Derives the quality controller's time budget from the rate at which
+        frames arrive: for cameras the measured frame rate, for video files
+        the file's frame rate times the playback speed.
+        """
+        fps = self.source_fps
+        pacer = self.frame_capture.pacer if self.frame_capture is not None else None
+        if pacer is None and self.frame_capture is not None:
+            fps = self.frame_capture.get_fps(default=fps)
+        elif fps and pacer is not None:
+            fps *= pacer.speed
+        self.quality_controller.set_fps(fps)
+    
+    def adapts_quality(self) -> bool:
+        """
+        Returns True if the quality controller is in use: it is enabled and
+        frames have a deadline. In fastest playback frames wait until they are
+        consumed, so lowering the quality would only trade accuracy for speed.
+        """
+        if not self.adaptive_quality_checkbox.isChecked():
+            return False
+        pacer = self.frame_capture.pacer if self.frame_capture is not None else None
+        return pacer is None or pacer.mode != FASTEST
+        
+    def set_playback_mode(self) -> None:
+        """
+        Applies the selected playback mode to the video file being played.
+        """
+        if self.frame_capture is None or self.frame_capture.pacer is None:
+            return
+        
+        mode, speed = self.playback_combo.currentData()
+        self.frame_capture.pacer.set_mode(mode, speed)
+        self.update_frame_budget()
+        if self.timer.isActive():
+            self.timer.start(self.poll_interval())
+        
+    def stop_capture(self, 
+                     release: bool = False) -> None:
+        """
+        Stops the capture worker thread if one is running.
+
+        With release, the video source is released too, but never while the
+        worker may still be reading from it (see `FrameCapture.stop`).
+        """
+        if self.frame_capture is not None:
+            self.frame_capture.stop(release=release)
+            print(f"Capture stopped: {self.frame_capture.get_statistics()}")
+            self.frame_capture = None
+        elif release and self.video_capture is not None:
+            self.video_capture.release()
+            
+    def has_source(self) -> bool:
+        """
+        Returns True if a video file or camera is loaded.
+
+        While the capture worker runs, only the worker touches video_capture,
+        so the source counts as loaded without asking the capture.
+        """
+        if self.frame_capture is not None:
+            return True
+        return self.video_capture is not None and self.video_capture.isOpened()
+    
+    def update_capture_status(self) -> None:
+        """
+        Shows the captured, dropped and late frame counts in the status bar,
+        the share of unchanged frames skipped by ROIs that gate them, the
+        measured frame rate and, while recording, the encoder backlog.
+        """
+        if self.frame_capture is None:
+            return
+        
+        stats = self.frame_capture.get_statistics()
+        status = (f"Captured: {stats['frames_captured']}  "
+                  f"Dropped: {stats['frames_dropped']}  "
+                  f"Late: {stats['frames_late']}")
+        if stats["frames_skipped"]:
+            status += f"  Caught up: {stats['frames_skipped']}"
+        if stats["fps"]:
+            status += f"  FPS: {stats['fps']:.1f} (jitter {stats['fps_jitter_ms']:.1f} ms)"
+        if self.video_writer is not None:
+            recorder = self.video_writer.get_statistics()
+            status += f"  Recording queue: {recorder['queue_depth']}  Not recorded: {recorder['frames_dropped']}"
+            if recorder["segment"]:
+                status += f"  Segment: {recorder['segment']}"
+        
+        skip_rates = [roi.analysis_module.get_skip_rate() for roi in self.rois
+                      if roi.analysis_module.change_threshold is not None]
+        if skip_rates:
+            status += f"  Skipped: {np.mean(skip_rates):.0%}"
+        self.capture_status_label.setText(status)
+            
     def pause_play(self) -> None:
         """
         Pause or play the video/camera feed.
@@ -588,69 +824,113 @@ class MainGUI(QMainWindow):
             None
         """
         
-        if self.video_capture is None or not self.video_capture.isOpened():
+        if not self.has_source():
             QMessageBox.warning(self, "No Video/Camera", "Please load a video or camera first!")
             return
 
         self.playing = not self.playing
         
         if self.playing:
-            self.timer.start(30)
+            # Time spent paused is not made up by skipping frames
+            if self.frame_capture is not None:
+                self.frame_capture.resync()
+            self.timer.start(self.poll_interval())
         else:
             self.timer.stop()
+            self.update_capture_status()
 
     def display_frame(self) -> None:
         """
-        Read a frame from the video capture and update the GUI.
+        Take the next captured frame from the capture queue and update the GUI.
 
-        This function is called at a rate of 30 frames per second by the
-        QTimer. It reads a frame from the video capture, performs analysis
-        on each ROI in the frame, updates the cross position of each ROI,
-        and draws the ROIs and scrolling axes on the frame. Finally, it
-        converts the frame to RGB and displays it in the QLabel in the GUI.
+        This function is called by the QTimer twice per frame period of the
+        source. It takes a frame from the capture worker's queue, performs analysis
+        on each ROI in the frame and updates the cross position of each ROI.
+        The captured frame itself is never drawn on: it is converted to an RGB
+        display copy, the ROIs and scrolling axes are drawn on that copy, and
+        the copy is displayed in the QLabel in the GUI.
 
-        If the video capture is not open or if a frame could not be read
-        from the video capture, it stops the timer and exits the function.
+        If no frame is waiting, the function returns and tries again on the
+        next tick. If the video source is exhausted, it stops the timer.
 
         Returns:
             None
         """
         
-        if self.video_capture is not None and self.video_capture.isOpened():
-            ret, frame = self.video_capture.read()
+        if self.frame_capture is not None:
+            item = self.frame_capture.read()
             
-            if not ret:
-                self.timer.stop()
+            if item is None:
+                if self.frame_capture.is_finished():
+                    self.timer.stop()
+                    self.update_capture_status()
                 return
             
+            # The capture timestamp is shared by every ROI
+            frame, timestamp, frame_index = item
+            
+            if frame_index % 30 == 0:
+                self.update_capture_status()
+                self.update_frame_budget()
+            
             height, width, _ = frame.shape
             self.frame_size = (width, height)
             
             if self.video_writer is not None:
-                self.video_writer.write_frame(frame)
+                self.video_writer.write_frame(frame, timestamp)
+            
+            # Analyse every ROI; the frame is converted to grayscale once and
+            # overlapping ROIs may share one flow field
+            started = time.perf_counter()
+            flows = self.roi_analysis.analyze_frame(self.rois, frame, timestamp)
+            if self.adapts_quality():
+                self.quality_controller.update(self.rois, time.perf_counter() - started, timestamp)
+            
+            # Overlays are drawn on a separate RGB display copy, never on the
+            # captured frame that is analysed and recorded
+            display = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
             for i, roi in enumerate(self.rois):
-                x, y, w, h = roi.rect.x(), roi.rect.y(), roi.rect.width(), roi.rect.height()
-                roi_frame = frame[y:y+h, x:x+w]
-
-                # Perform analysis and update cross position
-                avg_flow_x, avg_flow_y = roi.analysis_module.analyze(roi_frame)
+                # Save the analysis result and update cross position
+                avg_flow_x, avg_flow_y = flows[i]
                 
                 if avg_flow_x is not None and avg_flow_y is not None:
                     self.auto_save(roi, i)
                     roi.update_cross_position(avg_flow_x, avg_flow_y)
 
-                roi.draw_on_frame(frame, i)
+                roi.draw_on_frame(display, i)
                 roi.update_scrolling_axis(self.movement_buffers, self.movement_curves, self.max_frames, self.plot_widget)
 
-            # Convert frame to RGB and display in QLabel
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            height, width, channel = frame.shape
-            q_img = QImage(frame.data, width, height, channel * width, QImage.Format_RGB888)
+            # Display the RGB copy in QLabel
+            height, width, channel = display.shape
+            q_img = QImage(display.data, width, height, channel * width, QImage.Format_RGB888)
             self.current_pixmap = QPixmap.fromImage(q_img)
 
             self.video_canvas_label.setPixmap(self.current_pixmap)
           
+    def set_roi_clustering(self, 
+                           enabled: bool) -> None:
+        """
+        Turn sharing one flow field between overlapping or adjacent ROIs on or off.
+
+        The ROIs are regrouped on the next frame; regrouped ROIs skip one
+        frame while their new flow field is primed.
+        """
+        self.roi_analysis.cluster = enabled
+
+    def open_engine_monitor(self) -> None:
+        """
+        Open a monitor window for an analysis engine running in another process.
+
+        The engine is started with `python -m froth_monitor engine`; the
+        monitor only displays its preview and velocities, so the engine keeps
+        analysing whatever happens to this window.
+        """
+        from .monitor import EngineMonitor
+
+        self.engine_monitor = EngineMonitor()
+        self.engine_monitor.show()
+
     def start_drawing_roi(self) -> None:
         """
         Starts drawing a new ROI.
@@ -746,9 +1026,14 @@ class MainGUI(QMainWindow):
                 end.x() >= 0 and end.y() >= 0):
                 new_roi = ROI(self.current_roi_rect,
                               self.arrow.arrow_dir_x,
-                              self.arrow.arrow_dir_y)  
+                              self.arrow.arrow_dir_y,
+                              self.frame_clock,
+                              estimator=self.estimator_combo.currentText(),
+                              change_threshold=DEFAULT_CHANGE_THRESHOLD if self.skip_static_checkbox.isChecked() else None,
+                              stride=self.stride_combo.currentData())  
                 self.rois.append(new_roi)
-                QMessageBox.information(self, "ROI Added", f"ROI #{len(self.rois)} added.")
+                QMessageBox.information(self, "ROI Added", 
+                                        f"ROI #{len(self.rois)} added ({new_roi.analysis_module.estimator.name}).")
             else:
                 QMessageBox.warning(self, "Invalid ROI", "The drawn ROI is invalid.")
             self.drawing_roi = False
@@ -935,40 +1220,33 @@ class MainGUI(QMainWindow):
     def fps_calculation(self) -> None:
         
         """
-        Calculates the FPS of the input video.
+        Sets the FPS used for recording from the input.
 
-        If the input is not a real-time input, simply reads the FPS from the video capture.
-        Otherwise, calculates the FPS by reading a fixed number of frames and measuring the time taken.
+        For a video file this is the file's own frame rate. For a camera it is the
+        rate measured continuously by the capture worker from its frame timestamps,
+        so no frames are read or discarded for the measurement and the GUI does not
+        wait. Until the measurement has settled (a fraction of a second after the
+        camera starts) the rate the camera reports is used instead. Both rates are
+        read without touching video_capture, which the capture worker owns.
         """
         
-        if not self.realtime_input:
-            self.fps_recording = self.video_capture.get(cv2.CAP_PROP_FPS)
+        reported_fps = self.source_fps or 30.0
+        
+        if not self.realtime_input or self.frame_capture is None:
+            self.fps_recording = reported_fps
             print("FPS of input video is:", self.fps_recording)
             return
         
-        self.start_record_button.setText("Calculating FPS...")
-        self.start_record_button.setStyleSheet("background-color: green; color: white;")
-        self.start_record_button.clicked.disconnect(self.start_recording)
-        QApplication.processEvents()
-                        
-        num_frames = 30
-        start_time = time.time()
-        print(start_time)
-        
-        for i in range(num_frames):
-            ret, frame = self.video_capture.read()
-
-        end_time = time.time()
-        print(end_time)
-        elapsed_time = end_time - start_time
-        self.fps_recording = num_frames / elapsed_time
+        self.fps_recording = self.frame_capture.get_fps(default=reported_fps)
+        if not self.frame_capture.rate.is_ready():
+            print(f"Camera frame rate not measured yet, using the reported {reported_fps:.1f} FPS")
     
     def start_recording(self) -> None:
         """
         Initiates video recording if an active video feed is available and recording is enabled.
 
         This function checks if the video feed is active and if recording settings are properly configured.
-        If the frames per second (FPS) for recording is not calculated, it calculates the FPS.
+        The frames per second (FPS) for recording are taken from the running measurement of the input.
         If recording is enabled in the export settings, it creates a VideoRecorder instance and starts
         recording the video to the specified directory with the given filename. The UI is updated to 
         indicate that recording has started.
@@ -983,12 +1261,12 @@ class MainGUI(QMainWindow):
             None
         """
     
-        if not self.video_capture or not self.video_capture.isOpened():
+        if not self.has_source():
             QMessageBox.warning(self, "Warning", "No active video feed to record.")
             return
         
-        if self.fps_recording == 0:
-            self.fps_calculation()
+        # The rate is measured continuously, so it is current for every recording
+        self.fps_calculation()
                 
         if self.export.video_directory and self.export.record_video:
             
@@ -996,8 +1274,14 @@ class MainGUI(QMainWindow):
             file_name = self.export.video_filename
             
             print("FPS of the video:", self.fps_recording)
-            self.video_writer = VideoRecorder(file_path, file_name, frame_size = self.frame_size, fps = self.fps_recording)
+            self.video_writer = VideoRecorder(file_path, file_name, frame_size = self.frame_size, fps = self.fps_recording,
+                                              segment_seconds = self.export.segment_minutes * 60 or None,
+                                              segment_bytes = self.export.segment_megabytes * 1024 * 1024 or None)
             self.video_writer.start_recording()
+            if not self.video_writer.is_recording():
+                self.video_writer = None
+                QMessageBox.warning(self, "Warning", "The video file could not be opened for recording.")
+                return
             self.recording = True
             
             self.start_record_button.setText("Stop Recording")
@@ -1058,8 +1342,9 @@ class MainGUI(QMainWindow):
         Returns:
             None
         """
-        velocity = roi.analysis_module.velocity_history[-1]["velocity"]
-        timestamp = roi.analysis_module.velocity_history[-1]["timestamp"]
+        history = roi.analysis_module.velocity_history
+        velocity = history.velocities[-1]
+        timestamp = history.timestamps[-1]
         frame_index = roi.analysis_module.get_frame_count()
         
         self.auto_saver.add_frame_data(roi_index, frame_index, velocity, timestamp)
@@ -1071,8 +1356,10 @@ class MainGUI(QMainWindow):
         Override of the QWidget closeEvent method.
 
         Called when the main window is closed. If a video recording is in progress,
-        it releases the VideoRecorder and stops the recording. Then, it calls the
-        base class implementation to close the window.
+        it stops the VideoRecorder and releases the file. Pending autosave
+        records are flushed, and the autosave writer thread and the ROI analysis
+        threads are stopped. Then, it calls the base class implementation to
+        close the window.
 
         Parameters:
             event (QCloseEvent): A QCloseEvent object.
@@ -1082,8 +1369,18 @@ class MainGUI(QMainWindow):
         """
         
         if self.video_writer:
-            self.video_writer.release()
+            self.video_writer.stop_recording()
+        self.stop_capture(release=True)
+        self.auto_saver.close()
+        self.roi_analysis.close()
         super().closeEvent(event)
+        
+    def closeEvent(self, 
+                   event: QCloseEvent) -> None:
+        """
+        Qt entry point for window close events, forwarded to close_event.
+        """
+        self.close_event(event)
       
     def save(self) -> None:
         """
@@ -1112,10 +1409,10 @@ class MainGUI(QMainWindow):
             # Step 2: Export analysis results
             self.export_data()
 
-            # Step 3: Stop video playback
+            # Step 3: Stop video playback, and the ROI threads until analysis resumes
             self.timer.stop()
-            if self.video_capture:
-                self.video_capture.release()
+            self.stop_capture(release=True)
+            self.roi_analysis.close()
 
             # Notify user of success
             QMessageBox.information(
@@ -1138,7 +1435,7 @@ class MainGUI(QMainWindow):
         Returns:
             None
         """
-        self.export.excel_resutls(self.rois, self.arrow_angle)
+        self.export.excel_resutls(self.rois, self.arrow_angle, self.quality_controller.changes)
 
     def reset_application(self) -> None:
         """
@@ -1153,6 +1450,7 @@ class MainGUI(QMainWindow):
             None
         """
         self.rois = []
+        self.quality_controller.reset()
         self.movement_buffers = {}
         self.movement_curves = {}
         self.plot_widget.clear()
@@ -1167,6 +1465,9 @@ class MainGUI(QMainWindow):
         
         self.export.export_filename = datetime.now().strftime("%Y%m%d")
         
+        # Make sure everything recorded in the previous mission is on disk
+        self.auto_saver.save_to_file()
+        
         # Reinitialize UI components if necessary
         QMessageBox.information(self, "Reset Complete", "The application has been reset. You can now start a new mission.")
              
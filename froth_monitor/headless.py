@@ -0,0 +1,248 @@
+"""Headless Analysis Module for Froth Tracker Application.
+
+This module defines the `HeadlessAnalyzer` class, which runs the same
+`VideoAnalysis` pipeline as the GUI over a recorded video without a display
+or a Qt event loop. Frames are read as fast as they can be decoded and
+analysed, instead of being paced by the GUI timer, and the results are
+written through the same `Export` data model as the GUI export.
+
+Frame timestamps are media time (frame number divided by the file's frame
+rate) rather than wall-clock time, so re-analysing the same file always
+produces the same timestamps and the per-second averages refer to the time
+in the recording.
+
+Classes:
+--------
+HeadlessAnalyzer
+    Analyses every frame of a video file for a fixed set of ROIs.
+
+Imports:
+--------
+- cv2: For reading video frames.
+- numpy: For the arrow direction components.
+- os, time: For file metadata and progress timing.
+- QRect (PySide6.QtCore): For the ROI geometry (no QApplication required).
+- ROI, Export, FrameClock: The analysis, export and timestamp models shared with the GUI.
+- MultiROIAnalysis: For analysing all ROIs of a frame, optionally in clusters.
+
+Example Usage:
+--------------
+    analyzer = HeadlessAnalyzer([(10, 10, 200, 150)], arrow_angle=90.0)
+    analyzer.run("data/input_videos/test.avi")
+    analyzer.export("results/test.xlsx")
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QRect
+
+from .export import Export
+from .frame_clock import FrameClock
+from .multi_roi import MultiROIAnalysis
+from .roi import ROI
+
+DEFAULT_FPS = 30.0
+
+
+class HeadlessAnalyzer:
+    """
+    Headless Analyzer Class for Offline Video Analysis.
+
+    Attributes:
+    ----------
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles as (x, y, width, height) in frame pixels.
+    arrow_angle : float
+        Overflow direction in radians (0 is right, pi/2 is down).
+    arrow_dir_x : float
+        The x component of the overflow direction.
+    arrow_dir_y : float
+        The y component of the overflow direction.
+    rois : list[ROI]
+        The ROIs of the most recent run.
+    clock : FrameClock or None
+        The clock of the most recent run, anchored at the video's start time.
+    fps : float
+        Frame rate of the most recent video.
+    frames_read : int
+        Number of frames read in the most recent run.
+    elapsed : float
+        Processing time of the most recent run in seconds.
+    analysis_options : dict
+        Analysis settings passed to every ROI's `VideoAnalysis`
+        (e.g. `estimator`, `downscale`, `pixel_budget`).
+    cluster_rois : bool
+        Share one flow field between overlapping or adjacent ROIs.
+    roi_analysis : MultiROIAnalysis
+        Analyses all ROIs of a frame, on `roi_threads` threads.
+
+    Methods:
+    -------
+    __init__(rects: list, arrow_angle: float, analysis_options: dict = None, cluster_rois: bool = False, roi_threads: int = 1) -> None
+        Initializes the analyzer with ROI rectangles and an arrow angle in degrees.
+    create_rois(clock: FrameClock) -> list[ROI]
+        Creates fresh ROI objects for a run.
+    open_video(video_path: str) -> cv2.VideoCapture
+        Opens a video and sets up the frame rate and clock of the run.
+    analyze_frame(rois: list, frame: np.ndarray, timestamp: float) -> None
+        Analyses one frame for every ROI.
+    run(video_path: str, max_frames: int = None) -> list[ROI]
+        Analyses the video and returns the ROIs holding the results.
+    export(output_path: str) -> dict
+        Writes the results of the last run to an Excel file.
+    """
+
+    def __init__(self,
+                 rects: list,
+                 arrow_angle: float,
+                 analysis_options: dict = None,
+                 cluster_rois: bool = False,
+                 roi_threads: int = 1) -> None:
+        """
+        Initialize the analyzer.
+
+        Parameters
+        ----------
+        rects : list[tuple[int, int, int, int]]
+            ROI rectangles as (x, y, width, height) in frame pixels.
+        arrow_angle : float
+            Overflow direction in degrees, as entered in the GUI.
+        analysis_options : dict, optional
+            Analysis settings passed to every ROI's `VideoAnalysis`.
+        cluster_rois : bool
+            Share one flow field between overlapping or adjacent ROIs
+            (see `froth_monitor.multi_roi`).
+        roi_threads : int
+            Number of threads analysing the ROIs of a frame concurrently.
+        """
+        self.rects = [tuple(int(v) for v in rect) for rect in rects]
+        self.arrow_angle = np.radians(float(arrow_angle))
+        self.arrow_dir_x = np.cos(self.arrow_angle)
+        self.arrow_dir_y = np.sin(self.arrow_angle)
+        self.analysis_options = dict(analysis_options or {})
+        self.cluster_rois = cluster_rois
+        self.roi_analysis = MultiROIAnalysis(cluster=cluster_rois, workers=roi_threads)
+
+        self.rois: list = []
+        self.clock: FrameClock = None
+        self.fps = DEFAULT_FPS
+        self.frames_read = 0
+        self.elapsed = 0.0
+
+    def create_rois(self,
+                    clock: FrameClock) -> list:
+        """
+        Create fresh ROI objects sharing the given clock.
+        """
+        return [ROI(QRect(x, y, w, h), self.arrow_dir_x, self.arrow_dir_y, clock, **self.analysis_options)
+                for x, y, w, h in self.rects]
+
+    def open_video(self,
+                   video_path: str) -> cv2.VideoCapture:
+        """
+        Open a video and set up the frame rate and clock of the run.
+
+        Raises
+        ------
+        IOError
+            If the video cannot be opened.
+        """
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise IOError(f"Could not open the video file: {video_path}")
+
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        
+        # The file is last modified when recording ends
+        duration = capture.get(cv2.CAP_PROP_FRAME_COUNT) / self.fps
+        self.clock = FrameClock(wall_anchor=os.path.getmtime(video_path) - duration)
+        return capture
+
+    def analyze_frame(self,
+                      rois: list,
+                      frame: np.ndarray,
+                      timestamp: float) -> None:
+        """
+        Analyse one frame for every ROI, sharing the frame's timestamp.
+
+        The region covered by the ROIs is converted to grayscale once and
+        every ROI (or ROI cluster) analyses a slice of it.
+        """
+        self.roi_analysis.analyze_frame(rois, frame, timestamp)
+
+    def run(self,
+            video_path: str,
+            max_frames: int = None) -> list:
+        """
+        Analyse every frame of a video file.
+
+        Parameters
+        ----------
+        video_path : str
+            Path to the video file.
+        max_frames : int, optional
+            Stop after this many frames.
+
+        Returns
+        -------
+        list[ROI]
+            The ROIs holding the velocity history of the run.
+
+        Raises
+        ------
+        IOError
+            If the video cannot be opened.
+        """
+        capture = self.open_video(video_path)
+        self.rois = self.create_rois(self.clock)
+        self.frames_read = 0
+        start = time.perf_counter()
+
+        try:
+            while max_frames is None or self.frames_read < max_frames:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+
+                # Media time of the frame, shared by every ROI
+                timestamp = self.frames_read / self.fps
+                self.frames_read += 1
+                self.analyze_frame(self.rois, frame, timestamp)
+        finally:
+            capture.release()
+            self.roi_analysis.close()
+
+        self.elapsed = time.perf_counter() - start
+        print(f"Analysed {self.frames_read} frames of {video_path} in {self.elapsed:.1f} s "
+              f"({self.frames_read / max(self.elapsed, 1e-9):.1f} frames/s)")
+        if self.analysis_options.get("change_threshold") is not None:
+            print("Unchanged frames skipped: "
+                  + ", ".join(f"ROI {i + 1} {roi.analysis_module.get_skip_rate():.0%}"
+                              for i, roi in enumerate(self.rois)))
+        return self.rois
+
+    def export(self,
+               output_path: str) -> dict:
+        """
+        Write the results of the last run to an Excel file.
+
+        Uses the same `Export.collect_export_data` and `Export.write_csv` as
+        the GUI, so the output has the same layout as a GUI export.
+
+        Parameters
+        ----------
+        output_path : str
+            Path of the Excel file to write.
+
+        Returns
+        -------
+        dict
+            The collected export data.
+        """
+        exporter = Export()
+        data = exporter.collect_export_data(self.rois, self.arrow_angle)
+        exporter.write_csv(output_path, data)
+        return data
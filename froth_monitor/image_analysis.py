@@ -2,7 +2,8 @@
 
 This module defines the `VideoAnalysisModule` class, which provides methods
 for analyzing video frames using optical flow to calculate motion in a
-specific direction. It supports calculating velocities, storing motion
+specific direction. The motion itself is measured by a pluggable estimator
+(see `froth_monitor.estimators`), Farneback optical flow by default. It supports calculating velocities, storing motion
 history, and generating timestamps for each frame.
 
 Classes:
@@ -11,12 +12,78 @@ VideoAnalysisModule
     Provides functionality to process video frames and calculate motion
     velocities based on dense optical flow.
 
+Functions:
+----------
+grayscale_region(frame: np.ndarray, rects: list) -> tuple[np.ndarray, int, int]
+    Converts the bounding box of all ROIs to grayscale once per frame.
+
 Imports:
 --------
 - cv2: For video frame processing and optical flow calculations.
 - numpy: For mathematical operations and averaging flow data.
 - random: For generating random colors for visualization.
-- datetime: For timestamp generation.
+- time: For measuring the analysis cost of a frame.
+- FrameClock: For monotonic frame timestamps.
+- MotionEstimator, create_estimator: For the selectable motion estimators.
+- VelocityHistory: For the columnar per-frame result store.
+
+Downscaled analysis:
+--------------------
+The flow estimate is by far the most expensive step and its cost grows with the
+number of ROI pixels. A ROI can therefore be analysed at reduced resolution,
+either with a fixed `downscale` factor or with a `pixel_budget` (the largest
+number of pixels the flow is computed on). The ROI is resized with area
+averaging before the flow, and the mean flow is multiplied back by the
+factor, so velocities are always reported in full-resolution pixels.
+
+Trade-off: the flow cost falls roughly with the square of the factor (about
+4x faster at 2, 16x at 4), and area averaging also suppresses sensor noise.
+In exchange, the smallest resolvable displacement grows with the factor
+(sub-pixel motion at full resolution is 1/factor of a pixel after
+downscaling), and the fixed 25-pixel flow window covers 25 x factor
+full-resolution pixels, so fine bubble texture is smoothed away and the flow
+averages over larger structures. On an 800x600 ROI of synthetic froth moving
+about 3.5 pixels per frame, factors 2 to 4 stayed within 5% of the
+full-resolution result while the flow ran 4x to 18x faster; at 6 the velocity
+was under-estimated by about 15%. Slow froth (under about one pixel per
+frame) is the first to suffer, so prefer 2 to 3 for slow cells.
+
+Frame-change gating:
+--------------------
+Cameras with long exposures deliver duplicate frames, and standing froth does
+not move, yet the flow would still be computed for every frame. With a
+`change_threshold`, each frame is first compared with the reference frame on
+a copy downsampled 4x by area averaging. If the mean absolute grey-level
+difference is at most the threshold, the flow is not computed and the frame
+is recorded with the skip flag set and either zero velocity
+(`static_velocity="zero"`) or the previous velocity carried forward
+(`static_velocity="hold"`).
+
+A skipped frame does not replace the reference frame. Motion too slow to pass
+the check in one frame therefore accumulates until it does, and the next
+computed flow covers the whole interval. With "zero" the total displacement
+is preserved; "hold" gives smoother curves for duplicate frames from a moving
+scene. A threshold of 0 skips exact duplicates only; decoder and sensor noise
+of a static scene is typically 0.3 to 1 grey level after downsampling.
+
+Decimated analysis:
+-------------------
+Slow froth does not need a flow estimate for every frame. With a `stride` of
+N, the flow is computed only between frames N apart; with a `target_hz`, it
+is computed whenever the time since the last analysed frame reaches the
+period (using the real frame timestamps, so dropped camera frames are
+accounted for). The frames in between are not converted or analysed at all.
+They are still recorded, flagged as skipped, with the last measured velocity
+so that the live display keeps moving. Once the displacement over the
+interval is measured, it is divided by the number of frames it spans and
+written to the current frame and, retroactively, to the frames in between.
+Velocities therefore stay in pixels per frame, and the per-second averages of
+the export (computed from the timestamps) stay correct. The autosave journal
+keeps the provisional values recorded live.
+
+A larger stride also makes the displacement per estimate N times larger,
+which suits slow froth but can exceed what the flow window can follow for
+fast froth.
 
 Example Usage:
 --------------
@@ -29,7 +96,44 @@ the velocity history.
 import cv2
 import numpy as np
 import random
-from datetime import datetime
+import time
+from .frame_clock import FrameClock
+from .estimators import MotionEstimator, create_estimator
+from .velocity_history import VelocityHistory
+
+GATE_FACTOR = 4  # Downsampling of the frame-change check
+DEFAULT_CHANGE_THRESHOLD = 1.0  # Grey levels; above typical static-scene noise
+STATIC_VELOCITIES = ("zero", "hold")
+
+def grayscale_region(frame: np.ndarray, 
+                     rects: list) -> tuple[np.ndarray, int, int]:
+    """
+    Convert the part of a BGR frame covered by any ROI to grayscale, once.
+
+    Every ROI then analyses a slice of the returned buffer, so each pixel is
+    converted once per frame however many ROIs there are, and pixels outside
+    all ROIs are not converted at all.
+
+    Parameters
+    ----------
+    frame : np.ndarray
+        The full BGR frame.
+    rects : list[tuple[int, int, int, int]]
+        ROI rectangles as (x, y, width, height).
+
+    Returns
+    -------
+    tuple[np.ndarray, int, int]
+        The grayscale region and its (x, y) offset in the frame. A ROI
+        (x, y, w, h) is at `gray[y - offset_y:y - offset_y + h, x - offset_x:x - offset_x + w]`.
+    """
+    frame_height, frame_width = frame.shape[:2]
+    x0 = max(0, min(x for x, _, _, _ in rects))
+    y0 = max(0, min(y for _, y, _, _ in rects))
+    x1 = min(frame_width, max(x + w for x, _, w, _ in rects))
+    y1 = min(frame_height, max(y + h for _, y, _, h in rects))
+    return cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY), x0, y0
+
 
 class VideoAnalysis:
     """
@@ -43,9 +147,14 @@ class VideoAnalysis:
     Attributes:
     ----------
     previous_frame : np.ndarray
-        The last processed frame for motion analysis.
-    velocity_history : list
-        Stores the history of motion velocities and timestamps for each frame.
+        The last processed frame for motion analysis, in grayscale. It is one
+        of the analyzer's own buffers, never a view into a caller's frame.
+    frame_buffers : list[np.ndarray]
+        Two preallocated, contiguous grayscale ROI buffers used alternately
+        for the current and the previous frame.
+    velocity_history : VelocityHistory
+        Columnar store of velocities, raw flow components and monotonic
+        timestamps for each frame.
     color : tuple[int, int, int]
         A random RGB color for visualizing motion.
     current_velocity : float
@@ -54,28 +163,95 @@ class VideoAnalysis:
         The x component of the scrolling axis direction.
     arrow_dir_y : float
         The y component of the scrolling axis direction.
+    clock : FrameClock
+        The clock frame timestamps are taken from and formatted with.
+    downscale : float
+        Fixed factor the ROI is shrunk by before computing flow (1 = full resolution).
+    pixel_budget : int or None
+        Largest number of pixels the flow is computed on; larger ROIs are
+        shrunk further. None means no budget.
+    flow_scale : tuple[float, float]
+        Factors that convert flow in analysed pixels back to full-resolution
+        pixels in x and y, for the current ROI size.
+    estimator : MotionEstimator
+        The estimator measuring the displacement between consecutive frames.
+    change_threshold : float or None
+        Largest mean absolute difference (grey levels, on a 4x downsampled
+        copy) at which a frame counts as unchanged. None disables gating.
+    static_velocity : str
+        What an unchanged frame records: "zero" or "hold" (the previous flow).
+    reference_thumbnail : np.ndarray or None
+        Downsampled copy of the previous (reference) frame used by the gate.
+    last_change : float
+        Difference measured by the gate for the most recent frame.
+    frames_skipped : int
+        Number of frames skipped by the frame-change gate.
+    stride : int
+        Compute the flow only every `stride` frames (1 analyses every frame).
+    target_hz : float or None
+        Compute the flow at about this rate instead of a fixed stride.
+    reference_timestamp : float or None
+        Timestamp of the reference (last analysed) frame.
+    pending_rows : list[int]
+        History rows recorded since the reference frame with a provisional velocity.
+    measured_flow : tuple[float, float]
+        Last measured flow per frame, recorded for frames between analyses.
+    last_cost : float
+        Time in seconds the most recent `analyze` call took.
 
     Methods:
     -------
-    __init__(arrow_dir_x: float, arrow_dir_y: float) -> None
+    __init__(arrow_dir_x: float, arrow_dir_y: float, clock: FrameClock = None, downscale: float = 1.0, pixel_budget: int = None, estimator: str = "farneback", change_threshold: float = None, static_velocity: str = "zero", stride: int = 1, target_hz: float = None) -> None
         Initializes the VideoAnalysisModule with the given scrolling axis direction.
-    analyze(current_frame: np.ndarray) -> tuple[float, float]
-        Processes the current frame to calculate motion velocities using dense optical flow.
+    analyze(current_frame: np.ndarray, timestamp: float = None) -> tuple[float, float]
+        Processes the current frame to calculate motion velocities with the estimator.
+    record(avg_flow_x: float, avg_flow_y: float, timestamp: float = None, skipped: bool = False) -> None
+        Stores a displacement measured elsewhere, e.g. by a ROI cluster.
+    frame_changed(current_frame: np.ndarray) -> bool
+        Returns whether the frame differs enough from the reference frame to compute flow.
+    get_skip_rate() -> float
+        Returns the fraction of recorded frames skipped by the frame-change gate.
+    reset_reference() -> None
+        Forgets the reference frame, so the next frame starts a new flow measurement.
+    analysis_due(timestamp: float) -> bool
+        Returns whether the flow should be computed for a frame under the stride or target rate.
+    analyses_every_frame() -> bool
+        Returns True if neither gating nor decimation is configured.
+    store_frame(current_frame: np.ndarray) -> np.ndarray
+        Copies the ROI frame, downscaled if configured, into the analyzer's own grayscale buffer.
+    set_downscale(downscale: float) -> None
+        Changes the downscale factor while keeping the previous frame.
+    get_scale_factor(height: int, width: int) -> float
+        Returns the effective downscale factor for a ROI size.
     get_current_velocity(avg_flow_x: float, avg_flow_y: float) -> float
         Calculates the velocity in the scrolling axis direction.
     get_current_time() -> str
-        Returns the current timestamp in the format "dd/mm/yyyy HH:MM:SS.sss".
+        Returns the current time of the clock in the format "dd/mm/yyyy HH:MM:SS.sss".
     get_frame_count() -> int
         Returns the total number of frames processed.
     get_results() -> list
         Retrieves the history of velocities and timestamps for all processed frames.
+    get_velocities() -> np.ndarray
+        Returns a zero-copy view of the velocity column.
+    get_flows() -> tuple[np.ndarray, np.ndarray]
+        Returns zero-copy views of the average flow columns.
+    get_timestamps() -> np.ndarray
+        Returns a zero-copy view of the monotonic timestamp column.
     generate_random_color() -> tuple[int, int, int]
         Generates a random RGB color.
     """
     
     def __init__(self, 
                  arrow_dir_x: float, 
-                 arrow_dir_y: float) -> None:
+                 arrow_dir_y: float,
+                 clock: FrameClock = None,
+                 downscale: float = 1.0,
+                 pixel_budget: int = None,
+                 estimator: str = "farneback",
+                 change_threshold: float = None,
+                 static_velocity: str = "zero",
+                 stride: int = 1,
+                 target_hz: float = None) -> None:
         """
         Initialize the VideoAnalysisModule with the given direction for the scrolling axis.
         
@@ -85,64 +261,384 @@ class VideoAnalysis:
             The x direction for the scrolling axis (positive is right, negative is left).
         arrow_dir_y : float
             The y direction for the scrolling axis (positive is down, negative is up).
+        clock : FrameClock, optional
+            The clock used for frame timestamps. Pass the same clock to every
+            ROI so that their timestamps share one wall-clock anchor.
+        downscale : float
+            Shrink the ROI by this factor before computing flow. 1 analyses
+            at full resolution. See the module docstring for the trade-off.
+        pixel_budget : int, optional
+            Shrink the ROI further if it would still have more pixels than this.
+        estimator : str or MotionEstimator
+            The name of the motion estimator (see `froth_monitor.estimators`)
+            or an estimator instance. Each ROI needs its own instance.
+        change_threshold : float, optional
+            Skip the flow of frames whose mean absolute difference from the
+            reference frame is at most this many grey levels. None computes
+            the flow of every frame.
+        static_velocity : str
+            "zero" records unchanged frames with zero velocity, "hold" with
+            the previous velocity.
+        stride : int
+            Compute the flow between frames this many frames apart.
+        target_hz : float, optional
+            Compute the flow at about this rate; overrides `stride`.
         """
         
+        if downscale < 1:
+            raise ValueError(f"The downscale factor must be at least 1, got {downscale}")
+        if static_velocity not in STATIC_VELOCITIES:
+            raise ValueError(f"Unknown static velocity mode: {static_velocity}")
+        if int(stride) < 1:
+            raise ValueError(f"The stride must be at least 1, got {stride}")
+        if target_hz is not None and target_hz <= 0:
+            raise ValueError(f"The target rate must be positive, got {target_hz}")
+        
+        self.clock = clock if clock is not None else FrameClock()
         self.previous_frame = None  # Store the previous frame for motion analysis
-        self.velocity_history = []  # Store delta pixel values between frames
+        self.frame_buffers = [None, None]  # Own grayscale buffers, used alternately
+        self.source_shape = None  # ROI size the buffers were allocated for
+        self.downscale = float(downscale)
+        self.pixel_budget = pixel_budget
+        self.flow_scale = (1.0, 1.0)
+        self.estimator = estimator if isinstance(estimator, MotionEstimator) else create_estimator(estimator)
+        self.velocity_history = VelocityHistory(self.clock)  # Store delta pixel values between frames
         self.color = self.generate_random_color()
         self.current_velocity = 0
         self.arrow_dir_x = arrow_dir_x
         self.arrow_dir_y = arrow_dir_y
         
+        # Frame-change gating
+        self.change_threshold = change_threshold
+        self.static_velocity = static_velocity
+        self.reference_thumbnail = None
+        self.last_change = 0.0
+        self.frames_skipped = 0
+        
+        # Decimated analysis
+        self.stride = int(stride)
+        self.target_hz = target_hz
+        self.frames_since_reference = 0
+        self.reference_timestamp = None
+        self.last_timestamp = None
+        self.pending_rows: list = []
+        self.measured_flow = (0.0, 0.0)
+        self.last_cost = 0.0
+        
     def analyze(self, 
-                current_frame: np.ndarray) -> tuple[float, float]:
+                current_frame: np.ndarray,
+                timestamp: float = None) -> tuple[float, float]:
         """
-        Analyze the given frame for changes in x and y directions by calculating dense optical flow using the Farneback method.
+        Analyze the given frame for changes in x and y directions with the ROI's motion estimator.
+        
+        The frame should be a grayscale ROI slice of a region the caller
+        converted once for all ROIs (see `grayscale_region`). A BGR frame is
+        still accepted and is converted here, once per call.
         
         Parameters
         ----------
         current_frame : np.ndarray
-            The frame to analyze.
+            The grayscale (or BGR) ROI frame to analyze.
+        timestamp : float, optional
+            Timestamp of the frame from `clock`. The caller should capture it
+            once per frame and pass it to every ROI; if None, the clock is read.
         
         Returns
         -------
         tuple[float, float]
-            The delta pixel values in x and y directions between the current and previous frames.
+            The delta pixel values in x and y directions between the current
+            and previous frames, in full-resolution pixels.
         """
         
+        started = time.perf_counter()
+        try:
+            return self.analyze_frame(current_frame, timestamp)
+        finally:
+            self.last_cost = time.perf_counter() - started
+
+    def analyze_frame(self, 
+                      current_frame: np.ndarray,
+                      timestamp: float = None) -> tuple[float, float]:
+        """
+        Body of `analyze`, which also measures its cost in `last_cost`.
+        """
+        if timestamp is None:
+            timestamp = self.clock.now()
+        
+        # Between analysed frames: record the last measured flow provisionally
+        # without even copying the frame
+        if self.previous_frame is not None:
+            self.frames_since_reference += 1
+            due = self.analysis_due(timestamp)
+            self.last_timestamp = timestamp
+            if not due:
+                self.record(*self.measured_flow, timestamp, skipped=True)
+                self.pending_rows.append(len(self.velocity_history) - 1)
+                return self.measured_flow
+        
+        # Work on a private contiguous copy: the caller's frame may be drawn
+        # on afterwards, and a view would keep the whole source frame alive
+        current_frame = self.store_frame(current_frame)
+        
         # Analyze the given frame for changes in x and y directions
         if self.previous_frame is None:
             # If there's no previous frame, store the current frame and return
-            self.previous_frame = current_frame
+            self.set_reference(current_frame, timestamp)
+            self.last_timestamp = timestamp
+            if self.change_threshold is not None:
+                self.frame_changed(current_frame)
             return None, None
 
-        # Convert both current and previous frames to grayscale
-        gray_current = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-        gray_previous = cv2.cvtColor(self.previous_frame, cv2.COLOR_BGR2GRAY)
+        # Unchanged frame: record without computing flow and keep the
+        # reference frame, so slow motion accumulates until it is measured
+        if self.change_threshold is not None and not self.frame_changed(current_frame):
+            self.frames_skipped += 1
+            if self.static_velocity == "hold" and len(self.velocity_history):
+                avg_flow_x = float(self.velocity_history.flow_x[-1])
+                avg_flow_y = float(self.velocity_history.flow_y[-1])
+            else:
+                avg_flow_x = avg_flow_y = 0.0
+            self.record(avg_flow_x, avg_flow_y, timestamp, skipped=True)
+            return avg_flow_x, avg_flow_y
 
-        # Calculate dense optical flow using Farneback method
-        flow = cv2.calcOpticalFlowFarneback(gray_previous, gray_current, None, 0.5, 3, 25, 3, 7, 1.5, 0)
+        # Measure the mean displacement with the ROI's estimator
+        avg_flow_x, avg_flow_y = self.estimator.estimate(self.previous_frame, current_frame)
 
-        # Extract flow components in x and y directions
-        flow_x = flow[..., 0]
-        flow_y = flow[..., 1]
-
-        avg_flow_x = np.mean(flow_x)
-        avg_flow_y = np.mean(flow_y)
+        # Rescale from analysed pixels back to full-resolution pixels, and
+        # spread a displacement over several frames evenly across them
+        frames = len(self.pending_rows) + 1
+        avg_flow_x = avg_flow_x * self.flow_scale[0] / frames
+        avg_flow_y = avg_flow_y * self.flow_scale[1] / frames
         
-        # Store the delta pixel values between the current and previous frame
+        if self.pending_rows:
+            self.velocity_history.set_flow(self.pending_rows,
+                                           avg_flow_x * self.arrow_dir_x + avg_flow_y * self.arrow_dir_y,
+                                           avg_flow_x,
+                                           avg_flow_y)
         
-        self.velocity_history.append({
-            "velocity": self.get_current_velocity(avg_flow_x, avg_flow_y),
-            "timestamp": self.get_current_time(),
-        })
+        # Store the delta pixel values between the current and previous frame
+        self.record(avg_flow_x, avg_flow_y, timestamp)
+        self.measured_flow = (avg_flow_x, avg_flow_y)
         
         # Update the previous frame to the current frame for the next analysis
-        self.previous_frame = current_frame 
+        self.set_reference(current_frame, timestamp)
         
         # Return delta pixel values for the current frame
         return avg_flow_x, avg_flow_y
 
+    def set_reference(self, 
+                      current_frame: np.ndarray,
+                      timestamp: float) -> None:
+        """
+        Make the stored frame the reference the next flow is computed against.
+        """
+        self.previous_frame = current_frame
+        self.reference_timestamp = timestamp
+        self.frames_since_reference = 0
+        self.pending_rows = []
+
+    def reset_reference(self) -> None:
+        """
+        Forget the reference frame, e.g. after the ROI was analysed as part of
+        a cluster, so the next frame starts afresh instead of being compared
+        with a stale frame.
+        """
+        self.previous_frame = None
+        self.reference_timestamp = None
+        self.last_timestamp = None
+        self.frames_since_reference = 0
+        self.pending_rows = []
+        self.reference_thumbnail = None
+        self.estimator.reset()
+
+    def analysis_due(self, 
+                     timestamp: float) -> bool:
+        """
+        Return whether the flow should be computed for the frame at `timestamp`.
+
+        With a target rate the flow is due at the frame closest to one period
+        after the reference frame; otherwise every `stride` frames.
+        """
+        if self.target_hz is not None:
+            interval = timestamp - self.last_timestamp if self.last_timestamp is not None else 0.0
+            return timestamp - self.reference_timestamp + 0.5 * interval >= 1.0 / self.target_hz
+        return self.frames_since_reference >= self.stride
+
+    def analyses_every_frame(self) -> bool:
+        """
+        Return True if every frame is analysed, i.e. neither frame-change
+        gating nor decimation is configured.
+        """
+        return self.change_threshold is None and self.stride == 1 and self.target_hz is None
+
+    def record(self, 
+               avg_flow_x: float, 
+               avg_flow_y: float,
+               timestamp: float = None,
+               skipped: bool = False) -> None:
+        """
+        Store the displacement of one frame in the velocity history.
+
+        `analyze` calls this with its own estimate. It is also used when the
+        displacement was measured outside this analyzer, for example from a
+        flow field shared by a cluster of overlapping ROIs.
+
+        Parameters
+        ----------
+        avg_flow_x : float
+            The mean displacement in x, in full-resolution pixels.
+        avg_flow_y : float
+            The mean displacement in y, in full-resolution pixels.
+        timestamp : float, optional
+            Timestamp of the frame from `clock`; if None, the clock is read.
+        skipped : bool
+            True if the displacement was not measured because the frame was unchanged.
+        """
+        self.velocity_history.append(self.get_current_velocity(avg_flow_x, avg_flow_y),
+                                     avg_flow_x,
+                                     avg_flow_y,
+                                     timestamp if timestamp is not None else self.clock.now(),
+                                     skipped)
+
+    def frame_changed(self, 
+                      current_frame: np.ndarray) -> bool:
+        """
+        Compare the stored frame with the reference frame on a downsampled copy.
+
+        The mean absolute difference is kept in `last_change`. If the frame
+        changed (or there is no reference yet), its thumbnail becomes the new
+        reference; an unchanged frame leaves the reference as it is.
+
+        Parameters
+        ----------
+        current_frame : np.ndarray
+            The grayscale buffer returned by `store_frame`.
+
+        Returns
+        -------
+        bool
+            True if the difference exceeds `change_threshold`.
+        """
+        height, width = current_frame.shape[:2]
+        size = (max(1, width // GATE_FACTOR), max(1, height // GATE_FACTOR))
+        thumbnail = cv2.resize(current_frame, size, interpolation=cv2.INTER_AREA)
+        
+        reference = self.reference_thumbnail
+        if reference is None or reference.shape != thumbnail.shape:
+            self.last_change = float("inf")
+        else:
+            self.last_change = cv2.norm(thumbnail, reference, cv2.NORM_L1) / thumbnail.size
+        
+        changed = self.last_change > self.change_threshold
+        if changed:
+            self.reference_thumbnail = thumbnail
+        return changed
+
+    def get_skip_rate(self) -> float:
+        """
+        Return the fraction of recorded frames skipped as unchanged by the frame-change gate.
+        """
+        frames = len(self.velocity_history)
+        return self.frames_skipped / frames if frames else 0.0
+
+    def store_frame(self, 
+                    current_frame: np.ndarray) -> np.ndarray:
+        """
+        Copy the ROI frame into the analyzer's own grayscale buffer.
+
+        The two buffers are allocated once and then used alternately, so the
+        buffer holding the previous frame is never overwritten. If the ROI
+        size changes, the buffers are reallocated and the previous frame is
+        dropped, because flow cannot be computed between different sizes.
+        When a downscale factor or pixel budget applies, the frame is
+        resized with area averaging straight into the buffer.
+
+        Parameters
+        ----------
+        current_frame : np.ndarray
+            The grayscale (or BGR) ROI frame.
+
+        Returns
+        -------
+        np.ndarray
+            The buffer now holding the grayscale frame.
+        """
+        height, width = current_frame.shape[:2]
+        
+        if self.source_shape != (height, width):
+            self.allocate_buffers(height, width)
+            self.previous_frame = None
+        
+        buffer = self.frame_buffers[1] if self.previous_frame is self.frame_buffers[0] else self.frame_buffers[0]
+        
+        if current_frame.ndim == 3:
+            current_frame = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY, 
+                                         dst=buffer if buffer.shape == (height, width) else None)
+        
+        if buffer.shape != (height, width):
+            cv2.resize(current_frame, (buffer.shape[1], buffer.shape[0]), dst=buffer, 
+                       interpolation=cv2.INTER_AREA)
+        elif current_frame is not buffer:
+            np.copyto(buffer, current_frame)
+            
+        return buffer
+
+    def allocate_buffers(self, 
+                         height: int, 
+                         width: int) -> None:
+        """
+        Allocate the two frame buffers for a ROI size and the current downscale.
+        """
+        factor = self.get_scale_factor(height, width)
+        shape = (max(1, round(height / factor)), max(1, round(width / factor)))
+        self.frame_buffers = [np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8)]
+        self.flow_scale = (width / shape[1], height / shape[0])
+        self.source_shape = (height, width)
+        self.estimator.reset()
+
+    def set_downscale(self, 
+                      downscale: float) -> None:
+        """
+        Change the downscale factor during a run.
+
+        The previous frame is resized into the new buffers, so the next frame
+        is still analysed against it and no frame goes unrecorded.
+        """
+        if downscale < 1:
+            raise ValueError(f"The downscale factor must be at least 1, got {downscale}")
+        
+        self.downscale = float(downscale)
+        if self.source_shape is None:
+            return
+        
+        previous = self.previous_frame
+        old_shape = self.frame_buffers[0].shape
+        self.allocate_buffers(*self.source_shape)
+        new_shape = self.frame_buffers[0].shape
+        
+        if previous is not None:
+            if new_shape == old_shape:
+                np.copyto(self.frame_buffers[0], previous)
+            else:
+                interpolation = cv2.INTER_AREA if new_shape[0] < old_shape[0] else cv2.INTER_LINEAR
+                cv2.resize(previous, (new_shape[1], new_shape[0]), dst=self.frame_buffers[0],
+                           interpolation=interpolation)
+            self.previous_frame = self.frame_buffers[0]
+
+    def get_scale_factor(self, 
+                         height: int, 
+                         width: int) -> float:
+        """
+        Return the effective downscale factor for a ROI of the given size.
+
+        This is the configured `downscale`, increased if needed so that the
+        analysed ROI has at most `pixel_budget` pixels.
+        """
+        factor = self.downscale
+        if self.pixel_budget and height * width / factor ** 2 > self.pixel_budget:
+            factor = (height * width / self.pixel_budget) ** 0.5
+        return factor
+
     def get_current_velocity(self, 
                              avg_flow_x: float, 
                              avg_flow_y: float) -> float:
@@ -168,12 +664,14 @@ class VideoAnalysis:
         """
         Return the current time in the format dd/mm/yyyy HH:MM:SS.sss.
 
+        Frame timestamps are stored as numbers; this is only meant for display.
+
         Returns
         -------
         str
             The current time as a string.
         """
-        return datetime.now().strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]
+        return self.clock.format(self.clock.now())
         
     def get_frame_count(self) -> int:
         """
@@ -190,6 +688,9 @@ class VideoAnalysis:
         """
         Return all stored delta pixel results.
 
+        This is a compatibility view built from the columnar history; use
+        `get_velocities`, `get_flows` and `get_timestamps` for array access.
+
         Returns
         -------
         list
@@ -198,7 +699,42 @@ class VideoAnalysis:
         """
         
         # Return all stored delta pixel results
-        return self.velocity_history
+        return self.velocity_history.to_records()
+    
+    def get_velocities(self) -> np.ndarray:
+        """
+        Return the velocities of all processed frames.
+
+        Returns
+        -------
+        np.ndarray
+            Zero-copy float64 view of the velocity column.
+        """
+        return self.velocity_history.velocities
+    
+    def get_flows(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the raw average flow components of all processed frames.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Zero-copy float64 views of the average x and y flow columns.
+        """
+        return self.velocity_history.flow_x, self.velocity_history.flow_y
+    
+    def get_timestamps(self) -> np.ndarray:
+        """
+        Return the monotonic timestamps of all processed frames.
+
+        Use `clock.format` to turn a timestamp into a wall-clock string.
+
+        Returns
+        -------
+        np.ndarray
+            Zero-copy float64 view of the timestamp column, in seconds.
+        """
+        return self.velocity_history.timestamps
 
     def generate_random_color(self) -> tuple[int, int, int]:
         """
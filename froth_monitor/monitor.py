@@ -0,0 +1,276 @@
+"""Engine Monitor Module for Froth Tracker Application.
+
+This module defines the `EngineMonitor` window, a thin GUI client of an
+`AnalysisEngine` running in another process (see `froth_monitor.engine`). It
+does no capture or analysis itself: it shows the engine's downscaled preview
+from shared memory, scrolling velocity curves of the ROIs and the engine's
+status, and can ask the engine to export its results or to stop.
+
+Because the analysis runs elsewhere, anything that blocks this window (a
+modal dialog, dragging or resizing it, closing it) leaves the analysis
+untouched. When the engine is not reachable the monitor keeps retrying, so it
+can be started before or after the engine and restarted at any time.
+
+Classes:
+--------
+EngineMonitor
+    Main window showing the preview, velocities and status of an engine.
+
+Imports:
+--------
+- PySide6.QtWidgets, PySide6.QtGui, PySide6.QtCore: For the window, widgets and timer.
+- pyqtgraph: For the scrolling velocity curves.
+- collections: For the fixed-length velocity buffers.
+- cv2, numpy: For drawing the ROIs on the preview.
+- EngineClient: For the connection and the preview ring.
+"""
+
+from collections import deque
+
+import cv2
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QImage, QPixmap, QCloseEvent
+from PySide6.QtWidgets import (QMainWindow, QWidget, QLabel, QPushButton, QGridLayout,
+                               QFileDialog)
+
+from .engine import EngineClient, DEFAULT_ADDRESS
+
+CURVE_COLORS = ["r", "b", "g", "m", "c", "y", "k"]
+
+
+class EngineMonitor(QMainWindow):
+    """
+    Engine Monitor Class, a Thin GUI Client of an Analysis Engine.
+
+    Attributes:
+    ----------
+    client : EngineClient
+        The connection to the engine.
+    timer : QTimer
+        Refreshes the window about 30 times per second.
+    reconnect_interval : float
+        Seconds between connection attempts while disconnected.
+    velocity_buffers : list[collections.deque]
+        The most recent velocities of every ROI.
+    velocity_curves : list[pyqtgraph.PlotDataItem]
+        The curve of every ROI.
+    max_frames : int
+        Number of frames shown by the curves.
+    last_preview_index : int
+        Frame index of the preview currently shown.
+
+    Methods:
+    -------
+    refresh() -> None
+        Reconnects if needed, handles new messages and shows the newest preview.
+    handle_message(message: dict) -> None
+        Updates the window for one message from the engine.
+    show_preview() -> None
+        Shows the newest preview frame with the ROIs drawn on it.
+    export_results() -> None
+        Asks the engine to write its results to a chosen file.
+    stop_engine() -> None
+        Asks the engine to stop.
+    """
+
+    def __init__(self,
+                 address: tuple = DEFAULT_ADDRESS,
+                 authkey: bytes = None,
+                 key_file: str = None,
+                 reconnect_interval: float = 1.0) -> None:
+        """
+        Create the window and start trying to connect to the engine.
+
+        Parameters
+        ----------
+        address : tuple[str, int]
+            Address of the engine.
+        authkey : bytes, optional
+            Key the engine expects. Defaults to the key in `key_file`.
+        key_file : str, optional
+            Key file written by the engine (see `froth_monitor.engine`).
+        reconnect_interval : float
+            Seconds between connection attempts while disconnected.
+        """
+        super(EngineMonitor, self).__init__()
+        self.setWindowTitle("Froth Analysis Engine Monitor")
+        self.setGeometry(100, 100, 760, 700)
+
+        self.client = EngineClient(address, authkey, key_file)
+        self.reconnect_interval = reconnect_interval
+        self.ticks_until_reconnect = 0
+        self.velocity_buffers: list = []
+        self.velocity_curves: list = []
+        self.max_frames = 150
+        self.last_preview_index = -1
+
+        self.initUI()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(33)
+
+    def initUI(self) -> None:
+        """
+        Create the preview canvas, the velocity plot, the buttons and the status labels.
+        """
+        main_widget = QWidget(self)
+        self.setCentralWidget(main_widget)
+        layout = QGridLayout()
+        main_widget.setLayout(layout)
+
+        self.preview_label = QLabel("Waiting for the analysis engine...", self)
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_label.setFixedSize(700, 400)
+        layout.addWidget(self.preview_label, 0, 0, 1, 2)
+
+        self.plot_widget = pg.PlotWidget()
+        self.plot_widget.setBackground("w")
+        self.plot_widget.setFixedSize(700, 200)
+        self.plot_widget.hideAxis('bottom')
+        self.plot_widget.addLegend()
+        layout.addWidget(self.plot_widget, 1, 0, 1, 2)
+
+        self.export_button = QPushButton("Export Results", self)
+        self.export_button.clicked.connect(self.export_results)
+        layout.addWidget(self.export_button, 2, 0)
+
+        self.stop_button = QPushButton("Stop Engine", self)
+        self.stop_button.clicked.connect(self.stop_engine)
+        layout.addWidget(self.stop_button, 2, 1)
+
+        self.connection_label = QLabel(self)
+        self.statusBar().addWidget(self.connection_label)
+        self.engine_status_label = QLabel(self)
+        self.statusBar().addPermanentWidget(self.engine_status_label)
+        self.show_connection_state()
+
+    def show_connection_state(self) -> None:
+        """
+        Show whether the monitor is connected in the status bar.
+        """
+        host, port = self.client.address
+        if self.client.is_connected():
+            source = self.client.hello["source"] if self.client.hello else "?"
+            self.connection_label.setText(f"Connected to {host}:{port} ({source})")
+        else:
+            self.connection_label.setText(f"Waiting for the engine at {host}:{port}")
+
+    def refresh(self) -> None:
+        """
+        Reconnect if needed, handle the new messages and show the newest preview.
+        """
+        if not self.client.is_connected():
+            self.ticks_until_reconnect -= 1
+            if self.ticks_until_reconnect > 0:
+                return
+            self.ticks_until_reconnect = max(1, int(self.reconnect_interval * 1000 / self.timer.interval()))
+            if not self.client.connect():
+                return
+            self.show_connection_state()
+
+        messages = self.client.receive()
+        for message in messages:
+            self.handle_message(message)
+
+        # Redraw the curves once per tick, however many frames arrived
+        if any(message.get("type") == "frame" for message in messages):
+            for curve, buffer in zip(self.velocity_curves, self.velocity_buffers):
+                curve.setData(np.fromiter(buffer, dtype=float, count=len(buffer)))
+
+        self.show_preview()
+
+    def handle_message(self,
+                       message: dict) -> None:
+        """
+        Update the window for one message from the engine.
+        """
+        kind = message.get("type")
+        if kind == "hello":
+            self.create_curves(len(message["rects"]))
+            self.show_connection_state()
+        elif kind == "frame":
+            for buffer, velocity in zip(self.velocity_buffers, message["velocities"]):
+                if velocity is not None:
+                    buffer.append(velocity)
+        elif kind == "status":
+            self.engine_status_label.setText(
+                f"Analysed: {message['frames_analysed']}  "
+                f"Rate: {message['analysis_fps']:.1f} fps  "
+                + (f"Capture: {message['fps']:.1f} fps  " if message.get("fps") else "")
+                + f"Capture dropped: {message.get('frames_dropped', 0)}  "
+                f"Messages dropped: {message['messages_dropped']}"
+                + (f"  Skipped: {np.mean(message['skip_rates']):.0%}" if message.get("skip_rates") else "")
+                + (f"  Quality steps: {', '.join(map(str, message['quality_levels']))}"
+                   if message.get("quality_levels") else ""))
+        elif kind == "exported":
+            self.statusBar().showMessage(f"Results written to {message['path']}", 5000)
+        elif kind == "error":
+            self.statusBar().showMessage(message["message"], 5000)
+        elif kind == "finished":
+            self.statusBar().showMessage("The engine finished its run", 5000)
+        elif kind == "disconnected":
+            self.show_connection_state()
+
+    def create_curves(self,
+                      roi_count: int) -> None:
+        """
+        Create one empty velocity curve per ROI, replacing any previous curves.
+        """
+        self.plot_widget.clear()
+        self.velocity_buffers = [deque(maxlen=self.max_frames) for _ in range(roi_count)]
+        self.velocity_curves = [
+            self.plot_widget.plot(pen=pg.mkPen(color=CURVE_COLORS[i % len(CURVE_COLORS)], width=2),
+                                  name=f"ROI {i + 1}")
+            for i in range(roi_count)
+        ]
+
+    def show_preview(self) -> None:
+        """
+        Show the newest preview frame, with the ROIs drawn on it, if it is new.
+        """
+        preview = self.client.read_preview()
+        if preview is None or preview[1] == self.last_preview_index:
+            return
+
+        frame, frame_index, _ = preview
+        self.last_preview_index = frame_index
+        display = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        hello = self.client.hello
+        if hello is not None and hello.get("frame_size"):
+            scale = display.shape[1] / hello["frame_size"][0]
+            for x, y, w, h in hello["rects"]:
+                cv2.rectangle(display, (round(x * scale), round(y * scale)),
+                              (round((x + w) * scale), round((y + h) * scale)), (0, 255, 0), 2)
+
+        height, width, channel = display.shape
+        q_img = QImage(display.data, width, height, channel * width, QImage.Format_RGB888)
+        self.preview_label.setPixmap(QPixmap.fromImage(q_img).scaled(
+            self.preview_label.size(), Qt.AspectRatioMode.KeepAspectRatio))
+
+    def export_results(self) -> None:
+        """
+        Ask the engine to write its results so far to a chosen Excel file.
+        """
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Results", "", "Excel Files (*.xlsx)")
+        if file_path and not self.client.send_command("export", path=file_path):
+            self.statusBar().showMessage("Not connected to the engine", 5000)
+
+    def stop_engine(self) -> None:
+        """
+        Ask the engine to finish its run.
+        """
+        if not self.client.send_command("stop"):
+            self.statusBar().showMessage("Not connected to the engine", 5000)
+
+    def closeEvent(self,
+                   event: QCloseEvent) -> None:
+        """
+        Disconnect on close; the engine keeps running.
+        """
+        self.timer.stop()
+        self.client.close()
+        event.accept()
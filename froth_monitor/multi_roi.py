@@ -0,0 +1,503 @@
+"""Multi-ROI Analysis Module for Froth Tracker Application.
+
+This module defines the `MultiROIAnalysis` class, which analyses all ROIs of
+a frame. The frame region covered by the ROIs is converted to grayscale once
+and every ROI analyses its slice of it with its own `VideoAnalysis`.
+
+Operators often draw several adjacent or overlapping ROIs across one launder
+lip. In cluster mode, such ROIs are grouped into clusters, and one flow field
+is computed over the bounding box of each cluster instead of one per ROI, so
+shared pixels are processed once. Each ROI's mean flow is then read from
+integral images (summed-area tables) of the two flow components in constant
+time, and stored in the ROI's own velocity history with `VideoAnalysis.record`.
+
+Only ROIs that use a dense estimator (see `MotionEstimator.dense`) at full
+resolution can be clustered, and only ROIs using the same estimator are
+clustered together; all other ROIs are analysed on their own. A clustered
+ROI's flow is computed with the surrounding pixels of the cluster as context,
+so near its edges it can differ slightly from the flow of the ROI analysed
+on its own.
+
+The single ROIs and clusters of a frame are independent of each other, and
+OpenCV releases the GIL while it computes flow, so with `workers` > 1 they are
+analysed concurrently on a thread pool and joined before the results are
+returned. Frame latency then approaches the cost of the slowest ROI instead
+of the sum over all ROIs. OpenCV parallelises each call internally as well,
+so the process-wide `cv2.setNumThreads` is lowered to share one thread budget
+(the CPU count by default) between the pool workers, and restored when the
+pool is closed.
+
+Classes:
+--------
+ROICluster
+    One flow field shared by a group of overlapping or adjacent ROIs.
+MultiROIAnalysis
+    Analyses every ROI of a frame, optionally sharing flow within clusters.
+
+Functions:
+----------
+find_clusters(rects: list, gap: int = 1) -> list[list[int]]
+    Groups overlapping or adjacent rectangles into clusters.
+
+Imports:
+--------
+- concurrent.futures: For the per-frame thread pool.
+- cv2: For the integral images and the OpenCV thread budget.
+- numpy: For the frame buffers.
+- os: For the default thread budget.
+- time: For measuring the cost of a cluster.
+- create_estimator: For the estimator of a cluster.
+- grayscale_region: For converting the frame region covered by the ROIs once.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .estimators import create_estimator
+from .image_analysis import grayscale_region
+
+
+def bounding_box(rects: list) -> tuple:
+    """
+    Return the bounding box (x, y, width, height) of a list of rectangles.
+    """
+    x0 = min(x for x, _, _, _ in rects)
+    y0 = min(y for _, y, _, _ in rects)
+    x1 = max(x + w for x, _, w, _ in rects)
+    y1 = max(y + h for _, y, _, h in rects)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def find_clusters(rects: list,
+                  gap: int = 1) -> list:
+    """
+    Group overlapping or adjacent rectangles into clusters.
+
+    Two groups are merged when a rectangle of one overlaps a rectangle of the
+    other, or is within `gap` pixels of it, and the bounding box of the merged
+    group is no larger than the total area of its rectangles. The second
+    condition stops diagonal neighbours from producing a large, mostly empty
+    bounding box that would cost more than analysing the ROIs separately.
+
+    Parameters
+    ----------
+    rects : list[tuple[int, int, int, int]]
+        Rectangles as (x, y, width, height).
+    gap : int
+        Largest distance in pixels at which rectangles count as adjacent.
+
+    Returns
+    -------
+    list[list[int]]
+        Indices into `rects`, one list per cluster (single rectangles included).
+    """
+    def near(a, b):
+        return (a[0] <= b[0] + b[2] + gap and b[0] <= a[0] + a[2] + gap and
+                a[1] <= b[1] + b[3] + gap and b[1] <= a[1] + a[3] + gap)
+
+    groups = [[i] for i in range(len(rects))]
+    merged = True
+    while merged:
+        merged = False
+        for a in range(len(groups)):
+            for b in range(a + 1, len(groups)):
+                members = groups[a] + groups[b]
+                if not any(near(rects[i], rects[j]) for i in groups[a] for j in groups[b]):
+                    continue
+
+                _, _, width, height = bounding_box([rects[i] for i in members])
+                if width * height <= sum(rects[i][2] * rects[i][3] for i in members):
+                    groups[a] = sorted(members)
+                    del groups[b]
+                    merged = True
+                    break
+            if merged:
+                break
+
+    return groups
+
+
+class ROICluster:
+    """
+    ROI Cluster Class for Sharing One Flow Field.
+
+    Attributes:
+    ----------
+    indices : list[int]
+        Indices of the member ROIs in the ROI list.
+    rect : tuple[int, int, int, int]
+        Bounding box (x, y, width, height) of the members in frame pixels.
+    member_rects : list[tuple[int, int, int, int]]
+        Member rectangles in frame pixels.
+    estimator : MotionEstimator
+        The dense estimator computing the shared flow field.
+    frame_buffers : list[np.ndarray]
+        Two contiguous grayscale buffers of the bounding box, used alternately.
+    previous_frame : np.ndarray or None
+        The buffer holding the previous frame.
+
+    Methods:
+    -------
+    analyze(gray_frame: np.ndarray, offset_x: int, offset_y: int) -> list
+        Computes the shared flow field and returns every member's mean flow.
+    store_frame(region: np.ndarray) -> np.ndarray
+        Copies the cluster region into the cluster's own buffer.
+    """
+
+    def __init__(self,
+                 indices: list,
+                 rects: list,
+                 estimator_name: str) -> None:
+        """
+        Initialize the cluster.
+
+        Parameters
+        ----------
+        indices : list[int]
+            Indices of the member ROIs.
+        rects : list[tuple[int, int, int, int]]
+            The member rectangles, in the same order as `indices`.
+        estimator_name : str
+            Name of the dense estimator shared by the members.
+        """
+        self.indices = list(indices)
+        self.member_rects = list(rects)
+        self.rect = bounding_box(self.member_rects)
+        self.estimator = create_estimator(estimator_name)
+        self.frame_buffers = [None, None]
+        self.previous_frame = None
+
+    def store_frame(self,
+                    region: np.ndarray) -> np.ndarray:
+        """
+        Copy the cluster region into the buffer not holding the previous frame.
+        """
+        if self.frame_buffers[0] is None or self.frame_buffers[0].shape != region.shape:
+            self.frame_buffers = [np.empty(region.shape, dtype=np.uint8), np.empty(region.shape, dtype=np.uint8)]
+            self.previous_frame = None
+            self.estimator.reset()
+
+        buffer = self.frame_buffers[1] if self.previous_frame is self.frame_buffers[0] else self.frame_buffers[0]
+        np.copyto(buffer, region)
+        return buffer
+
+    def analyze(self,
+                gray_frame: np.ndarray,
+                offset_x: int,
+                offset_y: int) -> list:
+        """
+        Compute the shared flow field and every member's mean flow.
+
+        Parameters
+        ----------
+        gray_frame : np.ndarray
+            Grayscale region of the frame containing the cluster.
+        offset_x, offset_y : int
+            Position of `gray_frame` in the frame.
+
+        Returns
+        -------
+        list[tuple[float, float] or None]
+            The mean flow of every member, in the order of `indices`, or None
+            for every member on the first frame.
+        """
+        x, y, width, height = self.rect
+        x0, y0 = max(0, x - offset_x), max(0, y - offset_y)
+        current_frame = self.store_frame(gray_frame[y0:y - offset_y + height, x0:x - offset_x + width])
+
+        if self.previous_frame is None:
+            self.previous_frame = current_frame
+            return [None] * len(self.indices)
+
+        flow = self.estimator.flow_field(self.previous_frame, current_frame)
+        self.previous_frame = current_frame
+
+        # Summed-area table of both flow components: any rectangle's sum in O(1)
+        integral = cv2.integral(flow, sdepth=cv2.CV_64F)
+        origin_x, origin_y = x0 + offset_x, y0 + offset_y
+        field_height, field_width = current_frame.shape
+
+        means = []
+        for rect_x, rect_y, rect_width, rect_height in self.member_rects:
+            left = min(max(rect_x - origin_x, 0), field_width)
+            top = min(max(rect_y - origin_y, 0), field_height)
+            right = min(max(rect_x + rect_width - origin_x, 0), field_width)
+            bottom = min(max(rect_y + rect_height - origin_y, 0), field_height)
+            area = (right - left) * (bottom - top)
+            if area <= 0:
+                means.append(None)
+                continue
+
+            total = integral[bottom, right] - integral[top, right] - integral[bottom, left] + integral[top, left]
+            means.append((float(total[0] / area), float(total[1] / area)))
+
+        return means
+
+
+class MultiROIAnalysis:
+    """
+    Multi-ROI Analysis Class for Analysing All ROIs of a Frame.
+
+    Attributes:
+    ----------
+    cluster : bool
+        Share one flow field between overlapping or adjacent ROIs.
+    gap : int
+        Largest distance in pixels at which ROIs count as adjacent.
+    clusters : list[ROICluster]
+        The clusters of the current ROI list.
+    singles : list[int]
+        Indices of the ROIs analysed on their own.
+    clustered_modules : set
+        Ids of the `VideoAnalysis` objects of the clustered ROIs.
+    layout_key : tuple or None
+        Identifies the ROI list and analysis settings the clusters were built for.
+    workers : int
+        Number of threads analysing ROIs concurrently; 1 analyses them in turn.
+    thread_budget : int
+        Total number of threads shared by the pool workers and OpenCV.
+    cv_threads : int or None
+        OpenCV threads per worker set with `cv2.setNumThreads`, or None if
+        OpenCV's setting was left alone (single worker).
+    previous_cv_threads : int or None
+        OpenCV's thread count before the pool lowered it, restored by `close`.
+    executor : ThreadPoolExecutor or None
+        The thread pool, created on first use.
+
+    Methods:
+    -------
+    build(rois: list) -> None
+        Groups the ROIs into clusters and single ROIs.
+    get_layout_key(rois: list, rects: list) -> tuple
+        Returns the key identifying the ROIs and their analysis settings.
+    analyze_frame(rois: list, frame: np.ndarray, timestamp: float) -> list
+        Analyses every ROI of a frame and returns their mean flows.
+    analyze_single(roi: ROI, gray_frame: np.ndarray, rect: tuple, offset: tuple, timestamp: float) -> list
+        Analyses one ROI on its own.
+    analyze_cluster(cluster: ROICluster, rois: list, gray_frame: np.ndarray, offset: tuple, timestamp: float) -> list
+        Analyses one ROI cluster and records every member's flow.
+    start_pool() -> None
+        Creates the thread pool and divides the thread budget.
+    close() -> None
+        Shuts the thread pool down and restores OpenCV's thread count.
+    """
+
+    def __init__(self,
+                 cluster: bool = False,
+                 gap: int = 1,
+                 workers: int = 1,
+                 thread_budget: int = None) -> None:
+        """
+        Initialize the multi-ROI analysis.
+
+        Parameters
+        ----------
+        cluster : bool
+            Share one flow field between overlapping or adjacent ROIs.
+        gap : int
+            Largest distance in pixels at which ROIs count as adjacent.
+        workers : int
+            Number of threads analysing ROIs concurrently.
+        thread_budget : int, optional
+            Total threads shared by the workers and OpenCV. Defaults to the
+            CPU count.
+        """
+        self.cluster = cluster
+        self.gap = gap
+        self.clusters: list = []
+        self.singles: list = []
+        self.clustered_modules: set = set()
+        self.layout_key = None
+        self.workers = max(1, int(workers))
+        self.thread_budget = thread_budget or os.cpu_count() or 1
+        self.cv_threads = None
+        self.previous_cv_threads = None
+        self.executor: ThreadPoolExecutor = None
+
+    def build(self,
+              rois: list) -> None:
+        """
+        Group the ROIs into clusters and single ROIs.
+
+        Only ROIs with a dense estimator at full resolution that analyse
+        every frame (no frame-change gating or decimation) are clustered,
+        and only with ROIs using the same estimator. The others decide on
+        their own when to compute flow.
+
+        A ROI's own reference frame does not advance while it is clustered,
+        so ROIs leaving a cluster forget it and start afresh.
+        """
+        rects = [(roi.rect.x(), roi.rect.y(), roi.rect.width(), roi.rect.height()) for roi in rois]
+        self.clusters = []
+        self.singles = list(range(len(rois)))
+
+        if self.cluster:
+            by_estimator = {}
+            for i, roi in enumerate(rois):
+                module = roi.analysis_module
+                if (module.estimator.dense and module.analyses_every_frame()
+                        and module.get_scale_factor(rects[i][3], rects[i][2]) == 1):
+                    by_estimator.setdefault(module.estimator.name, []).append(i)
+
+            for name, indices in by_estimator.items():
+                for group in find_clusters([rects[i] for i in indices], self.gap):
+                    if len(group) > 1:
+                        members = [indices[j] for j in group]
+                        self.clusters.append(ROICluster(members, [rects[i] for i in members], name))
+
+            clustered = {i for cluster in self.clusters for i in cluster.indices}
+            self.singles = [i for i in range(len(rois)) if i not in clustered]
+
+        for i in self.singles:
+            if id(rois[i].analysis_module) in self.clustered_modules:
+                rois[i].analysis_module.reset_reference()
+        self.clustered_modules = {id(rois[i].analysis_module) for cluster in self.clusters
+                                  for i in cluster.indices}
+        self.layout_key = self.get_layout_key(rois, rects)
+
+    def get_layout_key(self,
+                       rois: list,
+                       rects: list) -> tuple:
+        """
+        Return the key identifying the ROI list and the settings that decide
+        whether a ROI can be clustered, which the quality controller may
+        change during a run.
+        """
+        settings = tuple((roi.analysis_module.downscale, roi.analysis_module.pixel_budget,
+                          roi.analysis_module.analyses_every_frame()) for roi in rois)
+        return (self.cluster, tuple(id(roi) for roi in rois), tuple(rects), settings)
+
+    def analyze_frame(self,
+                      rois: list,
+                      frame: np.ndarray,
+                      timestamp: float) -> list:
+        """
+        Analyse every ROI of a frame.
+
+        The clusters are rebuilt whenever the ROI list, the cluster setting
+        or a ROI's downscale or stride changes.
+
+        Parameters
+        ----------
+        rois : list[ROI]
+            The ROIs to analyse.
+        frame : np.ndarray
+            The full BGR frame.
+        timestamp : float
+            Timestamp of the frame, shared by every ROI.
+
+        Returns
+        -------
+        list[tuple[float, float]]
+            The mean flow `(avg_flow_x, avg_flow_y)` of every ROI, or
+            `(None, None)` for ROIs without a previous frame yet.
+        """
+        if not rois:
+            return []
+
+        rects = [(roi.rect.x(), roi.rect.y(), roi.rect.width(), roi.rect.height()) for roi in rois]
+        if self.layout_key != self.get_layout_key(rois, rects):
+            self.build(rois)
+
+        gray_frame, offset_x, offset_y = grayscale_region(frame, rects)
+        offset = (offset_x, offset_y)
+        flows = [(None, None)] * len(rois)
+
+        # Every single ROI and every cluster is an independent task
+        tasks = [(self.analyze_single, (rois[i], gray_frame, rects[i], offset, timestamp), [i])
+                 for i in self.singles]
+        tasks += [(self.analyze_cluster, (cluster, rois, gray_frame, offset, timestamp), cluster.indices)
+                  for cluster in self.clusters]
+
+        if self.workers > 1 and len(tasks) > 1:
+            if self.executor is None:
+                self.start_pool()
+            futures = [(self.executor.submit(function, *arguments), indices)
+                       for function, arguments, indices in tasks]
+            results = [(future.result(), indices) for future, indices in futures]
+        else:
+            results = [(function(*arguments), indices) for function, arguments, indices in tasks]
+
+        for result, indices in results:
+            for i, flow in zip(indices, result):
+                flows[i] = flow
+
+        return flows
+
+    @staticmethod
+    def analyze_single(roi,
+                       gray_frame: np.ndarray,
+                       rect: tuple,
+                       offset: tuple,
+                       timestamp: float) -> list:
+        """
+        Analyse one ROI on its own slice of the grayscale region.
+
+        Returns
+        -------
+        list[tuple[float, float]]
+            The ROI's mean flow, as a one-element list.
+        """
+        x, y, w, h = rect
+        x, y = x - offset[0], y - offset[1]
+        return [roi.analysis_module.analyze(gray_frame[y:y+h, x:x+w], timestamp)]
+
+    @staticmethod
+    def analyze_cluster(cluster: ROICluster,
+                        rois: list,
+                        gray_frame: np.ndarray,
+                        offset: tuple,
+                        timestamp: float) -> list:
+        """
+        Analyse one ROI cluster and record every member's mean flow.
+
+        The cost of the shared flow field is divided evenly between the
+        members' `last_cost`.
+
+        Returns
+        -------
+        list[tuple[float, float]]
+            The mean flow of every member, in the order of `cluster.indices`.
+        """
+        flows = []
+        started = time.perf_counter()
+        means = cluster.analyze(gray_frame, offset[0], offset[1])
+        share = (time.perf_counter() - started) / len(cluster.indices)
+        for i, mean in zip(cluster.indices, means):
+            rois[i].analysis_module.last_cost = share
+            if mean is None:
+                flows.append((None, None))
+                continue
+            rois[i].analysis_module.record(mean[0], mean[1], timestamp)
+            flows.append(mean)
+        return flows
+
+    def start_pool(self) -> None:
+        """
+        Create the thread pool and divide the thread budget.
+
+        Each worker gets `thread_budget // workers` OpenCV threads (at least
+        one), so that the pool and OpenCV's own parallelism together do not
+        oversubscribe the CPU. `cv2.setNumThreads` is process-wide, so the
+        previous setting is kept for `close` to restore.
+        """
+        self.cv_threads = max(1, self.thread_budget // self.workers)
+        self.previous_cv_threads = cv2.getNumThreads()
+        cv2.setNumThreads(self.cv_threads)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ROIAnalysis")
+        print(f"ROI analysis: {self.workers} threads x {self.cv_threads} OpenCV threads")
+
+    def close(self) -> None:
+        """
+        Shut the thread pool down and restore OpenCV's thread count.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.previous_cv_threads is not None:
+            cv2.setNumThreads(self.previous_cv_threads)
+            self.previous_cv_threads = None
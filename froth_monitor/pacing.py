@@ -0,0 +1,190 @@
+"""Frame Pacing Module for Froth Tracker Application.
+
+This module defines the `FramePacer` class, which decides when the frames of
+a video file are due during playback. A file can be read much faster than it
+was recorded, so without pacing playback speed depends on how fast frames
+are decoded and consumed rather than on the recording.
+
+The pacer anchors the media time of a frame (its position in the file, from
+`CAP_PROP_POS_MSEC`) to the monotonic clock when playback starts, and from
+then on schedules every frame at
+
+    anchor_wall + (media_time - anchor_media) / speed
+
+so the schedule follows the file's own frame times and does not drift with
+the time spent per frame.
+
+Playback modes:
+---------------
+- REALTIME ("realtime"): frames are played at the speed they were recorded.
+  When playback falls behind (a slow analysis step, a busy GUI), the frames
+  that are already overdue are skipped with `VideoCapture.grab`, which
+  advances the file without decoding, so playback catches up with the
+  schedule instead of running late for the rest of the file.
+- FASTEST ("fastest"): frames are read as fast as they are consumed; nothing
+  is waited for or skipped.
+- MULTIPLIER ("multiplier"): like REALTIME at `speed` times the recorded speed
+  (e.g. 2 for double speed, 0.5 for slow motion).
+
+Classes:
+--------
+FramePacer
+    Schedules video file frames in media time for one of the playback modes.
+
+Functions:
+----------
+poll_interval_ms(fps: float, speed: float = 1.0) -> int
+    Returns a GUI timer interval that polls twice per frame period.
+
+Imports:
+--------
+- math: For rounding the number of frames to skip.
+- time: For the monotonic playback clock.
+"""
+
+import math
+import time
+
+REALTIME = "realtime"
+FASTEST = "fastest"
+MULTIPLIER = "multiplier"
+PACING_MODES = (REALTIME, FASTEST, MULTIPLIER)
+
+
+def poll_interval_ms(fps: float,
+                     speed: float = 1.0) -> int:
+    """
+    Return a timer interval in milliseconds that polls twice per frame period.
+
+    Polling faster than frames are due keeps a consumer from becoming the
+    bottleneck that makes a paced source fall behind.
+    """
+    if not fps or fps <= 0:
+        return 15
+    return max(1, int(500 / (fps * speed)))
+
+
+class FramePacer:
+    """
+    Frame Pacer Class for Scheduling Video File Playback.
+
+    Attributes:
+    ----------
+    fps : float
+        Frame rate of the file.
+    mode : str
+        One of REALTIME, FASTEST or MULTIPLIER.
+    speed : float
+        Playback speed relative to the recording (1 in REALTIME mode).
+    max_lag : float
+        Media time in seconds playback may fall behind before frames are skipped.
+    anchor_wall : float or None
+        Monotonic time at which `anchor_media` was due, or None until the first frame.
+    anchor_media : float
+        Media time of the frame playback was anchored at.
+
+    Methods:
+    -------
+    set_mode(mode: str, speed: float = 1.0) -> None
+        Changes the playback mode and speed, re-anchoring the schedule.
+    resync() -> None
+        Re-anchors the schedule at the next frame, e.g. after a pause.
+    delay(media_time: float) -> float
+        Returns the seconds to wait before the frame at `media_time` is due.
+    frames_behind(media_time: float) -> int
+        Returns how many frames from `media_time` on are overdue and should be skipped.
+    poll_interval_ms() -> int
+        Returns a GUI timer interval suited to the playback speed.
+    """
+
+    def __init__(self,
+                 fps: float,
+                 mode: str = REALTIME,
+                 speed: float = 1.0,
+                 max_lag: float = 0.1) -> None:
+        """
+        Initialize the pacer.
+
+        Parameters
+        ----------
+        fps : float
+            Frame rate of the file; used for the skip count and the poll interval.
+        mode : str
+            One of REALTIME, FASTEST or MULTIPLIER.
+        speed : float
+            Playback speed relative to the recording in MULTIPLIER mode.
+        max_lag : float
+            Media time in seconds playback may fall behind before overdue
+            frames are skipped. Smaller lags are made up by not waiting.
+        """
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self.max_lag = max_lag
+        self.anchor_wall = None
+        self.anchor_media = 0.0
+        self.set_mode(mode, speed)
+
+    def set_mode(self,
+                 mode: str,
+                 speed: float = 1.0) -> None:
+        """
+        Change the playback mode and speed; the schedule is re-anchored at the next frame.
+        """
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown playback mode: {mode}")
+        if speed <= 0:
+            raise ValueError(f"The playback speed must be positive, got {speed}")
+
+        self.mode = mode
+        self.speed = float(speed) if mode == MULTIPLIER else 1.0
+        self.resync()
+
+    def resync(self) -> None:
+        """
+        Re-anchor the schedule at the next frame, so that time spent paused
+        is not made up by skipping frames.
+        """
+        self.anchor_wall = None
+
+    def delay(self,
+              media_time: float) -> float:
+        """
+        Return the time in seconds until the frame at `media_time` is due.
+
+        The first frame after (re-)anchoring is due immediately. Negative
+        values mean the frame is late; FASTEST mode always returns 0.
+        """
+        if self.mode == FASTEST:
+            return 0.0
+
+        now = time.perf_counter()
+        if self.anchor_wall is None:
+            self.anchor_wall = now
+            self.anchor_media = media_time
+            return 0.0
+
+        return self.anchor_wall + (media_time - self.anchor_media) / self.speed - now
+
+    def frames_behind(self,
+                      media_time: float) -> int:
+        """
+        Return the number of frames to skip before the frame at `media_time`.
+
+        Nothing is skipped in FASTEST mode, before the schedule is anchored or
+        while playback is less than `max_lag` behind; otherwise every frame
+        that is already overdue is skipped.
+        """
+        if self.mode == FASTEST or self.anchor_wall is None:
+            return 0
+
+        lag = -self.delay(media_time) * self.speed  # In media time
+        if lag <= self.max_lag:
+            return 0
+        return math.floor(lag * self.fps)
+
+    def poll_interval_ms(self) -> int:
+        """
+        Return a GUI timer interval suited to the playback speed.
+        """
+        if self.mode == FASTEST:
+            return 1
+        return poll_interval_ms(self.fps, self.speed)
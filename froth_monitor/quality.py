@@ -0,0 +1,284 @@
+"""Adaptive Quality Module for Froth Tracker Application.
+
+This module defines the `QualityController` class, which keeps the analysis
+of a frame within the time available per frame. Every frame it is given the
+time the analysis of all ROIs took and each ROI's own share (the
+`last_cost` of its `VideoAnalysis`). When the smoothed frame cost exceeds
+the budget, the most expensive ROI is moved one step down a ladder of
+cheaper settings; when the cost has stayed well below the budget for a
+while, the most degraded ROI is moved one step back up.
+
+Quality ladder:
+---------------
+Each step of `QUALITY_LADDER` names a downscale factor, the Farneback
+pyramid levels and window size, and a stride. A step never makes a ROI more
+expensive than its own starting settings: the larger downscale and stride
+and the smaller levels and window size of the two are used. Steps are
+ordered so that the first ones cost the least accuracy (a mild downscale)
+and skipping frames comes last. Estimators without pyramid or window
+parameters only use the downscale and stride of a step, and ROIs analysed
+at a target rate keep their rate instead of a stride.
+
+Every change is printed and kept in `changes`, with the time, the ROI, the
+old and new step, the reason and the measured frame cost, so that the
+exported results say which settings were in force when.
+
+Classes:
+--------
+QualityController
+    Moves ROIs along the quality ladder to hold a per-frame time budget.
+
+Imports:
+--------
+- None: Works on the ROIs' `VideoAnalysis` objects only.
+"""
+
+QUALITY_LADDER = [
+    {"downscale": 1.0, "levels": 3, "winsize": 25, "stride": 1},
+    {"downscale": 1.5, "levels": 3, "winsize": 21, "stride": 1},
+    {"downscale": 2.0, "levels": 2, "winsize": 17, "stride": 1},
+    {"downscale": 3.0, "levels": 2, "winsize": 13, "stride": 1},
+    {"downscale": 3.0, "levels": 1, "winsize": 13, "stride": 2},
+    {"downscale": 4.0, "levels": 1, "winsize": 11, "stride": 3},
+]
+
+
+class QualityController:
+    """
+    Quality Controller Class for Holding a Per-Frame Time Budget.
+
+    Attributes:
+    ----------
+    fps : float
+        Frame rate of the source; the frame period is `1 / fps`.
+    budget_fraction : float
+        Fraction of the frame period the analysis may use.
+    headroom : float
+        Quality is raised only while the cost stays below this fraction of the budget.
+    smoothing : float
+        Weight of the newest frame in the moving averages of the costs.
+    cooldown : int
+        Frames to wait after a change before lowering quality again.
+    patience : int
+        Consecutive frames below the headroom before quality is raised.
+    frame_cost : float or None
+        Smoothed analysis time of a frame in seconds.
+    roi_costs : dict
+        Smoothed analysis time of every ROI in seconds, by ROI id.
+    levels : dict
+        Current ladder step of every ROI, by ROI id.
+    base_settings : dict
+        The settings every ROI started with, by ROI id.
+    changes : list[dict]
+        Every quality change made so far.
+
+    Methods:
+    -------
+    set_fps(fps: float) -> None
+        Sets the source frame rate the budget is derived from.
+    frame_budget() -> float
+        Returns the time available for analysing one frame in seconds.
+    update(rois: list, frame_cost: float, timestamp: float = None) -> dict or None
+        Records the cost of a frame and changes one ROI's quality if needed.
+    apply_level(roi: ROI, level: int) -> str
+        Applies a ladder step to a ROI and returns a description of its settings.
+    get_level(roi: ROI) -> int
+        Returns the current ladder step of a ROI.
+    reset() -> None
+        Forgets all costs, levels and changes.
+    """
+
+    def __init__(self,
+                 fps: float = 30.0,
+                 budget_fraction: float = 0.8,
+                 headroom: float = 0.5,
+                 smoothing: float = 0.2,
+                 cooldown: int = 15,
+                 patience: int = 90) -> None:
+        """
+        Initialize the controller.
+
+        Parameters
+        ----------
+        fps : float
+            Frame rate of the source.
+        budget_fraction : float
+            Fraction of the frame period the analysis may use; the rest is
+            left for capture, display and recording.
+        headroom : float
+            Raise quality only while the cost stays below this fraction of the budget.
+        smoothing : float
+            Weight of the newest frame in the moving averages of the costs.
+        cooldown : int
+            Frames to wait after a change before lowering quality again, so
+            that the effect of a change is measured before the next one.
+        patience : int
+            Consecutive frames below the headroom before quality is raised.
+        """
+        self.fps = 30.0
+        self.set_fps(fps)
+        self.budget_fraction = budget_fraction
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.patience = patience
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget all costs, levels and changes, e.g. when new ROIs are analysed.
+        """
+        self.frame_cost = None
+        self.roi_costs: dict = {}
+        self.levels: dict = {}
+        self.base_settings: dict = {}
+        self.changes: list = []
+        self.frames_since_change = 0
+        self.calm_frames = 0
+
+    def set_fps(self,
+                fps: float) -> None:
+        """
+        Set the source frame rate the budget is derived from; invalid rates are ignored.
+        """
+        if fps and fps > 0:
+            self.fps = float(fps)
+
+    def frame_budget(self) -> float:
+        """
+        Return the time available for analysing one frame in seconds.
+        """
+        return self.budget_fraction / self.fps
+
+    def get_level(self,
+                  roi) -> int:
+        """
+        Return the current ladder step of a ROI (0 for its starting settings).
+        """
+        return self.levels.get(id(roi), 0)
+
+    def update(self,
+               rois: list,
+               frame_cost: float,
+               timestamp: float = None) -> dict:
+        """
+        Record the cost of a frame and change the quality of one ROI if needed.
+
+        Parameters
+        ----------
+        rois : list[ROI]
+            The ROIs analysed in the frame.
+        frame_cost : float
+            Time the analysis of the frame took in seconds.
+        timestamp : float, optional
+            Timestamp of the frame, stored with a change.
+
+        Returns
+        -------
+        dict or None
+            The change made, as appended to `changes`, or None.
+        """
+        if not rois:
+            return None
+
+        weight = self.smoothing
+        self.frame_cost = frame_cost if self.frame_cost is None else \
+            (1 - weight) * self.frame_cost + weight * frame_cost
+        for roi in rois:
+            cost = roi.analysis_module.last_cost
+            previous = self.roi_costs.get(id(roi))
+            self.roi_costs[id(roi)] = cost if previous is None else (1 - weight) * previous + weight * cost
+
+        self.frames_since_change += 1
+        budget = self.frame_budget()
+
+        if self.frame_cost > budget:
+            self.calm_frames = 0
+            if self.frames_since_change < self.cooldown:
+                return None
+            candidates = [roi for roi in rois if self.get_level(roi) < len(QUALITY_LADDER) - 1]
+            if not candidates:
+                return None
+            roi = max(candidates, key=lambda r: self.roi_costs[id(r)])
+            return self.change_level(rois, roi, self.get_level(roi) + 1, "over budget", timestamp)
+
+        if self.frame_cost < budget * self.headroom:
+            self.calm_frames += 1
+        else:
+            self.calm_frames = 0
+
+        if self.calm_frames >= self.patience:
+            candidates = [roi for roi in rois if self.get_level(roi) > 0]
+            if not candidates:
+                return None
+            roi = max(candidates, key=self.get_level)
+            return self.change_level(rois, roi, self.get_level(roi) - 1, "headroom", timestamp)
+
+        return None
+
+    def change_level(self,
+                     rois: list,
+                     roi,
+                     level: int,
+                     reason: str,
+                     timestamp: float) -> dict:
+        """
+        Move a ROI to a ladder step, and log and return the change.
+        """
+        old_level = self.get_level(roi)
+        settings = self.apply_level(roi, level)
+        change = {
+            "timestamp": timestamp,
+            "roi": rois.index(roi) + 1,
+            "from_level": old_level,
+            "to_level": level,
+            "reason": reason,
+            "frame_cost_ms": self.frame_cost * 1000,
+            "budget_ms": self.frame_budget() * 1000,
+            "settings": settings,
+        }
+        self.changes.append(change)
+        print(f"Quality of ROI {change['roi']} {'lowered' if level > old_level else 'raised'} "
+              f"to step {level} ({settings}): frame cost {change['frame_cost_ms']:.1f} ms, "
+              f"budget {change['budget_ms']:.1f} ms")
+
+        # Let the new settings show in the costs before the next change
+        self.frames_since_change = 0
+        self.calm_frames = 0
+        self.frame_cost = None
+        self.roi_costs.pop(id(roi), None)
+        return change
+
+    def apply_level(self,
+                    roi,
+                    level: int) -> str:
+        """
+        Apply a ladder step to a ROI, never exceeding its starting settings.
+
+        Returns
+        -------
+        str
+            The resulting settings, e.g. "downscale 2, levels 2, winsize 17, stride 1".
+        """
+        module = roi.analysis_module
+        estimator = module.estimator
+        base = self.base_settings.setdefault(id(roi), {
+            "downscale": module.downscale,
+            "stride": module.stride,
+            **estimator.quality_parameters(),
+        })
+        step = QUALITY_LADDER[level]
+
+        module.set_downscale(max(base["downscale"], step["downscale"]))
+        if module.target_hz is None:
+            module.stride = max(base["stride"], step["stride"])
+        parameters = {name: min(value, step[name]) for name, value in base.items()
+                      if name not in ("downscale", "stride") and name in step}
+        estimator.set_quality(**parameters)
+        self.levels[id(roi)] = level
+
+        settings = [f"downscale {module.downscale:g}"]
+        settings += [f"{name} {value}" for name, value in parameters.items()]
+        settings.append(f"stride {module.stride}" if module.target_hz is None
+                        else f"target {module.target_hz:g} Hz")
+        return ", ".join(settings)
@@ -17,6 +17,7 @@ Imports:
 - pg (pyqtgraph): For rendering scrolling axis plots.
 - cv2 (OpenCV): For drawing rectangles, lines, and text on video frames.
 - VideoAnalysisModule: For performing optical flow-based motion analysis.
+- FrameClock: For sharing frame timestamps between ROIs.
 
 Example Usage:
 --------------
@@ -29,6 +30,7 @@ from PySide6.QtCore import QRect, QPoint
 import pyqtgraph as pg
 import cv2
 from .image_analysis import VideoAnalysis
+from .frame_clock import FrameClock
 
 class ROI:
     """Region of Interest (ROI) Class for Motion Analysis.
@@ -49,7 +51,7 @@ class ROI:
 
     Methods:
     -------
-    __init__(rect: QRect, arrow_dir_x: float, arrow_dir_y: float) -> None
+    __init__(rect: QRect, arrow_dir_x: float, arrow_dir_y: float, clock: FrameClock = None, **analysis_options) -> None
         Initializes the ROI with a rectangular geometry and arrow direction for motion analysis.
     update_cross_position(avg_flow_x: float, avg_flow_y: float) -> None
         Updates the position of the cross intersection based on the optical flow results.
@@ -62,7 +64,9 @@ class ROI:
     def __init__(self, 
                  rect: QRect, 
                  arrow_dir_x: float, 
-                 arrow_dir_y: float) -> None:
+                 arrow_dir_y: float,
+                 clock: FrameClock = None,
+                 **analysis_options) -> None:
         """
         Initialize the Region of Interest (ROI) with the given rectangle and arrow direction.
 
@@ -74,10 +78,17 @@ class ROI:
             The x component of the direction of the scrolling axis.
         arrow_dir_y : float
             The y component of the direction of the scrolling axis.
+        clock : FrameClock, optional
+            The clock shared by all ROIs for frame timestamps.
+        **analysis_options
+            Per-ROI analysis settings passed to `VideoAnalysis`, such as
+            `downscale`, `pixel_budget` or `estimator`.
         """
         self.rect = rect
         self.analysis_module = VideoAnalysis(arrow_dir_x,
-                                                   arrow_dir_y)
+                                                   arrow_dir_y,
+                                                   clock,
+                                                   **analysis_options)
         self.cross_position = QPoint(rect.center().x(), rect.center().y())  # Initialize cross at ROI center
 
     def update_cross_position(self, 
@@ -112,6 +123,9 @@ class ROI:
                       roi_index: int) -> None:
         """
         Draws the ROI rectangle, cross position, and scrolling axis on the given frame.
+
+        The frame is the RGB display copy, so the cross lines use the same
+        RGB colour as the ROI's curve in the movement plot.
         """
         x, y, w, h = self.rect.x(), self.rect.y(), self.rect.width(), self.rect.height()
 
@@ -0,0 +1,226 @@
+"""Velocity History Module for Froth Tracker Application.
+
+This module defines the `VelocityHistory` class, a compact columnar store for
+the per-frame results of a `VideoAnalysis`. Instead of keeping one Python dict
+with a float and a formatted string for every frame, the history keeps a set of
+float64 numpy columns that grow by amortized doubling.
+
+Columns:
+--------
+- velocity: velocity along the overflow direction (pixels/frame).
+- flow_x, flow_y: raw average optical flow components (pixels/frame).
+- timestamp: monotonic timestamp of the frame in seconds (see `FrameClock`).
+- skipped: True if no flow was computed for the frame, because it was
+  unchanged or fell between two analysed frames (see `VideoAnalysis`).
+
+Classes:
+--------
+VelocityHistory
+    Growable columnar store of per-frame velocities and timestamps.
+
+Imports:
+--------
+- numpy: For the column arrays.
+- FrameClock: For formatting timestamps on demand.
+"""
+
+import numpy as np
+from .frame_clock import FrameClock
+
+
+class VelocityHistory:
+    """
+    Columnar store of per-frame analysis results.
+
+    Rows are appended with `append`. The column accessors (`velocities`,
+    `flow_x`, `flow_y`, `timestamps`) return zero-copy views of the filled
+    part of the underlying arrays. A view stays valid after later appends, but
+    it only covers the rows that existed when it was taken.
+
+    Timestamps are stored as seconds of a `FrameClock`. They are converted to
+    wall-clock strings only when requested, using the clock's anchor.
+
+    Attributes:
+    ----------
+    size : int
+        Number of rows stored.
+    clock : FrameClock
+        The clock the timestamps were taken from.
+
+    Methods:
+    -------
+    append(velocity: float, avg_flow_x: float, avg_flow_y: float, timestamp: float, skipped: bool = False) -> None
+        Appends one row to the history.
+    format_timestamp(timestamp: float) -> str
+        Converts a monotonic timestamp to "dd/mm/yyyy HH:MM:SS.sss".
+    set_flow(rows: list, velocity: float, avg_flow_x: float, avg_flow_y: float) -> None
+        Overwrites the velocity and flow of earlier rows.
+    to_records() -> list
+        Returns the legacy list-of-dicts view of the history.
+    clear() -> None
+        Removes all rows while keeping the allocated capacity.
+    """
+
+    def __init__(self,
+                 clock: FrameClock = None,
+                 initial_capacity: int = 1024) -> None:
+        """
+        Initialize an empty history.
+
+        Parameters
+        ----------
+        clock : FrameClock, optional
+            The clock the timestamps are taken from. A new clock is created if None.
+        initial_capacity : int
+            Number of rows to preallocate before the first resize.
+        """
+
+        self.size = 0
+        self._velocity = np.empty(initial_capacity, dtype=np.float64)
+        self._flow_x = np.empty(initial_capacity, dtype=np.float64)
+        self._flow_y = np.empty(initial_capacity, dtype=np.float64)
+        self._timestamp = np.empty(initial_capacity, dtype=np.float64)
+        self._skipped = np.empty(initial_capacity, dtype=bool)
+
+        self.clock = clock if clock is not None else FrameClock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self,
+                    index: int) -> dict:
+        """
+        Return a single row as a dictionary with the legacy keys.
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("velocity history index out of range")
+
+        return {
+            "velocity": float(self._velocity[index]),
+            "timestamp": self.format_timestamp(self._timestamp[index]),
+        }
+
+    def append(self,
+               velocity: float,
+               avg_flow_x: float,
+               avg_flow_y: float,
+               timestamp: float,
+               skipped: bool = False) -> None:
+        """
+        Append one row to the history, doubling the capacity when full.
+
+        Parameters
+        ----------
+        velocity : float
+            Velocity along the overflow direction.
+        avg_flow_x : float
+            Average flow in the x direction.
+        avg_flow_y : float
+            Average flow in the y direction.
+        timestamp : float
+            Monotonic timestamp of the frame in seconds.
+        skipped : bool
+            True if no flow was computed for the frame.
+        """
+
+        if self.size == len(self._velocity):
+            self._grow()
+
+        i = self.size
+        self._velocity[i] = velocity
+        self._flow_x[i] = avg_flow_x
+        self._flow_y[i] = avg_flow_y
+        self._timestamp[i] = timestamp
+        self._skipped[i] = skipped
+        self.size += 1
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of every column.
+        """
+        capacity = max(1, 2 * len(self._velocity))
+        for name in ("_velocity", "_flow_x", "_flow_y", "_timestamp", "_skipped"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def set_flow(self,
+                 rows: list,
+                 velocity: float,
+                 avg_flow_x: float,
+                 avg_flow_y: float) -> None:
+        """
+        Overwrite the velocity and flow of earlier rows, keeping their timestamps and flags.
+
+        Used to replace provisional values once the displacement over an
+        interval of frames has been measured.
+        """
+        self._velocity[rows] = velocity
+        self._flow_x[rows] = avg_flow_x
+        self._flow_y[rows] = avg_flow_y
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """Velocities along the overflow direction (zero-copy view)."""
+        return self._velocity[:self.size]
+
+    @property
+    def flow_x(self) -> np.ndarray:
+        """Average flow in the x direction (zero-copy view)."""
+        return self._flow_x[:self.size]
+
+    @property
+    def flow_y(self) -> np.ndarray:
+        """Average flow in the y direction (zero-copy view)."""
+        return self._flow_y[:self.size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Monotonic timestamps in seconds (zero-copy view)."""
+        return self._timestamp[:self.size]
+
+    @property
+    def skipped(self) -> np.ndarray:
+        """Flags of the frames for which no flow was computed (zero-copy view)."""
+        return self._skipped[:self.size]
+
+    def format_timestamp(self,
+                         timestamp: float) -> str:
+        """
+        Convert a monotonic timestamp to the format dd/mm/yyyy HH:MM:SS.sss.
+
+        Parameters
+        ----------
+        timestamp : float
+            Monotonic timestamp in seconds.
+
+        Returns
+        -------
+        str
+            The matching wall-clock time as a string.
+        """
+        return self.clock.format(timestamp)
+
+    def to_records(self) -> list:
+        """
+        Return the history as a list of dictionaries.
+
+        Returns
+        -------
+        list
+            One dictionary per frame with the keys "velocity" (float) and
+            "timestamp" (formatted string).
+        """
+        return [
+            {"velocity": velocity, "timestamp": self.format_timestamp(timestamp)}
+            for velocity, timestamp in zip(self.velocities.tolist(), self.timestamps.tolist())
+        ]
+
+    def clear(self) -> None:
+        """
+        Remove all rows while keeping the allocated capacity.
+        """
+        self.size = 0
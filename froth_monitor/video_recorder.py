@@ -4,16 +4,46 @@ This module defines the `VideoRecorder` class, which is responsible for recordin
 and saving them to a file. The class provides methods to start, write, and stop video recording,
 allowing seamless integration with real-time video analysis workflows.
 
+Encoding a large frame costs several milliseconds, so frames are not encoded by the caller.
+`write_frame` only puts the frame on a bounded queue, and a dedicated writer thread encodes
+and writes the queued frames. OpenCV releases the GIL while encoding, so the GUI thread keeps
+its frame budget for display and analysis.
+
+When the encoder cannot keep up, the queue fills. `write_frame` then waits up to
+`max_block` seconds for room (backpressure) and drops the frame if there is still none, so a
+slow disk delays the caller by a bounded amount and never stalls it. Waits and drops are
+counted in `get_statistics`. `stop_recording` writes every queued frame before closing the file.
+
+Segmented recording:
+--------------------
+For long unattended runs the recording can be split into numbered segments
+(`<name>_0001.mp4`, `<name>_0002.mp4`, ...). The writer thread starts a new segment
+once the current one covers `segment_seconds` of capture time or has grown to
+`segment_bytes`. The file size is only checked every `SIZE_CHECK_INTERVAL` frames, and
+the encoder buffers data before it reaches the disk, so the size limit is approximate:
+a segment can exceed `segment_bytes` by a few dozen frames. Frames keep queuing while a segment is closed and the next one opened,
+so none are lost at the boundary, and a crash can only damage the segment being written.
+
+Every segment has an index file (`<name>_0001.csv`) listing, per frame, the frame number
+of the whole recording, the frame number within the segment and the capture timestamp.
+The index is flushed whenever the writer has caught up with the queue. `RecordingIndex`
+loads the indexes of a recording and finds the segment and frame of any frame number or
+timestamp by binary search, so an analysed frame can be looked up in the footage.
+
 Classes:
 --------
 VideoRecorder
     Handles video recording operations, including initializing a video writer,
     writing frames to the video file, and managing recording state.
+RecordingIndex
+    Looks up frames of a segmented recording by frame number or timestamp.
 
 Imports:
 --------
 - cv2 (OpenCV): For video writing operations.
 - numpy (optional for frame type): For representing video frames as arrays.
+- queue, threading, time: For the writer thread, its frame queue and the wait statistics.
+- bisect, csv, glob, os: For the segment index files, their lookup and the segment sizes.
 
 Example Usage:
 --------------
@@ -21,9 +51,22 @@ To use the module, instantiate the `VideoRecorder` class with the desired settin
 start recording, write frames, and stop recording when done.
 """
 
+import bisect
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+
 import numpy as np
 import cv2
 
+_STOP = object()  # Tells the writer thread that no more frames follow
+STOP_TIMEOUT = 5.0  # Seconds stop_recording waits for the writer thread
+INDEX_HEADER = ["frame", "segment_frame", "timestamp"]
+SIZE_CHECK_INTERVAL = 30  # Frames between two checks of the segment file size
+
 class VideoRecorder:
     """
     Video Recorder Class.
@@ -54,24 +97,68 @@ class VideoRecorder:
         Timestamp of the first recorded frame.
     frame_2_time : float
         Timestamp of the second recorded frame.
+    frames : queue.Queue
+        Bounded queue of frames waiting for the writer thread.
+    max_block : float
+        Longest time in seconds `write_frame` waits for room before dropping a frame.
+    writer_thread : threading.Thread or None
+        The background thread encoding and writing frames.
+    frames_dropped : int
+        Number of frames dropped because the queue stayed full, the writer thread
+        had died, there was no segment to write to or writing them failed;
+        counted by both threads under `stats_lock`.
+    stats_lock : threading.Lock
+        Guards `frames_dropped` against the caller and writer threads.
+    frames_blocked : int
+        Number of frames for which `write_frame` had to wait for room.
+    blocked_time : float
+        Total time in seconds `write_frame` waited for room.
+    max_queue_depth : int
+        Largest number of frames that were waiting at once.
+    segment_seconds : float or None
+        Capture time after which a new segment is started; None for no time limit.
+    segment_bytes : int or None
+        Approximate file size after which a new segment is started; None for no size limit.
+    segment : int
+        Number of the segment being written (0 when not segmenting).
+    segment_paths : list[str]
+        Paths of the segments written so far.
 
     Methods:
     -------
     start_recording() -> None
         Starts recording video to a file. Initializes the video writer.
-    write_frame(frame: np.ndarray) -> None
-        Writes a single frame to the video file.
+    write_frame(frame: np.ndarray, timestamp: float = None) -> bool
+        Queues a single frame to be written to the video file.
+    writer_loop() -> None
+        Body of the writer thread: encodes queued frames until stopped.
+    write_item(frame: np.ndarray, timestamp: float) -> None
+        Encodes one queued frame and adds it to the segment index.
+    is_segmented() -> bool
+        Returns True if the recording is split into segments.
+    open_segment(segment: int) -> bool
+        Closes the current segment and starts the given one with its index file.
+    close_segment() -> None
+        Releases the writer and closes the index file of the current segment.
+    segment_full(timestamp: float) -> bool
+        Returns True when the current segment has reached its time or size limit.
     stop_recording() -> None
-        Stops recording and releases resources.
+        Writes the queued frames, stops the writer thread and releases resources.
     is_recording() -> bool
         Checks if the recorder is currently recording.
+    get_statistics() -> dict
+        Returns the frame counters, queue depth and encoding and waiting times.
     """
     
     def __init__(self, 
                  file_path: str = "", 
                  file_name: str = "./recording", 
                  fps: int = 30, 
-                 frame_size: tuple = (640, 480)) -> None:
+                 frame_size: tuple = (640, 480),
+                 max_queue_size: int = 64,
+                 max_block: float = 0.02,
+                 segment_seconds: float = None,
+                 segment_bytes: int = None) -> None:
         """
         Initialize the VideoRecorder.
         
@@ -80,6 +167,13 @@ class VideoRecorder:
             filename_prefix (str): Prefix for the video file name.
             fps (int): Frames per second for the recording.
             frame_size (tuple): Width and height of the video frames.
+            max_queue_size (int): Maximum number of frames waiting to be encoded.
+            max_block (float): Longest time in seconds write_frame waits for room
+                in a full queue before the frame is dropped.
+            segment_seconds (float, optional): Start a new segment after this much
+                capture time.
+            segment_bytes (int, optional): Start a new segment once the current one
+                is about this large; checked every SIZE_CHECK_INTERVAL frames.
         """
         
         self.temp_file_path = file_path
@@ -95,45 +189,294 @@ class VideoRecorder:
         self.frame_1_time = None
         self.frame_2_time = None
         
+        # Background writer
+        self.frames: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.max_block = max_block
+        self.writer_thread: threading.Thread = None
+        
+        # Statistics
+        self.stats_lock = threading.Lock()
+        self.frames_dropped = 0
+        self.frames_blocked = 0
+        self.blocked_time = 0.0
+        self.max_queue_depth = 0
+        
+        # Segments
+        self.segment_seconds = segment_seconds or None
+        self.segment_bytes = segment_bytes or None
+        self.segment = 0
+        self.segment_paths: list = []
+        self.segment_frame_count = 0
+        self.segment_start = None  # Timestamp of the first frame of the segment
+        self.index_file = None
+        self.index_writer = None
+        self.encode_time = 0.0
+        self.max_encode_time = 0.0
+        self.write_errors = 0
+        
     def start_recording(self) -> None:
         """
-        Start recording video to a file.
+        Start recording video to a file, or to the first segment.
         """ 
         
-        self.file_path = f"{self.temp_file_path}/{self.file_name}.mp4"
-        self.writer = cv2.VideoWriter(
-            self.file_path,
-            cv2.VideoWriter_fourcc(*'XVID'),
-            self.fps,
-            self.frame_size
-        )
+        if self.is_segmented():
+            if not self.open_segment(1):
+                return
+        else:
+            self.file_path = f"{self.temp_file_path}/{self.file_name}.mp4"
+            self.writer = self.create_writer(self.file_path)
+            if self.writer is None:
+                return
         
         self.recording = True
+        self.writer_thread = threading.Thread(target=self.writer_loop,
+                                              name="VideoRecorderWriter",
+                                              daemon=True)
+        self.writer_thread.start()
         print(f"Recording started. Saving to {self.file_path}")
         
-    def write_frame(self, frame: np.ndarray) -> None:
+    def create_writer(self, 
+                      file_path: str) -> cv2.VideoWriter:
+        """
+        Open an XVID video writer, or return None if the file cannot be opened.
+        """
+        try:
+            writer = cv2.VideoWriter(
+                file_path,
+                cv2.VideoWriter_fourcc(*'XVID'),
+                self.fps,
+                self.frame_size
+            )
+        except cv2.error as e:
+            print(f"Could not open the video writer for {file_path}: {e}")
+            return None
+        
+        if not writer.isOpened():
+            print(f"Could not open the video writer for {file_path}")
+            return None
+        return writer
+    
+    def is_segmented(self) -> bool:
+        """
+        Check if the recording is split into segments.
+        """
+        return self.segment_seconds is not None or self.segment_bytes is not None
+    
+    def open_segment(self, 
+                     segment: int) -> bool:
+        """
+        Start the given segment and its index, then close the current one.
+        
+        The new video and index files are opened first, so a full disk or a
+        permission error leaves the current segment untouched.
+        
+        Args:
+            segment (int): Number of the new segment, starting at 1.
+            
+        Returns:
+            bool: False if the new segment could not be opened.
+        """
+        base = f"{self.temp_file_path}/{self.file_name}_{segment:04d}"
+        writer = self.create_writer(f"{base}.mp4")
+        if writer is None:
+            return False
+        try:
+            index_file = open(f"{base}.csv", "w", newline="")
+            index_writer = csv.writer(index_file)
+            index_writer.writerow(INDEX_HEADER)
+        except OSError as e:
+            print(f"Could not open the index file for {base}.mp4: {e}")
+            writer.release()
+            return False
+        
+        self.close_segment()
+        self.writer = writer
+        self.file_path = f"{base}.mp4"
+        self.segment = segment
+        self.segment_paths.append(self.file_path)
+        self.segment_frame_count = 0
+        self.segment_start = None
+        self.index_file = index_file
+        self.index_writer = index_writer
+        return True
+    
+    def close_segment(self) -> None:
+        """
+        Release the writer and close the index file of the current segment.
+        """
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        if self.index_file is not None:
+            self.index_file.close()
+            self.index_file = None
+            self.index_writer = None
+    
+    def segment_full(self, 
+                     timestamp: float) -> bool:
+        """
+        Check if the current segment has reached its time or size limit.
+        
+        A segment always holds at least one frame. The file size is only read
+        every SIZE_CHECK_INTERVAL frames, so the size limit is approximate.
         """
-        Write a single frame to the video file.
+        if self.segment_frame_count == 0:
+            return False
+        
+        if self.segment_seconds is not None and timestamp - self.segment_start >= self.segment_seconds:
+            return True
+        
+        if self.segment_bytes is not None and self.segment_frame_count % SIZE_CHECK_INTERVAL == 0:
+            try:
+                return os.path.getsize(self.file_path) >= self.segment_bytes
+            except OSError:
+                return False
+        return False
+    
+    def write_frame(self, 
+                    frame: np.ndarray,
+                    timestamp: float = None) -> bool:
+        """
+        Queue a single frame to be written to the video file.
+        
+        The frame is encoded later on the writer thread, so it must not be
+        modified after this call; frames fresh from the capture are never
+        modified. If the queue is full, waits up to max_block seconds for
+        room and drops the frame otherwise. Frames are dropped at once if
+        the writer thread has died.
         
         Args:
             frame: The video frame to write.
+            timestamp: Capture timestamp of the frame in seconds, stored in the
+                segment index. Defaults to the frame's position at the nominal fps.
+            
+        Returns:
+            bool: True if the frame was queued, False if it was dropped or
+            the recorder is not recording.
         """
     
-        if self.recording and self.writer.isOpened():
+        if not self.recording:
+            return False
+        if self.writer_thread is not None and not self.writer_thread.is_alive():
+            # Nobody drains the queue: waiting for room would only stall the caller
+            with self.stats_lock:
+                self.frames_dropped += 1
+            return False
+        
+        item = (frame, timestamp)
+        try:
+            self.frames.put_nowait(item)
+        except queue.Full:
+            # Backpressure: give the writer a moment before dropping the frame
+            self.frames_blocked += 1
+            start = time.perf_counter()
+            try:
+                self.frames.put(item, timeout=self.max_block)
+            except queue.Full:
+                with self.stats_lock:
+                    self.frames_dropped += 1
+                return False
+            finally:
+                self.blocked_time += time.perf_counter() - start
+        
+        self.max_queue_depth = max(self.max_queue_depth, self.frames.qsize())
+        return True
+    
+    def writer_loop(self) -> None:
+        """
+        Body of the writer thread: encode and write queued frames until the
+        stop marker arrives, starting a new segment whenever one is full.
+        
+        A frame that fails to write is logged and counted as dropped, so an
+        error never ends the thread and leaves the queue undrained.
+        """
+        while True:
+            item = self.frames.get()
+            if item is _STOP:
+                return
+            
+            try:
+                self.write_item(*item)
+            except Exception as e:
+                with self.stats_lock:
+                    self.frames_dropped += 1
+                self.write_errors += 1
+                if self.write_errors == 1:
+                    print(f"Video frame could not be recorded: {e}")
+    
+    def write_item(self,
+                   frame: np.ndarray,
+                   timestamp: float) -> None:
+        """
+        Encode one queued frame and add it to the index of its segment.
+        """
+        if timestamp is None:
+            with self.stats_lock:
+                timestamp = (self.frame_count + self.frames_dropped) / self.fps
+        
+        if self.is_segmented() and self.segment_full(timestamp):
+            if not self.open_segment(self.segment + 1):
+                # Nowhere to write: finish the current segment and count the
+                # rest as dropped until stopped
+                print(f"Recording stopped: segment {self.segment + 1} could not be opened")
+                self.recording = False
+                self.close_segment()
+                with self.stats_lock:
+                    self.frames_dropped += 1
+                return
+        if self.writer is None:
+            with self.stats_lock:
+                self.frames_dropped += 1
+            return
+        
+        start = time.perf_counter()
+        try:
             self.writer.write(frame)
-            print("Frame written to video file")
-        else:
-            print("Writer is not opened or recording is stopped")
+        except cv2.error as e:
+            self.write_errors += 1
+            if self.write_errors == 1:
+                print(f"Video frame could not be written: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        self.encode_time += elapsed
+        self.max_encode_time = max(self.max_encode_time, elapsed)
+        self.frame_count += 1
+        
+        if self.index_writer is not None:
+            self.segment_frame_count += 1
+            if self.segment_start is None:
+                self.segment_start = timestamp
+            self.index_writer.writerow([self.frame_count, self.segment_frame_count, repr(float(timestamp))])
+            if self.frames.empty():
+                self.index_file.flush()  # Caught up: make the index durable
 
     def stop_recording(self) -> None:
         """
-        Stop recording and release resources.
+        Stop recording: write every queued frame, stop the writer thread and
+        release resources.
+        
+        Waits at most about STOP_TIMEOUT seconds for the writer thread. A
+        writer that is still busy after that keeps the file open, since
+        releasing it under the encoder would corrupt the recording.
         """
-        if self.writer:
-            self.writer.release()
-            self.writer = None
         self.recording = False
-        print(f"Recording stopped. Video saved at {self.file_path}")
+        if self.writer_thread is not None:
+            if self.writer_thread.is_alive():
+                try:
+                    self.frames.put(_STOP, timeout=STOP_TIMEOUT)  # Queued after every accepted frame
+                except queue.Full:
+                    pass
+                self.writer_thread.join(timeout=STOP_TIMEOUT)
+            if self.writer_thread.is_alive():
+                print(f"Video writer did not stop within {STOP_TIMEOUT:.0f} s; "
+                      f"{self.frames.qsize()} frames not written")
+                return
+            self.writer_thread = None
+        
+        if self.writer or self.segment_paths:
+            self.close_segment()
+            saved = f"{len(self.segment_paths)} segments in {self.temp_file_path}" if self.is_segmented() else self.file_path
+            print(f"Recording stopped. Video saved at {saved}: {self.get_statistics()}")
 
     def is_recording(self) -> bool:
         """
@@ -142,6 +485,145 @@ class VideoRecorder:
         Returns:
             bool: True if recording, False otherwise.
         """
-        return self.recording        
+        return self.recording
+    
+    def get_statistics(self) -> dict:
+        """
+        Return the state of the recording.
+        
+        Returns:
+            dict: `frames_written`, `frames_dropped`, `frames_blocked`,
+            `queue_depth`, `max_queue_depth`, `blocked_time` (seconds the
+            caller waited in total), `mean_encode_time` and `max_encode_time`
+            (seconds per frame) and `write_errors`.
+        """
+        with self.stats_lock:
+            frames_dropped = self.frames_dropped
+        return {
+            "frames_written": self.frame_count,
+            "frames_dropped": frames_dropped,
+            "frames_blocked": self.frames_blocked,
+            "queue_depth": self.frames.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "blocked_time": self.blocked_time,
+            "mean_encode_time": self.encode_time / self.frame_count if self.frame_count else 0.0,
+            "max_encode_time": self.max_encode_time,
+            "write_errors": self.write_errors,
+            "segment": self.segment,
+        }
+
+
+class RecordingIndex:
+    """
+    Recording Index Class for Finding Frames in a Segmented Recording.
+
+    Loads the index files of every segment and finds frames by binary search
+    over the frame numbers or the (non-decreasing) capture timestamps.
+
+    Attributes:
+    ----------
+    frames : list[int]
+        Frame numbers of the whole recording, in order.
+    timestamps : list[float]
+        Capture timestamp of every frame.
+    segments : list[int]
+        Segment number of every frame.
+    segment_frames : list[int]
+        Frame number within its segment of every frame, starting at 1.
+    video_paths : dict
+        Video file of every segment number.
+
+    Methods:
+    -------
+    load(directory: str, file_name: str) -> RecordingIndex
+        Loads the index files of a segmented recording.
+    find_frame(frame: int) -> dict or None
+        Returns the location of a frame number of the recording.
+    find_timestamp(timestamp: float) -> dict or None
+        Returns the location of the frame captured closest to a timestamp.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create an empty index; use `load` to read a recording's index files.
+        """
+        self.frames: list = []
+        self.timestamps: list = []
+        self.segments: list = []
+        self.segment_frames: list = []
+        self.video_paths: dict = {}
+
+    @classmethod
+    def load(cls,
+             directory: str,
+             file_name: str) -> "RecordingIndex":
+        """
+        Load the index files `<file_name>_NNNN.csv` of a segmented recording.
+
+        A truncated last line, left by an unclean shutdown, is skipped.
+        """
+        index = cls()
+        pattern = os.path.join(glob.escape(directory), f"{glob.escape(file_name)}_[0-9][0-9][0-9][0-9].csv")
+        for index_path in sorted(glob.glob(pattern)):
+            segment = int(index_path[-8:-4])
+            index.video_paths[segment] = index_path[:-4] + ".mp4"
+            with open(index_path, newline="") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        frame, segment_frame = int(row["frame"]), int(row["segment_frame"])
+                        timestamp = float(row["timestamp"])
+                    except (TypeError, ValueError):
+                        continue
+                    index.frames.append(frame)
+                    index.timestamps.append(timestamp)
+                    index.segments.append(segment)
+                    index.segment_frames.append(segment_frame)
+        return index
+
+    def entry(self,
+              position: int) -> dict:
+        """
+        Return the location of the frame at a position in the index.
+        """
+        segment = self.segments[position]
+        return {
+            "frame": self.frames[position],
+            "timestamp": self.timestamps[position],
+            "segment": segment,
+            "segment_frame": self.segment_frames[position],
+            "video_path": self.video_paths[segment],
+        }
+
+    def find_frame(self,
+                   frame: int) -> dict:
+        """
+        Return the location of a frame number of the recording.
+
+        Returns:
+            dict or None: `frame`, `timestamp`, `segment`, `segment_frame` and
+            `video_path`, or None if the frame is not in the recording.
+        """
+        position = bisect.bisect_left(self.frames, frame)
+        if position == len(self.frames) or self.frames[position] != frame:
+            return None
+        return self.entry(position)
+
+    def find_timestamp(self,
+                       timestamp: float) -> dict:
+        """
+        Return the location of the frame captured closest to a timestamp,
+        such as the timestamp of an analysed frame.
+
+        Returns:
+            dict or None: As for `find_frame`, or None for an empty index.
+        """
+        if not self.timestamps:
+            return None
+
+        position = bisect.bisect_left(self.timestamps, timestamp)
+        if position == len(self.timestamps) or (
+                position > 0 and timestamp - self.timestamps[position - 1] <= self.timestamps[position] - timestamp):
+            position -= 1
+        return self.entry(position)
         
         
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Tests for the autosaver module."""
+
+import time
+
+from froth_monitor.autosaver import AutoSaver, load_journal
+from froth_monitor.frame_clock import FrameClock
+
+
+def test_journal_round_trip(tmp_path):
+    """Check that the journal rebuilds the autosave data structure."""
+    clock = FrameClock()
+    saver = AutoSaver(str(tmp_path), "session")
+    saver.set_wall_anchor(clock.wall_anchor)
+    saver.update_arrow_direction(1.5)
+    saver.add_frame_data(0, 1, 0.25, 0.0)
+    saver.add_frame_data(1, 1, -0.5, 0.0)
+    saver.add_frame_data(0, 2, 0.75, 0.033)
+    saver.close()
+
+    data = saver.load_from_file()
+    assert data["arrow_direction"] == 1.5
+    assert [m["Frame Index"] for m in data["roi_data"][0]["Movement Data"]] == [1, 2]
+    assert data["roi_data"][1]["ROI Index"] == 2
+    assert data["roi_data"][0]["Movement Data"][1]["Timestamp"] == clock.format(0.033)
+
+
+def test_journal_skips_truncated_line(tmp_path):
+    """Check that a partially written last record does not break loading."""
+    saver = AutoSaver(str(tmp_path), "session")
+    saver.add_frame_data(0, 1, 0.25, 0.0)
+    saver.close()
+
+    with open(saver.file_path, "a") as f:
+        f.write('{"type": "frame", "roi_in')
+
+    data = AutoSaver(str(tmp_path), "session").load_from_file()
+    assert len(data["roi_data"][0]["Movement Data"]) == 1
+
+
+def test_writer_batches_and_flushes(tmp_path):
+    """Check that queued records reach the journal on flush and stats are reported."""
+    saver = AutoSaver(str(tmp_path), "session", flush_interval=60.0, batch_size=1000)
+    for frame_index in range(1, 101):
+        saver.add_frame_data(0, frame_index, 0.1, frame_index / 30)
+
+    assert saver.save_to_file(timeout=5.0)
+    stats = saver.get_statistics()
+    assert stats["records_written"] == 100
+    assert stats["queue_depth"] == 0
+    assert len(load_journal(saver.file_path)["roi_data"][0]["Movement Data"]) == 100
+    saver.close()
+
+
+def test_full_queue_keeps_records_in_backlog(tmp_path):
+    """Check that records are never dropped when the writer queue is full."""
+    saver = AutoSaver(str(tmp_path), "session", max_queue_size=2)
+    for frame_index in range(1, 51):
+        saver.add_frame_data(0, frame_index, 0.1, frame_index / 30)
+    saver.close()
+
+    frames = [m["Frame Index"] for m in load_journal(saver.file_path)["roi_data"][0]["Movement Data"]]
+    assert frames == list(range(1, 51))
+
+
+def test_bad_record_is_dropped_without_stopping_the_writer(tmp_path):
+    """Check that an unserialisable record is counted and later records still reach the journal."""
+    saver = AutoSaver(str(tmp_path), "session")
+    saver.add_frame_data(0, 1, 0.25, 0.0)
+    saver.append_record({"type": "frame", "bad": object()})
+    assert saver.save_to_file(timeout=5.0)
+    saver.add_frame_data(0, 2, 0.5, 0.033)
+    stats = saver.close()
+
+    assert stats["records_dropped"] == 1 and stats["records_written"] == 2
+    frames = [m["Frame Index"] for m in load_journal(saver.file_path)["roi_data"][0]["Movement Data"]]
+    assert frames == [1, 2]
+
+
+def test_failed_write_is_retried_after_a_delay(tmp_path):
+    """Check that a failing disk is not retried immediately and the batch is written once it recovers."""
+    directory = tmp_path / "missing"
+    saver = AutoSaver(str(directory), "session", flush_interval=0.01)
+    saver.add_frame_data(0, 1, 0.25, 0.0)
+    time.sleep(0.3)
+    assert saver.get_statistics()["write_errors"] == 1
+
+    directory.mkdir()
+    stats = saver.close()
+    assert stats["records_written"] == 1 and stats["retry_delay"] == 0.0
+
+
+def test_dead_disk_bounds_memory_and_counts_every_lost_record(tmp_path):
+    """Check that a journal that can never be written caps the backlog and batch and reports every record."""
+    saver = AutoSaver(str(tmp_path / "missing"), "session", flush_interval=0.01,
+                      max_queue_size=2, max_backlog_size=5)
+    for frame_index in range(1, 101):
+        saver.add_frame_data(0, frame_index, 0.1, frame_index / 30)
+        assert len(saver.backlog) <= 5
+    time.sleep(0.1)
+    # At most a full backlog, queue and failed batch are still held
+    assert saver.get_statistics()["records_dropped"] >= 100 - 5 - 2 - 5
+    stats = saver.close()
+
+    assert stats["records_written"] == 0 and stats["write_errors"] >= 1
+    assert stats["records_dropped"] == 100 and stats["queue_depth"] == 0
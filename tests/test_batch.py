@@ -0,0 +1,54 @@
+"""Tests for the batch analysis module."""
+
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from froth_monitor.batch import BatchAnalyzer
+
+ROIS = [(10, 10, 80, 60)]
+
+
+@pytest.fixture
+def videos(tmp_path):
+    """Write a short MJPG clip and a copy of it under the same stem with another extension."""
+    rng = np.random.default_rng(5)
+    texture = cv2.GaussianBlur((rng.random((300, 300, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    directory = tmp_path / "videos"
+    directory.mkdir()
+    path = str(directory / "run01.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for k in range(20):
+        writer.write(np.ascontiguousarray(texture[2 * k:2 * k + 120, k:k + 160]))
+    writer.release()
+    shutil.copy(path, directory / "run01.mkv")
+    shutil.copy(path, directory / "run02.avi")
+    return str(directory)
+
+
+def test_videos_sharing_a_stem_get_separate_results(videos, tmp_path):
+    """Check that run01.avi and run01.mkv do not write the same results file."""
+    analyzer = BatchAnalyzer(ROIS, 90.0, str(tmp_path / "results"), workers=2)
+    summaries = analyzer.run(videos)
+
+    outputs = [os.path.basename(summary["output"]) for summary in summaries]
+    assert outputs == ["run01.avi_results.xlsx", "run01.mkv_results.xlsx", "run02_results.xlsx"]
+    assert all(summary["status"] == "done" for summary in summaries)
+    assert all(os.path.exists(summary["output"]) for summary in summaries)
+
+
+def test_existing_results_are_skipped_and_summarised(videos, tmp_path):
+    """Check that a resumed batch keeps existing results and summarises them from the file."""
+    analyzer = BatchAnalyzer(ROIS, 90.0, str(tmp_path / "results"), workers=1)
+    first = analyzer.run(videos)
+    modified = {summary["output"]: os.path.getmtime(summary["output"]) for summary in first}
+
+    second = analyzer.run(videos)
+    assert all(summary["status"] == "skipped (results exist)" for summary in second)
+    assert {summary["output"]: os.path.getmtime(summary["output"]) for summary in second} == modified
+    for before, after in zip(first, second):
+        assert after["frames"] == before["frames"] == 19
+        assert np.allclose(after["mean_velocities"], before["mean_velocities"])
@@ -0,0 +1,86 @@
+"""Tests for the frame capture module."""
+
+import threading
+import time
+
+import numpy as np
+
+from froth_monitor.capture import FrameCapture, DROP_OLDEST, BLOCK
+
+
+class FakeCapture:
+    """A video source of numbered frames that can block inside read()."""
+
+    def __init__(self, frames: int, gate: threading.Event = None) -> None:
+        self.frames = frames
+        self.gate = gate
+        self.index = 0
+        self.reading = threading.Event()
+        self.released = False
+        self.released_while_reading = False
+
+    def read(self):
+        self.reading.set()
+        try:
+            if self.gate is not None:
+                self.gate.wait()
+            if self.index >= self.frames:
+                return False, None
+            self.index += 1
+            return True, np.full((4, 4, 3), self.index, dtype=np.uint8)
+        finally:
+            self.reading.clear()
+
+    def release(self) -> None:
+        self.released_while_reading = self.reading.is_set()
+        self.released = True
+
+
+def wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_drop_oldest_keeps_the_newest_frames():
+    """Check that an unread DROP_OLDEST queue holds the newest frames and counts the dropped ones."""
+    capture = FrameCapture(FakeCapture(20), drop_policy=DROP_OLDEST, max_queue_size=4)
+    capture.start()
+    wait_until(lambda: capture.source_exhausted)
+
+    indices = [capture.read()[2] for _ in range(4)]
+    assert indices == [17, 18, 19, 20]
+    assert capture.get_statistics()["frames_dropped"] == 16
+    assert capture.is_finished()
+    capture.stop()
+
+
+def test_block_delivers_every_frame_in_order():
+    """Check that BLOCK waits for the consumer instead of dropping frames."""
+    capture = FrameCapture(FakeCapture(20), drop_policy=BLOCK, max_queue_size=2)
+    capture.start()
+    indices = []
+    while not capture.is_finished():
+        item = capture.read(timeout=0.5)
+        if item is not None:
+            indices.append(item[2])
+
+    assert indices == list(range(1, 21))
+    assert capture.get_statistics()["frames_dropped"] == 0
+    capture.stop()
+
+
+def test_source_is_not_released_during_a_blocked_read():
+    """Check that stopping a worker stuck in read() leaves the release to the worker."""
+    gate = threading.Event()
+    source = FakeCapture(5, gate)
+    capture = FrameCapture(source, drop_policy=DROP_OLDEST)
+    capture.start()
+    wait_until(source.reading.is_set)
+
+    assert not capture.stop(release=True, timeout=0.1)
+    assert not source.released
+
+    gate.set()
+    wait_until(lambda: source.released)
+    assert source.released and not source.released_while_reading
@@ -0,0 +1,47 @@
+"""Tests for the chunk-parallel analysis module."""
+
+import cv2
+import numpy as np
+import pytest
+
+from froth_monitor.chunked import ChunkedAnalyzer
+from froth_monitor.headless import HeadlessAnalyzer
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """Write a short MJPG clip of a drifting texture."""
+    rng = np.random.default_rng(7)
+    texture = cv2.GaussianBlur((rng.random((300, 300, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for k in range(40):
+        writer.write(np.ascontiguousarray(texture[2 * k:2 * k + 120, k:k + 160]))
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("stride", [1, 3])
+def test_parallel_segments_match_sequential_analysis(clip, stride):
+    """Check that the stitched segments are identical to the sequential run, also with a stride."""
+    analyzer = ChunkedAnalyzer([(10, 10, 80, 60), (60, 40, 90, 70)], 90.0, segments=3,
+                               analysis_options={"stride": stride})
+    analyzer.run(clip, verify=True)
+
+    assert analyzer.verify_against_sequential(clip)
+    assert analyzer.rois[0].analysis_module.get_frame_count() == 39
+    assert all((start - 1) % stride == 0 for start, _ in analyzer.segment_bounds(39)[1:])
+    assert analyzer.speedup is not None and analyzer.concurrency > 0
+
+
+@pytest.mark.parametrize("options", [{"stride": 3}, {"change_threshold": 1000.0}])
+def test_skip_rate_matches_sequential_analysis(clip, options):
+    """Check that only frame-change gate skips count towards the skip rate, as in a sequential run."""
+    rects = [(10, 10, 80, 60)]
+    analyzer = ChunkedAnalyzer(rects, 90.0, segments=3, analysis_options=options)
+    analyzer.run(clip)
+    sequential = HeadlessAnalyzer(rects, 90.0, options)
+    sequential.run(clip)
+
+    assert analyzer.rois[0].analysis_module.frames_skipped == sequential.rois[0].analysis_module.frames_skipped
+    assert analyzer.rois[0].analysis_module.get_skip_rate() == sequential.rois[0].analysis_module.get_skip_rate()
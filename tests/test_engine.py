@@ -0,0 +1,53 @@
+"""Tests for the analysis engine module."""
+
+import os
+import pickle
+import socket
+import stat
+import time
+
+import numpy as np
+import pytest
+
+from froth_monitor.engine import AnalysisEngine, EngineClient, decode_message, encode_message
+
+
+def test_messages_are_json_and_pickles_are_rejected():
+    """Check that messages round-trip as JSON and that pickled data is refused."""
+    message = {"type": "frame", "velocities": [np.float32(1.5), None], "rects": [(1, 2, 3, 4)]}
+    assert decode_message(encode_message(message)) == {"type": "frame", "velocities": [1.5, None],
+                                                       "rects": [[1, 2, 3, 4]]}
+
+    with pytest.raises(ValueError):
+        decode_message(pickle.dumps({"command": "stop"}))
+    with pytest.raises(TypeError):
+        encode_message({"type": "frame", "data": object()})
+
+
+def test_clients_connect_with_the_per_run_key_file(tmp_path):
+    """Check that the random key is written user-only and lets only clients holding it connect."""
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        port = probe.getsockname()[1]
+    key_file = str(tmp_path / "engine.key")
+    engine = AnalysisEngine("unused.avi", [(0, 0, 10, 10)], 90.0, address=("localhost", port),
+                            key_file=key_file, autosave_path=None)
+    engine.start_listener()
+    try:
+        assert stat.S_IMODE(os.stat(key_file).st_mode) == 0o600
+        assert not EngineClient(("localhost", port), authkey=b"guessed").connect()
+
+        client = EngineClient(("localhost", port), key_file=key_file)
+        assert client.connect()
+        messages = []
+        for _ in range(50):
+            messages += client.receive()
+            if messages:
+                break
+            time.sleep(0.02)
+        assert messages[0]["type"] == "hello" and messages[0]["rects"] == [[0, 0, 10, 10]]
+        client.close()
+    finally:
+        engine.stop_event.set()
+        engine.close_listener()
+    assert not os.path.exists(key_file)
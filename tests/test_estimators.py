@@ -0,0 +1,93 @@
+"""Tests for the motion estimator module."""
+
+import cv2
+import numpy as np
+import pytest
+
+from froth_monitor.estimators import ESTIMATORS, create_estimator
+from froth_monitor.image_analysis import VideoAnalysis
+
+
+def shifted_pair(dx: int, dy: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return two crops of a smooth texture where the content moved by (dx, dy)."""
+    rng = np.random.default_rng(2)
+    texture = cv2.GaussianBlur((rng.random((300, 400)) * 255).astype(np.uint8), (9, 9), 3)
+    previous_frame = texture[50:170, 50:210]
+    current_frame = texture[50 - dy:170 - dy, 50 - dx:210 - dx]
+    return np.ascontiguousarray(previous_frame), np.ascontiguousarray(current_frame)
+
+
+@pytest.mark.parametrize("name", list(ESTIMATORS))
+def test_estimators_share_displacement_contract(name):
+    """Check that every estimator reports the displacement of the content."""
+    previous_frame, current_frame = shifted_pair(2, 1)
+    flow_x, flow_y = create_estimator(name).estimate(previous_frame, current_frame)
+
+    assert flow_x == pytest.approx(2.0, abs=0.5)
+    assert flow_y == pytest.approx(1.0, abs=0.5)
+
+
+def test_video_analysis_uses_selected_estimator():
+    """Check that VideoAnalysis accepts an estimator name and rejects unknown ones."""
+    analysis = VideoAnalysis(0.0, 1.0, estimator="template")
+    assert analysis.estimator.name == "template"
+
+    with pytest.raises(ValueError):
+        VideoAnalysis(0.0, 1.0, estimator="unknown")
+
+
+def test_phase_correlation_subpixel_and_spectrum_reuse():
+    """Check the sub-pixel shift, the confidence and the reuse of the previous spectrum."""
+    rng = np.random.default_rng(3)
+    texture = cv2.GaussianBlur((rng.random((300, 400)) * 255).astype(np.uint8), (9, 9), 3)
+    shift = np.float32([[1, 0, 1.5], [0, 1, -0.75]])
+    frames = [texture[100:180, 100:200].copy(),
+              cv2.warpAffine(texture, shift, (400, 300))[100:180, 100:200].copy()]
+
+    estimator = create_estimator("phase")
+    flow_x, flow_y = estimator.estimate(frames[0], frames[1])
+    assert flow_x == pytest.approx(1.5, abs=0.1)
+    assert flow_y == pytest.approx(-0.75, abs=0.1)
+    assert estimator.confidence > 0.5
+    assert estimator.previous_source is frames[1]
+
+    noise = (rng.random((80, 100)) * 255).astype(np.uint8)
+    estimator.estimate(frames[1], noise)
+    assert estimator.confidence < 0.3
+
+
+def test_lucas_kanade_reuses_and_reseeds_features():
+    """Check that features are carried over and topped up only when too few remain."""
+    previous_frame, current_frame = shifted_pair(2, 1)
+    estimator = create_estimator("lucas-kanade")
+    estimator.estimate(previous_frame, current_frame)
+    carried = len(estimator.points)
+
+    _, next_frame = shifted_pair(4, 2)
+    estimator.estimate(current_frame, next_frame)
+    assert estimator.previous_source is next_frame
+    assert estimator.confidence > 0.9
+    assert len(estimator.points) <= carried
+
+    estimator.max_features = 2 * len(estimator.points)
+    estimator.min_features = estimator.max_features
+    tracked = len(estimator.points)
+    estimator.estimate(next_frame, next_frame)
+    assert len(estimator.points) > tracked
+
+
+def test_farneback_keeps_flow_buffer_and_warm_starts():
+    """Check that the flow buffer is reused and warm starts match a cold start."""
+    previous_frame, current_frame = shifted_pair(2, 1)
+    _, next_frame = shifted_pair(4, 2)
+    cold = create_estimator("farneback")
+    warm = create_estimator("farneback-warm")
+
+    cold.estimate(previous_frame, current_frame)
+    buffer = cold.flow
+    cold_flow = cold.estimate(current_frame, next_frame)
+    assert cold.flow is buffer
+
+    warm.estimate(previous_frame, current_frame)
+    warm_flow = warm.estimate(current_frame, next_frame)
+    assert warm_flow == pytest.approx(cold_flow, abs=0.1)
@@ -0,0 +1,27 @@
+"""Tests for the frame rate estimator module."""
+
+import numpy as np
+
+from froth_monitor.fps_estimator import FPSEstimator
+
+
+def test_estimate_follows_timestamps_with_jitter():
+    """Check the rate and jitter of noisy 25 fps timestamps."""
+    rng = np.random.default_rng(0)
+    estimator = FPSEstimator()
+    for timestamp in np.arange(200) / 25 + rng.normal(0, 0.002, 200):
+        estimator.update(float(timestamp))
+
+    assert estimator.is_ready()
+    assert abs(estimator.fps() - 25) < 0.5
+    assert 1.0 < estimator.get_statistics()["jitter_ms"] < 5.0
+
+
+def test_skipped_frames_do_not_lower_the_rate():
+    """Check that intervals spanning skipped frames are divided by the frame count."""
+    estimator = FPSEstimator()
+    for i, timestamp in enumerate(np.arange(0, 60, 3) / 30):
+        estimator.update(float(timestamp), frames=1 if i == 0 else 3)
+
+    assert abs(estimator.fps() - 30) < 1e-6
+    assert FPSEstimator().fps() is None
@@ -0,0 +1,44 @@
+"""Tests for the shared-memory frame ring."""
+
+import numpy as np
+
+from froth_monitor.frame_bus import SharedFrameRing
+
+
+def make_frame(value: int) -> np.ndarray:
+    return np.full((6, 8, 3), value, dtype=np.uint8)
+
+
+def test_reader_sees_latest_frame_through_shared_memory():
+    """A reader attached by name gets the most recent frame and its metadata."""
+    ring = SharedFrameRing.create((6, 8, 3), slots=3)
+    reader = SharedFrameRing.attach(**ring.describe())
+    try:
+        assert reader.read_latest() is None
+
+        for index in range(1, 6):  # Wraps around the three slots
+            ring.write(make_frame(index), index, index / 10)
+
+        frame, frame_index, timestamp = reader.read_latest()
+        assert frame_index == 5
+        assert timestamp == 0.5
+        assert np.all(frame == 5)
+        assert reader.frames_written() == 5
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_slot_being_written_is_not_returned():
+    """A frame is only readable once its slot write has completed."""
+    ring = SharedFrameRing.create((6, 8, 3), slots=2)
+    try:
+        ring.write(make_frame(1), 1, 0.0)
+        with ring.writing(2, 0.1) as slot:
+            slot[:] = 2
+            # The newest complete frame is still frame 1 until the write finishes
+            frame, frame_index, _ = ring.read_latest()
+            assert frame_index == 1 and np.all(frame == 1)
+        assert ring.read_latest()[1] == 2
+    finally:
+        ring.close()
@@ -0,0 +1,67 @@
+"""Tests for the headless analysis module and its command line."""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+
+from froth_monitor import cli
+from froth_monitor.headless import HeadlessAnalyzer
+
+ROIS = [(10, 10, 80, 60), (60, 40, 90, 70)]
+ROI_ARGUMENTS = ["--roi", "10", "10", "80", "60", "--roi", "60", "40", "90", "70"]
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """Write a short MJPG clip of a drifting texture."""
+    rng = np.random.default_rng(3)
+    texture = cv2.GaussianBlur((rng.random((300, 300, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for k in range(30):
+        writer.write(np.ascontiguousarray(texture[2 * k:2 * k + 120, k:k + 160]))
+    writer.release()
+    return path
+
+
+def test_analyze_command_exports_the_headless_velocities(clip, tmp_path):
+    """Check that `analyze` writes one row per frame pair and ROI with the analysed velocities."""
+    output_path = str(tmp_path / "results.xlsx")
+    assert cli.main(["analyze", clip, *ROI_ARGUMENTS, "--angle", "90", "--output", output_path]) == 0
+
+    analyzer = HeadlessAnalyzer(ROIS, 90.0)
+    analyzer.run(clip)
+
+    workbook = load_workbook(output_path)
+    assert workbook.sheetnames == ["Arrow Direction", "ROI 1", "ROI 2"]
+    assert workbook["Arrow Direction"]["A2"].value == 90
+    for roi, sheet in zip(analyzer.rois, workbook.worksheets[1:]):
+        rows = list(sheet.iter_rows(min_row=2, values_only=True))
+        assert [row[0] for row in rows] == list(range(1, 30))
+        velocities = [row[1] for row in rows]
+        assert np.allclose(velocities, roi.analysis_module.get_velocities())
+        assert any(abs(velocity) > 0.5 for velocity in velocities)
+
+
+def test_analyze_command_limits_frames_and_defaults_the_output(clip):
+    """Check that --max-frames stops early and the results land next to the video by default."""
+    assert cli.main(["analyze", clip, *ROI_ARGUMENTS, "--max-frames", "10"]) == 0
+
+    output_path = cli.default_output_path(clip)
+    assert os.path.exists(output_path)
+    sheet = load_workbook(output_path)["ROI 1"]
+    assert sheet.max_row == 1 + 9
+
+
+def test_batch_command_analyses_every_video(clip, tmp_path):
+    """Check that `batch` writes a results file per video and the summary."""
+    output_directory = str(tmp_path / "batch")
+    assert cli.main(["batch", str(tmp_path), *ROI_ARGUMENTS, "--output-dir", output_directory,
+                     "--workers", "1"]) == 0
+
+    assert os.path.exists(os.path.join(output_directory, "batch_summary.xlsx"))
+    results = [name for name in os.listdir(output_directory) if name != "batch_summary.xlsx"]
+    assert len(results) == 1 and results[0].startswith("clip")
@@ -0,0 +1,81 @@
+"""Tests for the video analysis module."""
+
+import cv2
+import numpy as np
+
+from froth_monitor.image_analysis import VideoAnalysis
+
+
+def make_texture(seed: int = 1) -> np.ndarray:
+    """Return a smooth random grayscale texture."""
+    rng = np.random.default_rng(seed)
+    noise = (rng.random((400, 500)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(noise, (9, 9), 3)
+
+
+def test_downscale_reports_full_resolution_pixels():
+    """Check that downscaled flow is rescaled back to full-resolution pixels."""
+    texture = make_texture()
+    full = VideoAnalysis(0.0, 1.0)
+    half = VideoAnalysis(0.0, 1.0, downscale=2)
+
+    for analysis in (full, half):
+        analysis.analyze(texture[100:300, 100:400], 0.0)
+        analysis.analyze(texture[104:304, 100:400], 1.0)
+
+    assert half.frame_buffers[0].shape == (100, 150)
+    assert half.flow_scale == (2.0, 2.0)
+    assert abs(half.get_velocities()[0] - full.get_velocities()[0]) < 0.5
+
+
+def test_pixel_budget_limits_analysed_pixels():
+    """Check that the pixel budget shrinks large ROIs."""
+    analysis = VideoAnalysis(0.0, 1.0, pixel_budget=10000)
+    analysis.analyze(make_texture()[:200, :300], 0.0)
+
+    height, width = analysis.frame_buffers[0].shape
+    assert height * width <= 10000 * 1.05
+    assert analysis.previous_frame is analysis.frame_buffers[0]
+
+
+def test_unchanged_frames_are_skipped_and_flagged():
+    """Check that duplicate frames skip the flow and keep the reference frame."""
+    texture = make_texture()
+    analysis = VideoAnalysis(0.0, 1.0, change_threshold=0.0)
+    frames = [texture[100:300, 100:400], texture[104:304, 100:400], texture[104:304, 100:400],
+              texture[108:308, 100:400]]
+    for timestamp, frame in enumerate(frames):
+        analysis.analyze(frame, float(timestamp))
+
+    assert analysis.velocity_history.skipped.tolist() == [False, True, False]
+    assert analysis.get_velocities()[1] == 0.0
+    assert abs(analysis.get_velocities()[2] - analysis.get_velocities()[0]) < 0.5
+    assert analysis.get_skip_rate() == 1 / 3
+
+
+def test_hold_carries_the_previous_flow_forward():
+    """Check that the hold mode repeats the last measured flow for a skipped frame."""
+    texture = make_texture()
+    analysis = VideoAnalysis(0.0, 1.0, change_threshold=0.0, static_velocity="hold")
+    for timestamp, frame in enumerate([texture[100:300, 100:400], texture[104:304, 100:400],
+                                       texture[104:304, 100:400]]):
+        analysis.analyze(frame, float(timestamp))
+
+    velocities = analysis.get_velocities()
+    assert velocities[1] == velocities[0]
+    assert analysis.velocity_history.skipped.tolist() == [False, True]
+
+
+def test_stride_spreads_the_displacement_over_the_interval():
+    """Check that a stride records every frame and backfills the measured velocity."""
+    texture = make_texture()
+    analysis = VideoAnalysis(0.0, 1.0, stride=3)
+    for timestamp, shift in enumerate(range(0, 28, 2)):
+        analysis.analyze(texture[100 + shift:300 + shift, 100:400], timestamp / 30)
+
+    velocities = analysis.get_velocities()
+    assert len(velocities) == 13
+    assert analysis.velocity_history.skipped.tolist()[:6] == [True, True, False, True, True, False]
+    # Frames 1-3 were backfilled with a third of the 6-pixel (upward) displacement
+    assert velocities[0] == velocities[1] == velocities[2]
+    assert abs(velocities[2] + 2.0) < 0.5
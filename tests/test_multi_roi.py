@@ -0,0 +1,96 @@
+"""Tests for the multi-ROI analysis module."""
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QRect
+
+from froth_monitor.multi_roi import MultiROIAnalysis, find_clusters
+from froth_monitor.roi import ROI
+
+
+def test_find_clusters_merges_only_compact_groups():
+    """Check that overlapping ROIs merge but diagonal neighbours do not."""
+    rects = [(0, 0, 100, 80), (90, 0, 100, 80), (400, 400, 50, 50), (450, 450, 50, 50)]
+    assert find_clusters(rects) == [[0, 1], [2], [3]]
+
+
+def test_cluster_means_match_shared_flow_field():
+    """Check that every clustered ROI gets the mean of its part of the shared field."""
+    rng = np.random.default_rng(4)
+    texture = cv2.GaussianBlur((rng.random((300, 400, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    frames = [texture[20:260, 20:340], texture[22:262, 21:341]]
+    rois = [ROI(QRect(10, 10, 120, 90), 0.0, 1.0), ROI(QRect(100, 20, 120, 90), 0.0, 1.0),
+            ROI(QRect(250, 150, 40, 40), 0.0, 1.0)]
+
+    analysis = MultiROIAnalysis(cluster=True)
+    assert analysis.analyze_frame(rois, frames[0], 0.0) == [(None, None)] * 3
+    flows = analysis.analyze_frame(rois, frames[1], 1.0)
+
+    assert len(analysis.clusters) == 1 and analysis.singles == [2]
+    cluster = analysis.clusters[0]
+    field = cluster.estimator.flow
+    x0, y0 = cluster.rect[:2]
+    for i in cluster.indices:
+        x, y, w, h = rois[i].rect.x() - x0, rois[i].rect.y() - y0, rois[i].rect.width(), rois[i].rect.height()
+        expected = field[y:y+h, x:x+w].reshape(-1, 2).mean(axis=0)
+        np.testing.assert_allclose(flows[i], expected, atol=1e-4)
+        assert rois[i].analysis_module.get_frame_count() == 1
+
+
+def test_thread_pool_matches_sequential_analysis():
+    """Check that analysing ROIs on a thread pool gives the sequential results."""
+    rng = np.random.default_rng(5)
+    texture = cv2.GaussianBlur((rng.random((300, 400, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    frames = [texture[k:k + 240, 2 * k:2 * k + 320] for k in range(4)]
+    rects = [QRect(10, 10, 80, 60), QRect(150, 20, 80, 60), QRect(40, 150, 100, 70)]
+
+    results = []
+    for workers in (1, 3):
+        rois = [ROI(rect, 0.0, 1.0) for rect in rects]
+        analysis = MultiROIAnalysis(workers=workers, thread_budget=6)
+        for k, frame in enumerate(frames):
+            analysis.analyze_frame(rois, frame, float(k))
+        analysis.close()
+        results.append([roi.analysis_module.get_velocities().tolist() for roi in rois])
+
+    assert analysis.cv_threads == 2
+    assert results[0] == results[1]
+
+
+def test_closing_the_pool_restores_opencv_threads():
+    """Check that the process-wide OpenCV thread count is only lowered while the pool runs."""
+    original = cv2.getNumThreads()
+    cv2.setNumThreads(5)
+    try:
+        rois = [ROI(QRect(10, 10, 40, 30), 0.0, 1.0), ROI(QRect(80, 10, 40, 30), 0.0, 1.0)]
+        analysis = MultiROIAnalysis(workers=2, thread_budget=2)
+        analysis.analyze_frame(rois, np.zeros((120, 160, 3), dtype=np.uint8), 0.0)
+        assert cv2.getNumThreads() == 1
+        analysis.close()
+        assert cv2.getNumThreads() == 5
+    finally:
+        cv2.setNumThreads(original)
+
+
+def test_leaving_a_cluster_does_not_use_a_stale_reference():
+    """Check that ROIs leaving a cluster restart instead of comparing with their last single frame."""
+    rng = np.random.default_rng(6)
+    texture = cv2.GaussianBlur((rng.random((400, 300, 3)) * 255).astype(np.uint8), (9, 9), 3)
+    frames = [texture[300 - 3 * k:400 - 3 * k, 0:240] for k in range(30)]  # Moving down
+    rois = [ROI(QRect(10, 10, 60, 50), 0.0, 1.0), ROI(QRect(40, 20, 60, 50), 0.0, 1.0)]
+
+    analysis = MultiROIAnalysis(cluster=False)
+    flows = [analysis.analyze_frame(rois, frames[k], float(k)) for k in range(5)]
+    analysis.cluster = True
+    flows += [analysis.analyze_frame(rois, frames[k], float(k)) for k in range(5, 25)]
+    assert len(analysis.clusters) == 1
+    analysis.cluster = False
+    flows += [analysis.analyze_frame(rois, frames[k], float(k)) for k in range(25, 30)]
+
+    # After the toggle the ROIs behave like ROIs first seen at frame 25
+    fresh_rois = [ROI(roi.rect, 0.0, 1.0) for roi in rois]
+    fresh = MultiROIAnalysis(cluster=False)
+    expected = [fresh.analyze_frame(fresh_rois, frames[k], float(k)) for k in range(25, 30)]
+    assert flows[25] == [(None, None)] * 2
+    assert flows[25:] == expected
+    assert all(flow_y > 1 for _, flow_y in flows[26])
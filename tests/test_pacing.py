@@ -0,0 +1,31 @@
+"""Tests for the frame pacing module."""
+
+import time
+
+from froth_monitor.pacing import FramePacer, FASTEST, MULTIPLIER
+
+
+def test_frames_are_scheduled_in_media_time():
+    """Check that frame delays follow the media time divided by the speed."""
+    pacer = FramePacer(30, MULTIPLIER, speed=2.0)
+    assert pacer.delay(5.0) == 0.0  # Anchors the schedule
+
+    delay = pacer.delay(6.0)
+    assert 0.45 < delay <= 0.5
+    assert pacer.frames_behind(6.0) == 0
+
+
+def test_overdue_frames_are_skipped_except_when_fastest():
+    """Check that a pacer one second behind skips about a second of frames."""
+    pacer = FramePacer(30)
+    pacer.delay(0.0)
+    pacer.anchor_wall -= 1.0  # Pretend playback stalled for a second
+
+    assert 29 <= pacer.frames_behind(0.0) <= 30
+    pacer.resync()
+    assert pacer.frames_behind(0.0) == 0
+
+    fastest = FramePacer(30, FASTEST)
+    fastest.delay(0.0)
+    time.sleep(0.01)
+    assert fastest.delay(0.0) == 0.0 and fastest.frames_behind(0.0) == 0
@@ -0,0 +1,47 @@
+"""Tests for the adaptive quality module."""
+
+from PySide6.QtCore import QRect
+
+from froth_monitor.quality import QualityController, QUALITY_LADDER
+from froth_monitor.roi import ROI
+
+
+def make_rois(count: int = 2) -> list:
+    """Return ROIs with the default Farneback estimator."""
+    return [ROI(QRect(10 + 60 * i, 10, 50, 40), 0.0, 1.0) for i in range(count)]
+
+
+def test_lowers_the_most_expensive_roi_and_raises_it_again():
+    """Check that quality drops when over budget and returns after a calm period."""
+    rois = make_rois()
+    controller = QualityController(fps=100, cooldown=3, patience=5)
+    rois[0].analysis_module.last_cost = 0.002
+    rois[1].analysis_module.last_cost = 0.008
+
+    change = None
+    for frame in range(4):
+        change = controller.update(rois, 0.010, float(frame)) or change
+
+    assert change["roi"] == 2 and change["to_level"] == 1
+    assert rois[1].analysis_module.downscale == QUALITY_LADDER[1]["downscale"]
+    assert rois[1].analysis_module.estimator.quality_parameters()["winsize"] == QUALITY_LADDER[1]["winsize"]
+    assert rois[0].analysis_module.downscale == 1.0
+
+    for frame in range(4, 20):
+        controller.update(rois, 0.001, float(frame))
+
+    assert controller.get_level(rois[1]) == 0
+    assert rois[1].analysis_module.downscale == 1.0
+    assert [c["reason"] for c in controller.changes] == ["over budget", "headroom"]
+
+
+def test_ladder_never_exceeds_the_starting_settings():
+    """Check that a step keeps a stronger starting downscale and stride."""
+    roi = ROI(QRect(0, 0, 50, 40), 0.0, 1.0, downscale=4, stride=5)
+    controller = QualityController()
+    controller.apply_level(roi, 2)
+
+    assert roi.analysis_module.downscale == 4
+    assert roi.analysis_module.stride == 5
+    controller.apply_level(roi, 0)
+    assert roi.analysis_module.estimator.quality_parameters() == {"levels": 3, "winsize": 25}
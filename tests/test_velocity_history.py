@@ -0,0 +1,38 @@
+"""Tests for the velocity history module."""
+
+import numpy as np
+
+from froth_monitor.velocity_history import VelocityHistory
+
+
+def test_append_grows_and_keeps_rows():
+    """Check that amortized doubling keeps every appended row."""
+    history = VelocityHistory(initial_capacity=2)
+    for i in range(10):
+        history.append(float(i), i * 0.5, -i * 0.5, 100.0 + i)
+
+    assert len(history) == 10
+    np.testing.assert_array_equal(history.velocities, np.arange(10.0))
+    np.testing.assert_array_equal(history.flow_y, -np.arange(10.0) * 0.5)
+    assert history[-1]["velocity"] == 9.0
+
+
+def test_accessors_are_views():
+    """Check that the column accessors do not copy the data."""
+    history = VelocityHistory()
+    history.append(1.0, 0.0, 1.0, 0.0)
+    view = history.velocities
+    history.append(2.0, 0.0, 2.0, 1.0)
+
+    assert np.shares_memory(view, history.velocities)
+    assert view.tolist() == [1.0]
+
+
+def test_records_compatibility_view():
+    """Check that the legacy list-of-dicts view formats timestamps."""
+    history = VelocityHistory()
+    history.append(2.5, 2.5, 0.0, 0.0)
+
+    records = history.to_records()
+    assert records[0]["velocity"] == 2.5
+    assert len(records[0]["timestamp"]) == len("01/01/2025 00:00:00.000")
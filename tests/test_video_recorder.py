@@ -0,0 +1,163 @@
+"""Tests for the video recorder module."""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from froth_monitor.video_recorder import VideoRecorder, RecordingIndex, SIZE_CHECK_INTERVAL
+
+
+def test_queued_frames_are_drained_on_stop(tmp_path):
+    """Check that every queued frame reaches the file when recording stops."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48))
+    recorder.start_recording()
+    for i in range(40):
+        assert recorder.write_frame(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+    recorder.stop_recording()
+
+    assert recorder.get_statistics()["frames_written"] == 40
+    capture = cv2.VideoCapture(recorder.file_path)
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 40
+    capture.release()
+    assert not recorder.write_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+
+
+def test_full_queue_drops_frames_after_waiting(tmp_path):
+    """Check that a stalled writer makes write_frame drop frames instead of blocking."""
+    recorder = VideoRecorder(str(tmp_path), "clip", frame_size=(64, 48), max_queue_size=2, max_block=0.01)
+    recorder.recording = True  # No writer thread: the queue is never drained
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    results = [recorder.write_frame(frame) for _ in range(5)]
+
+    stats = recorder.get_statistics()
+    assert results == [True, True, False, False, False]
+    assert stats["frames_dropped"] == 3 and stats["frames_blocked"] == 3
+    assert stats["blocked_time"] >= 0.03
+
+
+def test_every_frame_is_either_written_or_counted_as_dropped(tmp_path):
+    """Check that drops counted by several writing threads and the writer thread all add up."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), max_queue_size=1, max_block=0.0)
+    recorder.start_recording()
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    threads = [threading.Thread(target=lambda: [recorder.write_frame(frame) for _ in range(200)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.stop_recording()
+
+    stats = recorder.get_statistics()
+    assert stats["frames_written"] + stats["frames_dropped"] == 800
+    assert stats["frames_dropped"] > 0
+
+
+class FailingIndexWriter:
+    """An index writer whose every row fails, like a full disk."""
+
+    def writerow(self, row):
+        raise OSError("No space left on device")
+
+
+def test_failing_index_write_does_not_kill_the_writer(tmp_path):
+    """Check that a failing index write drops frames without hanging write_frame or stop."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), max_queue_size=4,
+                             segment_seconds=100)
+    recorder.start_recording()
+    recorder.index_writer = FailingIndexWriter()
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for i in range(50):
+        recorder.write_frame(frame, timestamp=i / 30)
+    recorder.stop_recording()
+    assert time.perf_counter() - start < 2.0
+
+    stats = recorder.get_statistics()
+    assert recorder.writer_thread is None
+    assert stats["frames_dropped"] == 50 and stats["write_errors"] == 50
+
+
+def test_frames_are_dropped_at_once_when_the_writer_died(tmp_path):
+    """Check that write_frame does not wait for room in a queue that nobody drains."""
+    recorder = VideoRecorder(str(tmp_path), "clip", frame_size=(64, 48), max_queue_size=1, max_block=1.0)
+    recorder.recording = True
+    recorder.writer_thread = threading.Thread(target=lambda: None)
+    recorder.writer_thread.start()
+    recorder.writer_thread.join()
+
+    start = time.perf_counter()
+    assert not any(recorder.write_frame(np.zeros((48, 64, 3), dtype=np.uint8)) for _ in range(5))
+    assert time.perf_counter() - start < 0.5
+    assert recorder.get_statistics()["frames_dropped"] == 5
+    recorder.stop_recording()
+
+
+def test_segments_roll_over_without_losing_frames(tmp_path):
+    """Check that a time limit splits the recording into segments holding every frame."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), segment_seconds=0.5)
+    recorder.start_recording()
+    for i in range(60):
+        assert recorder.write_frame(np.full((48, 64, 3), i * 4, dtype=np.uint8), timestamp=100 + i / 30)
+    recorder.stop_recording()
+
+    assert len(recorder.segment_paths) == 4
+    counts = []
+    for path in recorder.segment_paths:
+        capture = cv2.VideoCapture(path)
+        counts.append(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)))
+        capture.release()
+    assert counts == [15, 15, 15, 15]
+
+
+def test_segment_size_is_checked_every_interval(tmp_path):
+    """Check that a size limit is only tested every SIZE_CHECK_INTERVAL frames."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), segment_bytes=1)
+    recorder.start_recording()
+    for i in range(2 * SIZE_CHECK_INTERVAL + 10):
+        assert recorder.write_frame(np.full((48, 64, 3), i, dtype=np.uint8), timestamp=100 + i / 30)
+    recorder.stop_recording()
+
+    index = RecordingIndex.load(str(tmp_path), "clip")
+    counts = [index.segments.count(segment) for segment in (1, 2, 3)]
+    assert counts == [SIZE_CHECK_INTERVAL, SIZE_CHECK_INTERVAL, 10]
+
+
+def test_failed_rollover_stops_the_recording_cleanly(tmp_path, monkeypatch):
+    """Check that a segment that cannot be opened ends the recording with the last segment intact."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), segment_seconds=0.5)
+    recorder.start_recording()
+    first_path = recorder.file_path
+    monkeypatch.setattr(recorder, "create_writer", lambda file_path: None)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    queued = sum(recorder.write_frame(frame, timestamp=i / 30) for i in range(30))
+    recorder.stop_recording()
+
+    stats = recorder.get_statistics()
+    assert recorder.segment_paths == [first_path] and recorder.writer is None
+    assert not recorder.is_recording()
+    assert stats["frames_written"] == 15 and stats["frames_written"] + stats["frames_dropped"] == queued
+    assert RecordingIndex.load(str(tmp_path), "clip").segments == [1] * 15
+
+
+def test_recording_index_finds_frames(tmp_path):
+    """Check that the segment index maps frame numbers and timestamps to segment frames."""
+    recorder = VideoRecorder(str(tmp_path), "clip", fps=30, frame_size=(64, 48), segment_seconds=0.5)
+    recorder.start_recording()
+    for i in range(40):
+        recorder.write_frame(np.zeros((48, 64, 3), dtype=np.uint8), timestamp=100 + i / 30)
+    recorder.stop_recording()
+
+    index = RecordingIndex.load(str(tmp_path), "clip")
+    assert index.frames == list(range(1, 41))
+
+    location = index.find_frame(20)
+    assert (location["segment"], location["segment_frame"]) == (2, 5)
+    assert location["video_path"] == recorder.segment_paths[1]
+    assert index.find_timestamp(100 + 19.4 / 30)["frame"] == 20
+    assert index.find_timestamp(0)["frame"] == 1
+    assert index.find_timestamp(1e9)["frame"] == 40
+    assert index.find_frame(41) is None